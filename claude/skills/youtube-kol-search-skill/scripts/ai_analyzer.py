@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+"""
+Concurrent AI channel analysis (Deepseek / Zhipu)
+
+An asyncio worker pool replaces the single-threaded queue with its fixed
+`time.sleep(0.2)`:
+
+- configurable number of concurrent workers
+- per-provider token buckets for requests/sec and tokens/min
+- a bounded input queue, so producers (the collector) wait instead of
+  piling channels up in memory
+- shared backoff on HTTP 429 that honours Retry-After
+- optional prompt packing: N channels per request behind one shared product
+  header, answered as a JSON array and split back per channel
+- optional content-hash cache (analysis_cache.py): a channel whose snapshot,
+  product config, prompt and model are unchanged reuses its earlier analysis
+
+Usage:
+    python ai_analyzer.py --provider deepseek --api-key KEY --channels channels.json
+                          [--concurrency 3] [--batch-size 5] [--output analysis.json]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+
+from analysis_cache import cache_key
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PROVIDERS = {
+    'deepseek': {
+        'url': 'https://api.deepseek.com/v1/chat/completions',
+        'model': 'deepseek-chat',
+        'requests_per_second': 5.0,
+        'tokens_per_minute': 300_000,
+        'max_output_tokens': 8192,
+    },
+    'zhipu': {
+        'url': 'https://open.bigmodel.cn/api/paas/v4/chat/completions',
+        'model': 'glm-4',
+        'requests_per_second': 2.0,
+        'tokens_per_minute': 120_000,
+        'max_output_tokens': 4096,
+    },
+}
+
+MAX_RESPONSE_TOKENS = 800
+CHARS_PER_TOKEN = 3  # conservative estimate for mixed English/CJK prompts
+
+PROMPT_TEMPLATE = """Analyze this YouTube channel for {product_name}.
+
+Product: {product_description}
+Core features: {core_features}
+Target audience: {target_audience}
+
+Channel: {channel_title} ({subscriber_count} subscribers)
+Description: {channel_description}
+Recent Videos:
+{video_data}
+
+Respond with JSON only:
+{{"relevance_score": 0-100, "audience_match": "...", "content_alignment": "...",
+  "recommendation": "...", "key_strengths": ["..."], "concerns": ["..."]}}"""
+
+
+PRODUCT_HEADER_TEMPLATE = """You evaluate YouTube channels as marketing partners for {product_name}.
+
+Product: {product_description}
+Core features: {core_features}
+Target audience: {target_audience}"""
+
+CHANNEL_BLOCK_TEMPLATE = """### channel_id: {channel_id}
+Channel: {channel_title} ({subscriber_count} subscribers)
+Description: {channel_description}
+Recent Videos:
+{video_data}"""
+
+BATCH_INSTRUCTIONS = """Evaluate each of the {count} channels above independently.
+Respond with a JSON array only, one object per channel, in the same order:
+[{{"channel_id": "...", "relevance_score": 0-100, "audience_match": "...",
+   "content_alignment": "...", "recommendation": "...",
+   "key_strengths": ["..."], "concerns": ["..."]}}]"""
+
+TEMPLATE_VERSION = hashlib.sha256('\n'.join(
+    [PROMPT_TEMPLATE, PRODUCT_HEADER_TEMPLATE, CHANNEL_BLOCK_TEMPLATE, BATCH_INSTRUCTIONS]
+).encode('utf-8')).hexdigest()[:16]
+
+
+class AIAnalysisError(Exception):
+    """Analysis failed (bad response or non-retryable HTTP error)"""
+
+
+class RateLimitedError(Exception):
+    """Provider returned HTTP 429"""
+
+    def __init__(self, retry_after: float = None):
+        super().__init__(f"Rate limited (retry after {retry_after}s)")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Async token bucket; acquire() waits until enough tokens have refilled"""
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def debit(self, amount: float):
+        """Charge extra usage discovered after the fact (may go negative)"""
+        self._refill()
+        self.tokens -= amount
+
+    def pause(self, seconds: float):
+        """Drain the bucket so no one acquires for roughly `seconds`"""
+        self._refill()
+        self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+
+class ProviderLimiter:
+    """Requests/sec and tokens/min limits for one AI provider"""
+
+    def __init__(self, requests_per_second: float, tokens_per_minute: int):
+        self.requests = TokenBucket(requests_per_second, max(1.0, requests_per_second))
+        self.tokens = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute)
+
+    async def acquire(self, estimated_tokens: int):
+        await self.requests.acquire(1)
+        await self.tokens.acquire(estimated_tokens)
+
+    def settle(self, estimated_tokens: int, actual_tokens: int):
+        if actual_tokens and actual_tokens > estimated_tokens:
+            self.tokens.debit(actual_tokens - estimated_tokens)
+
+    def backoff(self, seconds: float):
+        self.requests.pause(seconds)
+
+
+def estimate_tokens(prompt: str, max_tokens: int = MAX_RESPONSE_TOKENS) -> int:
+    return len(prompt) // CHARS_PER_TOKEN + max_tokens
+
+
+def format_videos(channel: dict, limit: int = 10) -> str:
+    lines = []
+    for video in channel.get('recent_videos', [])[:limit]:
+        lines.append(f"- {video.get('title', '')} ({video.get('view_count', 0)} views): "
+                     f"{(video.get('description') or '')[:150]}")
+    return '\n'.join(lines) or '- (no recent videos)'
+
+
+def build_prompt(channel: dict, product: dict) -> str:
+    """Single-channel prompt from a collected channel and a product_config row"""
+    return PROMPT_TEMPLATE.format(
+        product_name=product.get('product_name', ''),
+        product_description=product.get('product_description', ''),
+        core_features=', '.join(product.get('core_features') or []),
+        target_audience=product.get('target_audience', ''),
+        channel_title=channel.get('channel_title', ''),
+        subscriber_count=channel.get('subscriber_count', 0),
+        channel_description=(channel.get('description') or '')[:500],
+        video_data=format_videos(channel),
+    )
+
+
+def build_batch_prompt(channels: list, product: dict) -> str:
+    """Several channels behind one shared product header"""
+    header = PRODUCT_HEADER_TEMPLATE.format(
+        product_name=product.get('product_name', ''),
+        product_description=product.get('product_description', ''),
+        core_features=', '.join(product.get('core_features') or []),
+        target_audience=product.get('target_audience', ''),
+    )
+    blocks = [CHANNEL_BLOCK_TEMPLATE.format(
+        channel_id=channel['channel_id'],
+        channel_title=channel.get('channel_title', ''),
+        subscriber_count=channel.get('subscriber_count', 0),
+        channel_description=(channel.get('description') or '')[:500],
+        video_data=format_videos(channel),
+    ) for channel in channels]
+    return '\n\n'.join([header, *blocks, BATCH_INSTRUCTIONS.format(count=len(channels))])
+
+
+def split_batch_response(content: str, channel_ids: list) -> dict:
+    """channel_id → validated analysis; channels missing or invalid are left out"""
+    parsed = parse_json_content(content)
+    if isinstance(parsed, dict):
+        parsed = parsed.get('results') or parsed.get('channels') or [parsed]
+    if not isinstance(parsed, list):
+        raise AIAnalysisError("Batch response is not a JSON array")
+
+    wanted = set(channel_ids)
+    results = {}
+    for position, item in enumerate(parsed):
+        if not isinstance(item, dict):
+            continue
+        channel_id = item.get('channel_id')
+        if channel_id is None and position < len(channel_ids) and len(parsed) == len(channel_ids):
+            channel_id = channel_ids[position]  # model dropped the id but kept the order
+        if channel_id not in wanted or channel_id in results:
+            continue
+        try:
+            results[channel_id] = validate_analysis(item)
+        except AIAnalysisError:
+            continue
+    return results
+
+
+def parse_json_content(content: str):
+    """Parse a model reply that should be JSON, tolerating ```json fences"""
+    match = re.search(r'```(?:json)?\s*(.*?)```', content, re.S)
+    if match:
+        content = match.group(1)
+    try:
+        return json.loads(content.strip())
+    except ValueError as e:
+        raise AIAnalysisError(f"Response is not valid JSON: {e}")
+
+
+def validate_analysis(result) -> dict:
+    """Check one analysis object has the analysis_detail fields"""
+    if not isinstance(result, dict):
+        raise AIAnalysisError("Analysis is not a JSON object")
+    score = result.get('relevance_score')
+    if not isinstance(score, (int, float)) or not 0 <= score <= 100:
+        raise AIAnalysisError(f"Invalid relevance_score: {score!r}")
+    for key in ('key_strengths', 'concerns'):
+        if not isinstance(result.get(key, []), list):
+            raise AIAnalysisError(f"{key} must be a list")
+    result['relevance_score'] = int(score)
+    return result
+
+
+def requests_transport(url: str, headers: dict, payload: dict, timeout: float):
+    """Blocking HTTP POST; returns (status, headers, body)"""
+    import requests
+    response = requests.post(url, headers=headers, json=payload, timeout=timeout)
+    return response.status_code, response.headers, response.text
+
+
+class AIAnalysisPool:
+    """Bounded asyncio worker pool for channel analyses"""
+
+    def __init__(self, provider: str, api_key: str, concurrency: int = 3, queue_size: int = 50,
+                 requests_per_second: float = None, tokens_per_minute: int = None,
+                 max_retries: int = 5, timeout: float = 60.0, transport=requests_transport,
+                 batch_size: int = 1, cache=None):
+        """
+        batch_size > 1 packs up to that many queued channels into one request,
+        at most as many as the provider's max_output_tokens has room for;
+        channels the packed reply does not answer validly are re-run one by one.
+        cache (MemoryAnalysisCache / MySQLAnalysisCache) is checked before a
+        channel is queued and filled after each successful analysis.
+        """
+        config = PROVIDERS[provider]
+        self.provider = provider
+        self.api_key = api_key
+        self.url = config['url']
+        self.model = config['model']
+        self.concurrency = concurrency
+        self.max_output_tokens = config['max_output_tokens']
+        max_batch = max(1, self.max_output_tokens // MAX_RESPONSE_TOKENS)
+        if batch_size > max_batch:
+            logger.warning(f"⚠ {provider} answers at most {self.max_output_tokens} tokens, "
+                           f"batch size lowered from {batch_size} to {max_batch}")
+        self.batch_size = max(1, min(batch_size, max_batch))
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.transport = transport
+        self.cache = cache
+        self.limiter = ProviderLimiter(
+            requests_per_second or config['requests_per_second'],
+            tokens_per_minute or config['tokens_per_minute'],
+        )
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.stats = {'completed': 0, 'failed': 0, 'rate_limited': 0, 'tokens_used': 0,
+                      'batches': 0, 'batch_fallbacks': 0}
+        self._workers = []
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def start(self):
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def close(self):
+        """Wait for queued work, then stop the workers"""
+        await self.queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+    async def submit(self, channel: dict, product: dict) -> asyncio.Future:
+        """Queue a channel; waits while the queue is full (backpressure)"""
+        future = asyncio.get_running_loop().create_future()
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, self._cache_key(channel, product))
+            if cached is not None:
+                cached['cache_hit'] = True
+                future.set_result(cached)
+                return future
+        await self.queue.put((channel, product, future))
+        return future
+
+    def _cache_key(self, channel: dict, product: dict) -> str:
+        return cache_key(channel, product, TEMPLATE_VERSION, self.provider, self.model)
+
+    async def _resolve(self, channel: dict, product: dict, future: asyncio.Future, analysis: dict):
+        if self.cache is not None:
+            try:
+                await asyncio.to_thread(self.cache.put, self._cache_key(channel, product),
+                                        analysis, self.provider, self.model)
+            except Exception as e:
+                logger.warning(f"⚠ Could not cache analysis for {channel['channel_id']}: {e}")
+        if not future.done():
+            future.set_result(analysis)
+        self.stats['completed'] += 1
+
+    async def analyze(self, channel: dict, product: dict) -> dict:
+        return await (await self.submit(channel, product))
+
+    async def _worker(self):
+        while True:
+            items = [await self.queue.get()]
+            while len(items) < self.batch_size and not self.queue.empty():
+                items.append(self.queue.get_nowait())
+            try:
+                if len(items) == 1:
+                    await self._run_single(*items[0])
+                else:
+                    await self._run_batch(items)
+            finally:
+                for _ in items:
+                    self.queue.task_done()
+
+    async def _run_single(self, channel: dict, product: dict, future: asyncio.Future):
+        try:
+            result = await self._analyze(channel, product)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            self.stats['failed'] += 1
+            return
+        await self._resolve(channel, product, future, result)
+
+    async def _run_batch(self, items: list):
+        """Pack items sharing a product into one request each; fall back per channel"""
+        groups = {}
+        for item in items:
+            key = json.dumps(item[1], sort_keys=True, default=str)
+            groups.setdefault(key, []).append(item)
+
+        for group in groups.values():
+            if len(group) == 1:
+                await self._run_single(*group[0])
+                continue
+
+            channels = [channel for channel, _, _ in group]
+            product = group[0][1]
+            try:
+                results = await self._analyze_batch(channels, product)
+                self.stats['batches'] += 1
+            except Exception as e:
+                logger.warning(f"⚠ Batch of {len(group)} failed ({e}), falling back to single calls")
+                results = {}
+
+            for channel, product, future in group:
+                analysis = results.get(channel['channel_id'])
+                if analysis is None:
+                    self.stats['batch_fallbacks'] += 1
+                    await self._run_single(channel, product, future)
+                    continue
+                await self._resolve(channel, product, future, analysis)
+
+    async def _analyze_batch(self, channels: list, product: dict) -> dict:
+        prompt = build_batch_prompt(channels, product)
+        max_tokens = min(MAX_RESPONSE_TOKENS * len(channels), self.max_output_tokens)
+        content, usage = await self.complete(prompt, max_tokens=max_tokens)
+        results = split_batch_response(content, [c['channel_id'] for c in channels])
+        for analysis in results.values():
+            analysis.pop('channel_id', None)
+            analysis.update({
+                'prompt_used': prompt,
+                'model_version': self.model,
+                'tokens_used': usage // len(channels),
+                'batch_size': len(channels),
+            })
+        return results
+
+    async def _analyze(self, channel: dict, product: dict) -> dict:
+        prompt = build_prompt(channel, product)
+        result, usage = await self.complete(prompt)
+        analysis = validate_analysis(parse_json_content(result))
+        analysis.update({
+            'prompt_used': prompt,
+            'model_version': self.model,
+            'tokens_used': usage,
+        })
+        return analysis
+
+    async def complete(self, prompt: str, max_tokens: int = MAX_RESPONSE_TOKENS) -> tuple:
+        """One rate-limited chat completion; returns (content, total_tokens)"""
+
+        estimated = estimate_tokens(prompt, max_tokens)
+        payload = {
+            'model': self.model,
+            'messages': [{'role': 'user', 'content': prompt}],
+            'max_tokens': max_tokens,
+            'temperature': 0.2,
+        }
+        headers = {'Authorization': f'Bearer {self.api_key}', 'Content-Type': 'application/json'}
+
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire(estimated)
+            status, response_headers, body = await asyncio.to_thread(
+                self.transport, self.url, headers, payload, self.timeout
+            )
+
+            if status == 429:
+                self.stats['rate_limited'] += 1
+                retry_after = response_headers.get('Retry-After') if response_headers else None
+                delay = float(retry_after) if retry_after else 2 ** attempt + random.uniform(0, 1)
+                logger.warning(f"⚠ {self.provider} rate limited, backing off {delay:.1f}s")
+                self.limiter.backoff(delay)  # every worker waits, not just this one
+                continue
+
+            if status != 200:
+                raise AIAnalysisError(f"{self.provider} HTTP {status}: {str(body)[:200]}")
+
+            result = json.loads(body)
+            tokens = result.get('usage', {}).get('total_tokens', 0)
+            self.limiter.settle(estimated, tokens)
+            self.stats['tokens_used'] += tokens
+            return result['choices'][0]['message']['content'], tokens
+
+        raise RateLimitedError()
+
+
+async def analyze_channels(channels: list, product: dict, provider: str, api_key: str,
+                           concurrency: int = 3, **pool_options) -> list:
+    """Analyze many channels; returns (channel_id, analysis or exception) pairs"""
+    async with AIAnalysisPool(provider, api_key, concurrency=concurrency, **pool_options) as pool:
+        futures = [(c['channel_id'], await pool.submit(c, product)) for c in channels]
+        results = await asyncio.gather(*(f for _, f in futures), return_exceptions=True)
+    return list(zip((cid for cid, _ in futures), results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analyze collected channels with Deepseek/Zhipu')
+    parser.add_argument('--provider', choices=sorted(PROVIDERS), required=True, help='AI provider')
+    parser.add_argument('--api-key', required=True, help='AI API key')
+    parser.add_argument('--channels', required=True, help='JSON file written by youtube_collector.py --output')
+    parser.add_argument('--product', help='JSON file with a product_config row (name, description, ...)')
+    parser.add_argument('--concurrency', type=int, default=3, help='Concurrent requests')
+    parser.add_argument('--batch-size', type=int, default=1, help='Channels packed into one prompt')
+    parser.add_argument('--output', help='Write analyses to this JSON file')
+
+    args = parser.parse_args()
+
+    with open(args.channels, encoding='utf-8') as f:
+        channels = list(json.load(f).values())
+    product = {'product_name': 'WMaster Cleanup'}
+    if args.product:
+        with open(args.product, encoding='utf-8') as f:
+            product = json.load(f)
+
+    started = time.perf_counter()
+    results = asyncio.run(analyze_channels(channels, product, args.provider, args.api_key,
+                                           concurrency=args.concurrency, batch_size=args.batch_size))
+    elapsed = time.perf_counter() - started
+
+    ok = {cid: r for cid, r in results if not isinstance(r, Exception)}
+    logger.info(f"✓ Analyzed {len(ok)}/{len(results)} channels in {elapsed:.1f}s")
+    for cid, error in results:
+        if isinstance(error, Exception):
+            logger.warning(f"  ⚠ {cid}: {error}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(ok, f, ensure_ascii=False, indent=2)
+        logger.info(f"✓ Written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Content-hash cache for AI analysis results
+
+`ai_analysis` rows are keyed by (channel_id, task_id), so re-running a
+keyword, or a second keyword that finds the same channel, pays for an
+identical LLM call again. This cache keys `analysis_detail` on what the
+prompt is actually built from:
+
+- a normalized channel snapshot: channel title/description, the titles and
+  descriptions of its recent videos and a subscriber bucket (so a channel
+  gaining a few subscribers does not invalidate the analysis)
+- the product config version (hash of the fields that go into the prompt)
+- the prompt templates
+- provider and model
+
+Entries live in `ai_analysis_cache` (MySQL) or in memory for offline runs.
+
+Usage:
+    python analysis_cache.py --password PASS     # lifetime hits and saved tokens
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import threading
+import unicodedata
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VIDEOS = 10
+PRODUCT_FIELDS = ('product_name', 'product_description', 'core_features', 'target_audience')
+
+
+def _normalize(text) -> str:
+    """NFKC, lower-case, collapsed whitespace"""
+    return ' '.join(unicodedata.normalize('NFKC', str(text or '')).lower().split())
+
+
+def subscriber_bucket(count) -> int:
+    """Half-decade buckets: 1k-3.1k, 3.1k-10k, 10k-31k, ..."""
+    count = int(count or 0)
+    return int(math.log10(count) * 2) if count > 0 else -1
+
+
+def channel_snapshot(channel: dict, videos: int = SNAPSHOT_VIDEOS) -> dict:
+    """The parts of a channel that reach the prompt, normalized"""
+    recent = sorted(channel.get('recent_videos') or [],
+                    key=lambda v: v.get('published_at') or '', reverse=True)[:videos]
+    return {
+        'channel_id': channel['channel_id'],
+        'title': _normalize(channel.get('channel_title')),
+        'description': _normalize((channel.get('description') or '')[:500]),
+        'subscriber_bucket': subscriber_bucket(channel.get('subscriber_count')),
+        'videos': [[_normalize(v.get('title')), _normalize((v.get('description') or '')[:200])]
+                   for v in recent],
+    }
+
+
+def _digest(value) -> str:
+    encoded = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def product_version(product: dict) -> str:
+    """Changes whenever a field used in the prompt changes"""
+    return _digest({f: product.get(f) for f in PRODUCT_FIELDS})[:16]
+
+
+def cache_key(channel: dict, product: dict, template_version: str,
+              provider: str, model: str) -> str:
+    return _digest({
+        'channel': channel_snapshot(channel),
+        'product': product_version(product),
+        'template': template_version,
+        'provider': provider,
+        'model': model,
+    })
+
+
+class CacheStats:
+    """Hit/miss counters; saved_tokens sums tokens_used of reused analyses"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.saved_tokens = 0
+        self._lock = threading.Lock()
+
+    def record(self, analysis: dict = None):
+        with self._lock:
+            if analysis is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.saved_tokens += int(analysis.get('tokens_used') or 0)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_rate': round(self.hit_rate, 3), 'saved_tokens': self.saved_tokens}
+
+
+class MemoryAnalysisCache:
+    """In-process cache (offline runs, tests of the pipeline)"""
+
+    def __init__(self):
+        self.entries = {}
+        self.stats = CacheStats()
+
+    def get(self, key: str):
+        analysis = self.entries.get(key)
+        self.stats.record(analysis)
+        return dict(analysis) if analysis is not None else None
+
+    def put(self, key: str, analysis: dict, provider: str = None, model: str = None):
+        self.entries[key] = dict(analysis)
+
+
+class MySQLAnalysisCache:
+    """`ai_analysis_cache` table; one connection, guarded for use from worker threads"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            cursor = self.connection.cursor()
+            cursor.execute(
+                "SELECT analysis_detail FROM ai_analysis_cache WHERE cache_key = %s", (key,)
+            )
+            row = cursor.fetchone()
+            if row is not None:
+                cursor.execute("""
+                    UPDATE ai_analysis_cache
+                    SET hit_count = hit_count + 1, last_hit_at = CURRENT_TIMESTAMP
+                    WHERE cache_key = %s
+                """, (key,))
+                self.connection.commit()
+            cursor.close()
+
+        analysis = json.loads(row[0]) if row is not None else None
+        self.stats.record(analysis)
+        return analysis
+
+    def put(self, key: str, analysis: dict, provider: str = None, model: str = None):
+        with self._lock:
+            cursor = self.connection.cursor()
+            cursor.execute("""
+                INSERT INTO ai_analysis_cache
+                    (cache_key, provider, model_version, analysis_detail, tokens_used)
+                VALUES (%s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE analysis_detail = VALUES(analysis_detail),
+                                        tokens_used = VALUES(tokens_used)
+            """, (key, provider, model or analysis.get('model_version'),
+                  json.dumps(analysis, ensure_ascii=False), int(analysis.get('tokens_used') or 0)))
+            self.connection.commit()
+            cursor.close()
+
+
+def stored_stats(connection) -> dict:
+    """Lifetime totals from the cache table (saved = tokens_used × hits)"""
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT COUNT(*), COALESCE(SUM(hit_count), 0), COALESCE(SUM(tokens_used * hit_count), 0)
+        FROM ai_analysis_cache
+    """)
+    entries, hits, saved = cursor.fetchone()
+    cursor.close()
+    return {'entries': int(entries), 'hits': int(hits), 'saved_tokens': int(saved)}
+
+
+def main():
+    import mysql.connector
+
+    parser = argparse.ArgumentParser(description='AI analysis cache statistics')
+    parser.add_argument('--host', default='localhost', help='MySQL host')
+    parser.add_argument('--port', type=int, default=3306, help='MySQL port')
+    parser.add_argument('--user', default='root', help='MySQL user')
+    parser.add_argument('--password', required=True, help='MySQL password')
+    parser.add_argument('--database', default='youtube_kol_db', help='Database name')
+
+    args = parser.parse_args()
+
+    connection = mysql.connector.connect(host=args.host, port=args.port, user=args.user,
+                                         password=args.password, database=args.database)
+    try:
+        stats = stored_stats(connection)
+        logger.info(f"✓ {stats['entries']} cached analyses")
+        logger.info(f"  Hits:         {stats['hits']}")
+        logger.info(f"  Saved tokens: {stats['saved_tokens']}")
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+Buffered bulk upserts for channels, channel_video_stats, videos, keyword links and ai_analysis
+
+Storing a channel the row-at-a-time way (UPDATE channels, INSERT stats,
+commit) costs two round-trips and one fsync per channel. BulkWriter buffers
+rows per table and writes them as multi-row
+
+    INSERT INTO t (...) VALUES (...), (...), ... ON DUPLICATE KEY UPDATE ...
+
+statements, all tables in one transaction per flush (channels first, for the
+foreign keys). Per-task rows get their task_date (the partition key) from
+search_tasks, looked up once per task. A flush happens when a table reaches batch_size rows, when the
+oldest buffered row is flush_interval seconds old, and on close() at the end
+of the task.
+
+store_task writes a finished collection in one go: channels, stats, videos,
+the keyword → channel links and each keyword's channel set (channel_sets.py)
+that later incremental searches diff against.
+
+Usage:
+    python bulk_writer.py --password PASS --benchmark [--rows 2000] [--batch-size 500]
+"""
+
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+from channel_metrics import channel_stats
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# table → (insert columns, columns refreshed on duplicate key); order = flush order
+TABLES = {
+    'channels': (
+        ('channel_id', 'channel_title', 'channel_url', 'subscriber_count', 'description',
+         'detected_language', 'language_confidence', 'custom_url', 'thumbnail_url',
+         'first_discovered_at', 'last_seen_at', 'status'),
+        ('channel_title', 'channel_url', 'subscriber_count', 'description', 'detected_language',
+         'language_confidence', 'custom_url', 'thumbnail_url', 'last_seen_at', 'status'),
+    ),
+    'channel_video_stats': (
+        ('channel_id', 'task_id', 'task_date', 'avg_view_count', 'avg_like_count', 'avg_comment_count',
+         'avg_engagement_rate', 'has_outliers', 'outlier_videos', 'video_languages'),
+        ('avg_view_count', 'avg_like_count', 'avg_comment_count', 'avg_engagement_rate',
+         'has_outliers', 'outlier_videos', 'video_languages'),
+    ),
+    'task_keyword_channels': (
+        ('task_id', 'keyword', 'channel_id'),
+        ('channel_id',),
+    ),
+    'videos': (
+        ('video_id', 'channel_id', 'title', 'description', 'language', 'published_at',
+         'view_count', 'like_count', 'comment_count', 'engagement_rate'),
+        ('title', 'description', 'language', 'published_at', 'view_count', 'like_count',
+         'comment_count', 'engagement_rate'),
+    ),
+    'channel_videos': (
+        ('task_id', 'task_date', 'channel_id', 'position', 'video_id', 'view_count', 'like_count',
+         'comment_count', 'engagement_rate'),
+        ('video_id', 'view_count', 'like_count', 'comment_count', 'engagement_rate'),
+    ),
+    'ai_analysis': (
+        ('channel_id', 'task_id', 'task_date', 'relevance_score', 'audience_match', 'content_alignment',
+         'recommendation', 'key_strengths', 'concerns', 'analysis_detail', 'ai_provider',
+         'analysis_status', 'error_message', 'analyzed_at'),
+        ('relevance_score', 'audience_match', 'content_alignment', 'recommendation',
+         'key_strengths', 'concerns', 'analysis_detail', 'ai_provider', 'analysis_status',
+         'error_message', 'analyzed_at'),
+    ),
+}
+
+# update columns that keep the stored value when the new row has none
+# (a run without language detection must not erase detected languages)
+KEEP_IF_NULL = {
+    'channels': ('detected_language', 'language_confidence'),
+    'videos': ('language',),
+}
+
+
+def _update(table: str, column: str) -> str:
+    if column in KEEP_IF_NULL.get(table, ()):
+        return f"{column} = COALESCE(VALUES({column}), {column})"
+    return f"{column} = VALUES({column})"
+
+
+def upsert_sql(table: str, row_count: int) -> str:
+    columns, updates = TABLES[table]
+    row = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+        + ', '.join([row] * row_count)
+        + " ON DUPLICATE KEY UPDATE "
+        + ', '.join(_update(table, c) for c in updates)
+    )
+
+
+def _value(value):
+    return json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else value
+
+
+def channel_row(channel: dict, seen_at: datetime = None) -> dict:
+    """channels row from a collected channel (youtube_collector.parse_channel + language)"""
+    seen_at = seen_at or datetime.now(timezone.utc).replace(tzinfo=None)
+    return {
+        'channel_id': channel['channel_id'],
+        'channel_title': channel.get('channel_title', ''),
+        'channel_url': channel.get('channel_url') or f"https://www.youtube.com/channel/{channel['channel_id']}",
+        'subscriber_count': channel.get('subscriber_count', 0),
+        'description': channel.get('description'),
+        'detected_language': channel.get('detected_language'),
+        'language_confidence': channel.get('language_confidence'),
+        'custom_url': channel.get('custom_url'),
+        'thumbnail_url': channel.get('thumbnail_url'),
+        'first_discovered_at': seen_at,
+        'last_seen_at': seen_at,
+        'status': 'active',
+    }
+
+
+def stats_row(channel: dict, task_id: str, metrics: dict = None) -> dict:
+    """channel_video_stats row: averages and IQR outliers of recent_videos (the videos go to videos/channel_videos)
+
+    metrics: this channel's channel_metrics.channel_stats entry when a batch was computed at once.
+    """
+    if metrics is None:
+        metrics = channel_stats([channel.get('recent_videos') or []])[0]
+    return {
+        'channel_id': channel['channel_id'],
+        'task_id': task_id,
+        **metrics,
+        'video_languages': channel.get('video_languages'),
+    }
+
+
+def _published_at(value):
+    """RFC 3339 publishedAt → naive UTC datetime for DATETIME columns"""
+    if not value or isinstance(value, datetime):
+        return value or None
+    moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return moment.astimezone(timezone.utc).replace(tzinfo=None) if moment.tzinfo else moment
+
+
+def video_row(video: dict, channel_id: str, language: str = None) -> dict:
+    """videos row from a recent_videos entry (youtube_collector.parse_video)"""
+    return {
+        'video_id': video['video_id'],
+        'channel_id': channel_id,
+        'title': (video.get('title') or '')[:255],
+        'description': video.get('description'),
+        'language': video.get('language') or language,
+        'published_at': _published_at(video.get('published_at')),
+        'view_count': video.get('view_count', 0),
+        'like_count': video.get('like_count', 0),
+        'comment_count': video.get('comment_count', 0),
+        'engagement_rate': video.get('engagement_rate', 0),
+    }
+
+
+def link_row(video: dict, channel_id: str, task_id: str, position: int) -> dict:
+    """channel_videos row: the video's place and counts in this task's snapshot"""
+    return {
+        'task_id': task_id,
+        'channel_id': channel_id,
+        'position': position,
+        'video_id': video['video_id'],
+        'view_count': video.get('view_count', 0),
+        'like_count': video.get('like_count', 0),
+        'comment_count': video.get('comment_count', 0),
+        'engagement_rate': video.get('engagement_rate', 0),
+    }
+
+
+def video_rows(channel_id: str, task_id: str, videos: list, languages=None):
+    """(table, row) pairs for a channel's recent videos; languages = video_languages list"""
+    languages = languages if isinstance(languages, list) else []
+    for position, video in enumerate(videos):
+        language = languages[position] if position < len(languages) else None
+        yield 'videos', video_row(video, channel_id, language)
+        yield 'channel_videos', link_row(video, channel_id, task_id, position)
+
+
+def channel_rows(channel: dict, task_id: str = None, metrics: dict = None):
+    """(table, row) pairs for one collected channel, in flush order"""
+    yield 'channels', channel_row(channel)
+    if task_id:
+        yield 'channel_video_stats', stats_row(channel, task_id, metrics)
+        yield from video_rows(channel['channel_id'], task_id, channel.get('recent_videos') or [],
+                              channel.get('video_languages'))
+
+
+def keyword_channel_rows(task_id: str, keyword: str, channel_ids: list):
+    """task_keyword_channels rows for the channels one keyword matched"""
+    for channel_id in dict.fromkeys(channel_ids):
+        yield {'task_id': task_id, 'keyword': keyword, 'channel_id': channel_id}
+
+
+def analysis_row(channel_id: str, task_id: str, analysis: dict, provider: str) -> dict:
+    """ai_analysis row from an ai_analyzer result"""
+    return {
+        'channel_id': channel_id,
+        'task_id': task_id,
+        'relevance_score': analysis.get('relevance_score'),
+        'audience_match': analysis.get('audience_match'),
+        'content_alignment': analysis.get('content_alignment'),
+        'recommendation': analysis.get('recommendation'),
+        'key_strengths': analysis.get('key_strengths') or [],
+        'concerns': analysis.get('concerns') or [],
+        'analysis_detail': analysis,
+        'ai_provider': provider,
+        'analysis_status': 'completed',
+        'error_message': None,
+        'analyzed_at': datetime.now(timezone.utc).replace(tzinfo=None),
+    }
+
+
+class BulkWriter:
+    """Per-table row buffers flushed as multi-row upserts
+
+    Thread-safe: collector callbacks, AI workers and the interval thread may
+    all add rows. Use as a context manager so the final flush happens when
+    the task ends.
+    """
+
+    def __init__(self, connection, batch_size: int = 500, flush_interval: float = 2.0):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.stats = {'rows': 0, 'statements': 0, 'flushes': 0}
+        self._buffers = {table: [] for table in TABLES}
+        self._oldest = None
+        self._task_dates = {}
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self):
+        """Start the interval flush thread (optional; add() also checks the age)"""
+        if self.flush_interval and self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        """Stop the interval thread and flush whatever is left"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def task_date(self, task_id: str):
+        """DATE(search_tasks.created_at); today (UTC) for a task that is not stored yet"""
+        with self._lock:
+            if task_id not in self._task_dates:
+                cursor = self.connection.cursor()
+                cursor.execute("SELECT DATE(created_at) FROM search_tasks WHERE task_id = %s", (task_id,))
+                row = cursor.fetchone()
+                cursor.close()
+                self._task_dates[task_id] = row[0] if row else datetime.now(timezone.utc).date()
+            return self._task_dates[task_id]
+
+    def add(self, table: str, row: dict):
+        with self._lock:
+            if 'task_date' in TABLES[table][0] and row.get('task_date') is None:
+                row = {**row, 'task_date': self.task_date(row['task_id'])}
+            self._buffers[table].append(tuple(_value(row.get(c)) for c in TABLES[table][0]))
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            if len(self._buffers[table]) >= self.batch_size or self._expired():
+                self.flush()
+
+    def add_channel(self, channel: dict, task_id: str = None, metrics: dict = None):
+        """channels row, plus channel_video_stats, videos and channel_videos when a task_id is given"""
+        for table, row in channel_rows(channel, task_id, metrics):
+            self.add(table, row)
+
+    def add_channels(self, channels: list, task_id: str = None):
+        """add_channel for a batch, with the video metrics computed for the whole batch at once"""
+        metrics = channel_stats([c.get('recent_videos') or [] for c in channels]) if task_id else [None] * len(channels)
+        for channel, values in zip(channels, metrics):
+            self.add_channel(channel, task_id, values)
+
+    def add_keyword_channels(self, task_id: str, keyword: str, channel_ids: list):
+        for row in keyword_channel_rows(task_id, keyword, channel_ids):
+            self.add('task_keyword_channels', row)
+
+    def add_analysis(self, channel_id: str, task_id: str, analysis: dict, provider: str):
+        self.add('ai_analysis', analysis_row(channel_id, task_id, analysis, provider))
+
+    def _expired(self) -> bool:
+        return (self.flush_interval and self._oldest is not None
+                and time.monotonic() - self._oldest >= self.flush_interval)
+
+    def flush(self):
+        """Write every buffer in one transaction; buffers are kept if it fails"""
+        with self._lock:
+            pending = {t: rows for t, rows in self._buffers.items() if rows}
+            if not pending:
+                return
+            cursor = self.connection.cursor()
+            try:
+                for table, rows in pending.items():
+                    for start in range(0, len(rows), self.batch_size):
+                        chunk = rows[start:start + self.batch_size]
+                        cursor.execute(upsert_sql(table, len(chunk)),
+                                       [value for row in chunk for value in row])
+                        self.stats['statements'] += 1
+                self.connection.commit()
+            except Exception:
+                self.connection.rollback()
+                raise
+            finally:
+                cursor.close()
+
+            self.stats['rows'] += sum(len(rows) for rows in pending.values())
+            self.stats['flushes'] += 1
+            self._buffers = {table: [] for table in TABLES}
+            self._oldest = None
+
+    def _run(self):
+        while not self._stop.wait(min(self.flush_interval, 0.5)):
+            with self._lock:
+                if self._expired():
+                    try:
+                        self.flush()
+                    except Exception as e:
+                        logger.warning(f"⚠ Bulk flush failed (rows kept for retry): {e}")
+
+
+def store_task(connection, task_id: str, channels: dict, keyword_channels: dict,
+                parent_task_id: str = None, batch_size: int = 500) -> dict:
+    """Write a task's collected channels, keyword links and per-keyword channel sets
+
+    channels: channel_id → collected channel; keyword_channels: keyword → the
+    channel IDs it matched (collect_keywords_batch, or {keyword: list(channels)}
+    for a single keyword). For an incremental task pass parent_task_id so each
+    keyword's set also holds the parent's channels. The search_tasks row must
+    exist. Returns keyword → stored ChannelIdSet.
+    """
+    from channel_sets import store_task_set
+
+    keyword_channels = {keyword: [c for c in channel_ids if c in channels]
+                        for keyword, channel_ids in keyword_channels.items()}
+    with BulkWriter(connection, batch_size=batch_size, flush_interval=0) as writer:
+        writer.add_channels(list(channels.values()), task_id)
+        for keyword, channel_ids in keyword_channels.items():
+            writer.add_keyword_channels(task_id, keyword, channel_ids)
+
+    # the sets intern channels.id, so they are stored after the channels rows
+    return {keyword: store_task_set(connection, task_id, keyword, channel_ids, parent_task_id)
+            for keyword, channel_ids in keyword_channels.items()}
+
+
+# ── benchmark ─────────────────────────────────────────────────────────
+
+def _synthetic_channels(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    channels = []
+    for i in range(count):
+        videos = [{
+            'video_id': f"bench{i:07d}v{v}",
+            'title': f"Benchmark video {v} of channel {i}",
+            'description': 'PC cleanup tips ' * 8,
+            'view_count': rng.randint(100, 500000),
+            'like_count': rng.randint(0, 20000),
+            'comment_count': rng.randint(0, 2000),
+            'engagement_rate': rng.random() * 0.1,
+            'published_at': '2024-06-01T00:00:00Z',
+        } for v in range(10)]
+        channels.append({
+            'channel_id': f"UCbench{i:017d}",
+            'channel_title': f"Bench channel {i}",
+            'subscriber_count': rng.randint(1000, 2000000),
+            'description': 'Windows optimization and PC cleanup tutorials. ' * 4,
+            'detected_language': 'en',
+            'language_confidence': 0.9,
+            'recent_videos': videos,
+        })
+    return channels
+
+
+def _row_at_a_time(connection, channels: list, task_id: str):
+    """Baseline: per channel one statement per row, one commit"""
+    cursor = connection.cursor()
+    cursor.execute("SELECT DATE(created_at) FROM search_tasks WHERE task_id = %s", (task_id,))
+    task_date = cursor.fetchone()[0]
+    rows = 0
+    for channel in channels:
+        for table, row in channel_rows(channel, task_id):
+            row.setdefault('task_date', task_date)
+            cursor.execute(upsert_sql(table, 1), [_value(row.get(c)) for c in TABLES[table][0]])
+            rows += 1
+        connection.commit()
+    cursor.close()
+    return rows
+
+
+def run_benchmark(connection, database: str, rows: int = 2000, batch_size: int = 500,
+                  keep: bool = False) -> dict:
+    """rows/sec of row-at-a-time vs BulkWriter on a scratch database built by create_tables"""
+    from init_database import add_foreign_keys, create_database, create_tables
+
+    create_database(connection, database)
+    connection.database = database
+    create_tables(connection)
+    add_foreign_keys(connection)
+
+    cursor = connection.cursor()
+    results = {}
+    try:
+        for mode in ('row_at_a_time', 'bulk'):
+            task_id = f"bench-{mode}-{int(time.time())}"
+            cursor.execute("DELETE FROM channel_video_stats WHERE channel_id LIKE 'UCbench%'")
+            cursor.execute("DELETE FROM channels WHERE channel_id LIKE 'UCbench%'")
+            cursor.execute("INSERT INTO search_tasks (task_id, keyword, status) VALUES (%s, %s, 'running')",
+                           (task_id, 'benchmark'))
+            connection.commit()
+
+            channels = _synthetic_channels(rows)
+            started = time.perf_counter()
+            if mode == 'bulk':
+                with BulkWriter(connection, batch_size=batch_size, flush_interval=0) as writer:
+                    writer.add_channels(channels, task_id)
+                written = writer.stats['rows']
+            else:
+                written = _row_at_a_time(connection, channels, task_id)
+            elapsed = time.perf_counter() - started
+            results[mode] = {'rows': written, 'seconds': elapsed, 'rows_per_sec': written / elapsed}
+    finally:
+        cursor.close()
+        if not keep:
+            cursor = connection.cursor()
+            cursor.execute(f"DROP DATABASE {database}")
+            cursor.close()
+    return results
+
+
+def main():
+    import mysql.connector
+
+    parser = argparse.ArgumentParser(description='Bulk upsert writer for collected channels')
+    parser.add_argument('--host', default='localhost', help='MySQL host')
+    parser.add_argument('--port', type=int, default=3306, help='MySQL port')
+    parser.add_argument('--user', default='root', help='MySQL user')
+    parser.add_argument('--password', required=True, help='MySQL password')
+    parser.add_argument('--benchmark', action='store_true', help='Compare row-at-a-time and bulk writes')
+    parser.add_argument('--benchmark-database', default='youtube_kol_bench',
+                        help='Scratch database created (and dropped) by the benchmark')
+    parser.add_argument('--rows', type=int, default=2000, help='Channels written per mode')
+    parser.add_argument('--batch-size', type=int, default=500, help='Rows per INSERT statement')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch database')
+
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        parser.error('nothing to do (use --benchmark)')
+
+    connection = mysql.connector.connect(host=args.host, port=args.port, user=args.user,
+                                         password=args.password)
+    try:
+        results = run_benchmark(connection, args.benchmark_database, rows=args.rows,
+                                batch_size=args.batch_size, keep=args.keep)
+    finally:
+        connection.close()
+
+    for mode, result in results.items():
+        logger.info(f"  {mode:14s} {result['rows']:6d} rows in {result['seconds']:6.2f}s "
+                    f"→ {result['rows_per_sec']:8.0f} rows/s")
+    speedup = results['row_at_a_time']['seconds'] / results['bulk']['seconds']
+    logger.info(f"✓ Bulk upserts {speedup:.1f}x faster")
+
+
+if __name__ == '__main__':
+    main()
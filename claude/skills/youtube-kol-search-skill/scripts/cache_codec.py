@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Compact binary codec for Redis cache entries
+
+Redis runs with --maxmemory 512mb / allkeys-lru (assets/docker-compose.yml),
+so every byte of a cached channel is a byte taken from other channels.
+json.dumps repeats every field name in every entry (10 videos per stats
+entry) and prints numbers as text. BinaryCodec instead writes
+
+- msgpack (the msgpack package; a built-in pure-Python packer writes the
+  same format but is slower than json, so see default_codec)
+- with field interning: known field names (FIELDS) become small integers
+- and compression of entries above compress_threshold bytes (zstd when the
+  zstandard package is installed, else zlib), kept only when it is smaller
+
+Without the msgpack package, default_codec() uses JSONCodec(compression='zlib')
+instead: C-level json plus zlib for large entries keeps most of the size win
+without the pure-Python packer's decode cost.
+
+Every binary entry starts with a format byte (0x01-0x04), which valid JSON
+never does, so decode() also reads entries written with json.dumps and a
+rollout needs no cache flush.
+
+FIELDS is append-only: entries store the position of a name, so never
+reorder or remove names. Cached values must use string keys.
+
+Usage:
+    python cache_codec.py [--channels 500]         # sample from the fake YouTube API
+    python cache_codec.py --input channels.json    # youtube_collector.py --output file
+"""
+
+import argparse
+import json
+import logging
+import struct
+import time
+import zlib
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+try:
+    import msgpack
+except ImportError:  # built-in packer below writes the same format
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# append-only (the index is what gets stored)
+FIELDS = (
+    # channel info (youtube_collector.parse_channel)
+    'channel_id', 'channel_title', 'channel_url', 'subscriber_count', 'description',
+    'custom_url', 'thumbnail_url', 'uploads_playlist_id', 'recent_videos',
+    # videos (youtube_collector.parse_video)
+    'video_id', 'title', 'view_count', 'like_count', 'comment_count', 'engagement_rate', 'published_at',
+    # channels / channel_video_stats columns
+    'detected_language', 'language_confidence', 'status', 'video_count',
+    'avg_view_count', 'avg_like_count', 'avg_comment_count', 'avg_engagement_rate',
+    'has_outliers', 'outlier_video_ids', 'last_updated',
+)
+FIELD_CODES = {name: code for code, name in enumerate(FIELDS)}
+
+FORMAT_MSGPACK = 0x01
+FORMAT_ZLIB = 0x02
+FORMAT_ZSTD = 0x03
+FORMAT_JSON_ZLIB = 0x04
+
+COMPRESS_THRESHOLD = 512  # bytes of msgpack / JSON; smaller entries rarely shrink
+
+
+# --- msgpack subset (nil, bool, int, float, str, bin, array, map) ---
+
+def _pack(value, out: bytearray):
+    if value is None:
+        out.append(0xc0)
+    elif value is True:
+        out.append(0xc3)
+    elif value is False:
+        out.append(0xc2)
+    elif isinstance(value, int):
+        if 0 <= value < 0x80:
+            out.append(value)
+        elif -32 <= value < 0:
+            out.append(value & 0xff)
+        elif value >= 0:
+            for limit, code, fmt in ((0xff, 0xcc, '>B'), (0xffff, 0xcd, '>H'),
+                                     (0xffffffff, 0xce, '>I'), (0xffffffffffffffff, 0xcf, '>Q')):
+                if value <= limit:
+                    out.append(code)
+                    out += struct.pack(fmt, value)
+                    break
+            else:
+                raise OverflowError(f"Integer too large for msgpack: {value}")
+        else:
+            for limit, code, fmt in ((-0x80, 0xd0, '>b'), (-0x8000, 0xd1, '>h'),
+                                     (-0x80000000, 0xd2, '>i'), (-0x8000000000000000, 0xd3, '>q')):
+                if value >= limit:
+                    out.append(code)
+                    out += struct.pack(fmt, value)
+                    break
+            else:
+                raise OverflowError(f"Integer too small for msgpack: {value}")
+    elif isinstance(value, float):
+        out.append(0xcb)
+        out += struct.pack('>d', value)
+    elif isinstance(value, str):
+        data = value.encode('utf-8')
+        _pack_length(len(data), out, 0xa0, 31, (0xd9, 0xda, 0xdb))
+        out += data
+    elif isinstance(value, (bytes, bytearray)):
+        _pack_length(len(value), out, None, 0, (0xc4, 0xc5, 0xc6))
+        out += value
+    elif isinstance(value, (list, tuple)):
+        _pack_length(len(value), out, 0x90, 15, (None, 0xdc, 0xdd))
+        for item in value:
+            _pack(item, out)
+    elif isinstance(value, dict):
+        _pack_length(len(value), out, 0x80, 15, (None, 0xde, 0xdf))
+        for key, item in value.items():
+            _pack(key, out)
+            _pack(item, out)
+    else:
+        raise TypeError(f"Cannot pack {type(value).__name__}")
+
+
+def _pack_length(length: int, out: bytearray, fix: int, fix_max: int, codes: tuple):
+    """fix-size header, else 8/16/32-bit length (None = width not defined for the type)"""
+    if fix is not None and length <= fix_max:
+        out.append(fix | length)
+        return
+    for code, limit, fmt in zip(codes, (0xff, 0xffff, 0xffffffff), ('>B', '>H', '>I')):
+        if code is not None and length <= limit:
+            out.append(code)
+            out += struct.pack(fmt, length)
+            return
+    raise OverflowError(f"Length too large for msgpack: {length}")
+
+
+_FIXED = {
+    0xcc: '>B', 0xcd: '>H', 0xce: '>I', 0xcf: '>Q',
+    0xd0: '>b', 0xd1: '>h', 0xd2: '>i', 0xd3: '>q',
+    0xca: '>f', 0xcb: '>d',
+}
+_LENGTHS = {  # code → (length format, kind)
+    0xd9: ('>B', 'str'), 0xda: ('>H', 'str'), 0xdb: ('>I', 'str'),
+    0xc4: ('>B', 'bin'), 0xc5: ('>H', 'bin'), 0xc6: ('>I', 'bin'),
+    0xdc: ('>H', 'array'), 0xdd: ('>I', 'array'),
+    0xde: ('>H', 'map'), 0xdf: ('>I', 'map'),
+}
+
+
+def _unpack(data: bytes, pos: int) -> tuple:
+    """(value, next position)"""
+    code = data[pos]
+    pos += 1
+    if code < 0x80:
+        return code, pos
+    if code >= 0xe0:
+        return code - 0x100, pos
+    if 0xa0 <= code <= 0xbf:
+        kind, length = 'str', code & 0x1f
+    elif 0x90 <= code <= 0x9f:
+        kind, length = 'array', code & 0x0f
+    elif 0x80 <= code <= 0x8f:
+        kind, length = 'map', code & 0x0f
+    elif code == 0xc0:
+        return None, pos
+    elif code in (0xc2, 0xc3):
+        return code == 0xc3, pos
+    elif code in _FIXED:
+        fmt = _FIXED[code]
+        return struct.unpack_from(fmt, data, pos)[0], pos + struct.calcsize(fmt)
+    elif code in _LENGTHS:
+        fmt, kind = _LENGTHS[code]
+        length = struct.unpack_from(fmt, data, pos)[0]
+        pos += struct.calcsize(fmt)
+    else:
+        raise ValueError(f"Unsupported msgpack type 0x{code:02x}")
+
+    if kind == 'str':
+        return data[pos:pos + length].decode('utf-8'), pos + length
+    if kind == 'bin':
+        return bytes(data[pos:pos + length]), pos + length
+    if kind == 'array':
+        items = []
+        for _ in range(length):
+            item, pos = _unpack(data, pos)
+            items.append(item)
+        return items, pos
+    result = {}
+    for _ in range(length):
+        key, pos = _unpack(data, pos)
+        result[key], pos = _unpack(data, pos)
+    return result, pos
+
+
+def packb(value) -> bytes:
+    if msgpack is not None:
+        return msgpack.packb(value, use_bin_type=True)
+    out = bytearray()
+    _pack(value, out)
+    return bytes(out)
+
+
+def unpackb(data: bytes):
+    if msgpack is not None:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    value, _ = _unpack(data, 0)
+    return value
+
+
+# --- field interning ---
+
+def intern_fields(value):
+    if isinstance(value, dict):
+        return {FIELD_CODES.get(key, key): intern_fields(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [intern_fields(item) for item in value]
+    return value
+
+
+def extern_fields(value):
+    if isinstance(value, dict):
+        return {FIELDS[key] if isinstance(key, int) else key: extern_fields(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [extern_fields(item) for item in value]
+    return value
+
+
+# --- codecs ---
+
+def decode(data):
+    """Any cache entry: binary (format byte) or legacy JSON"""
+    if data is None:
+        return None
+    if isinstance(data, str):
+        return json.loads(data)
+    fmt = data[0]
+    if fmt == FORMAT_MSGPACK:
+        payload = data[1:]
+    elif fmt == FORMAT_ZLIB:
+        payload = zlib.decompress(data[1:])
+    elif fmt == FORMAT_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Cache entry is zstd-compressed; install zstandard")
+        payload = zstandard.ZstdDecompressor().decompress(data[1:])
+    elif fmt == FORMAT_JSON_ZLIB:
+        return json.loads(zlib.decompress(data[1:]))
+    else:
+        return json.loads(data)
+    return extern_fields(unpackb(payload))
+
+
+class JSONCodec:
+    """json.dumps entries (the original format), optionally zlib-compressed above compress_threshold"""
+
+    def __init__(self, compression: str = 'none', compress_threshold: int = COMPRESS_THRESHOLD, level: int = 3):
+        if compression not in ('zlib', 'none'):
+            raise ValueError(f"Unknown compression: {compression}")
+        self.compression = compression
+        self.compress_threshold = compress_threshold
+        self.level = level
+
+    @property
+    def name(self) -> str:
+        return 'json' if self.compression == 'none' else f"json+{self.compression}"
+
+    def encode(self, value) -> bytes:
+        payload = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if self.compression == 'zlib' and len(payload) >= self.compress_threshold:
+            compressed = zlib.compress(payload, self.level)
+            if len(compressed) < len(payload):
+                return bytes((FORMAT_JSON_ZLIB,)) + compressed
+        return payload
+
+    def decode(self, data):
+        return decode(data)
+
+
+class BinaryCodec:
+    """msgpack + field interning, compressed above compress_threshold bytes"""
+
+    def __init__(self, compress_threshold: int = COMPRESS_THRESHOLD, compression: str = None, level: int = 3):
+        if compression is None:
+            compression = 'zstd' if zstandard is not None else 'zlib'
+        if compression == 'zstd' and zstandard is None:
+            raise RuntimeError("zstd compression needs the zstandard package")
+        if compression not in ('zstd', 'zlib', 'none'):
+            raise ValueError(f"Unknown compression: {compression}")
+        self.compression = compression
+        self.compress_threshold = compress_threshold
+        self.level = level
+        self._zstd = zstandard.ZstdCompressor(level=level) if compression == 'zstd' else None
+
+    @property
+    def name(self) -> str:
+        return 'msgpack' if self.compression == 'none' else f"msgpack+{self.compression}"
+
+    def encode(self, value) -> bytes:
+        payload = packb(intern_fields(value))
+        if self.compression != 'none' and len(payload) >= self.compress_threshold:
+            if self._zstd is not None:
+                compressed, fmt = self._zstd.compress(payload), FORMAT_ZSTD
+            else:
+                compressed, fmt = zlib.compress(payload, self.level), FORMAT_ZLIB
+            if len(compressed) < len(payload):
+                return bytes((fmt,)) + compressed
+        return bytes((FORMAT_MSGPACK,)) + payload
+
+    def decode(self, data):
+        return decode(data)
+
+
+def default_codec():
+    """BinaryCodec with the msgpack package; otherwise zlib-compressed JSON"""
+    codec = BinaryCodec() if msgpack is not None else JSONCodec(compression='zlib')
+    logger.info(f"Cache codec: {codec.name}")
+    return codec
+
+
+# --- measurement ---
+
+def sample_entries(channels: dict) -> list:
+    """(kind, value) cache entries the way collection_phase caches them"""
+    entries = []
+    for channel in channels.values():
+        info = {key: value for key, value in channel.items() if key != 'recent_videos'}
+        entries.append(('info', info))
+        entries.append(('stats', channel.get('recent_videos', [])))
+    return entries
+
+
+def collect_sample(num_channels: int) -> dict:
+    """Channels with recent videos from an in-process fake YouTube API"""
+    from fake_youtube_server import FakeYouTubeServer
+    from youtube_collector import YouTubeClient, collection_phase
+
+    with FakeYouTubeServer(num_channels=num_channels, latency_scale=0.0, daily_quota=10_000_000) as server:
+        client = YouTubeClient(['sample-key'], base_url=server.base_url)
+        channel_ids = list(server.data.channel_order)
+        return collection_phase(client, channel_ids)
+
+
+def measure(codec, entries: list, repeat: int = 3) -> dict:
+    """bytes/entry and best-of-repeat encode/decode µs/entry, per kind and overall"""
+    encoded = [codec.encode(value) for _, value in entries]
+    for (_, value), data in zip(entries, encoded):
+        if codec.decode(data) != value:
+            raise AssertionError(f"{codec.name} does not round-trip")
+
+    encode_s = decode_s = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _, value in entries:
+            codec.encode(value)
+        encode_s = min(encode_s, time.perf_counter() - started)
+        started = time.perf_counter()
+        for data in encoded:
+            codec.decode(data)
+        decode_s = min(decode_s, time.perf_counter() - started)
+
+    sizes = {}
+    for (kind, _), data in zip(entries, encoded):
+        sizes.setdefault(kind, []).append(len(data))
+    result = {f"{kind}_bytes": sum(values) / len(values) for kind, values in sizes.items()}
+    result.update(
+        bytes=sum(len(data) for data in encoded) / len(entries),
+        encode_us=encode_s / len(entries) * 1e6,
+        decode_us=decode_s / len(entries) * 1e6,
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare cache codecs on a sample dataset')
+    parser.add_argument('--input', help='Channels JSON (youtube_collector.py --output)')
+    parser.add_argument('--channels', type=int, default=500, help='Sample size from the fake YouTube API')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing runs (best is reported)')
+
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, encoding='utf-8') as f:
+            channels = json.load(f)
+    else:
+        channels = collect_sample(args.channels)
+    entries = sample_entries(channels)
+
+    codecs = [JSONCodec(), JSONCodec(compression='zlib'),
+              BinaryCodec(compression='none'), BinaryCodec(compression='zlib')]
+    if zstandard is not None:
+        codecs.append(BinaryCodec(compression='zstd'))
+
+    logger.info(f"✓ {len(channels)} channels, {len(entries)} entries "
+                f"(msgpack: {'package' if msgpack else 'built-in'}, zstd: {'yes' if zstandard else 'not installed'})")
+    logger.info(f"  {'codec':<14} {'info B':>8} {'stats B':>9} {'B/entry':>9} {'ratio':>6} "
+                f"{'enc µs':>8} {'dec µs':>8}")
+    baseline = None
+    for codec in codecs:
+        result = measure(codec, entries, args.repeat)
+        baseline = baseline or result['bytes']
+        logger.info(f"  {codec.name:<14} {result.get('info_bytes', 0):8.0f} {result.get('stats_bytes', 0):9.0f} "
+                    f"{result['bytes']:9.0f} {baseline / result['bytes']:5.1f}x "
+                    f"{result['encode_us']:8.1f} {result['decode_us']:8.1f}")
+
+
+if __name__ == '__main__':
+    main()
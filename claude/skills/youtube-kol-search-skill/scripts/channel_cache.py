@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Redis channel cache with a per-channel key index
+
+Cache entries live under channel:{id}:{kind} (info, stats, ...). Every write
+also adds the key to the channel's index set channel:{id}:keys, so
+invalidation never needs KEYS/SCAN over the whole keyspace:
+
+- invalidate(channel_id): one script call that UNLINKs the indexed keys and
+  the index itself
+- invalidate_many(channel_ids): the same script over batches of channels,
+  all batches sent in one pipeline (one round-trip for a whole task)
+- invalidate_task(connection, task_id): every channel of a task, e.g. on
+  "Full re-search"
+
+Keys written before the index existed are picked up once with
+rebuild_index(), which walks the keyspace with SCAN (incremental, never
+blocks Redis the way KEYS does).
+
+Values are stored with a cache_codec codec (compact binary by default;
+entries written as JSON are still read).
+
+The invalidation script touches keys it is not passed in KEYS, which is fine
+on a single Redis (the docker-compose setup) but not on Redis Cluster.
+
+ReadThroughCache puts a bounded in-process LRU (short TTLs) in front of the
+store for lookups during collection and list rendering:
+
+    local LRU → Redis MGET for the misses → loader(missing_ids) for the rest
+
+Concurrent misses on the same channel are coalesced (single-flight): one
+caller runs the loader, the others wait for its result instead of calling
+the YouTube API again. Hits are counted per tier (local, redis, loader).
+
+Usage:
+    python channel_cache.py --redis-url redis://localhost:6379/0 --channel UCxxxx [--channel ...]
+    python channel_cache.py --redis-url URL --password PASS --task-id TASK
+    python channel_cache.py --redis-url URL --rebuild-index
+"""
+
+import argparse
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from cache_codec import default_codec
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# kind → TTL in seconds (None = permanent), see "Caching Strategy" in SKILL.md
+KIND_TTLS = {
+    'info': None,
+    'stats': 86400,
+}
+INVALIDATE_BATCH = 500  # channels per script call
+# in-process tier: short TTLs bound staleness after another process invalidates
+LOCAL_TTLS = {
+    'info': 300,
+    'stats': 60,
+}
+LOCAL_SIZE = 10000
+
+# KEYS: index sets; returns the number of cache keys removed
+INVALIDATE_SCRIPT = """
+local removed = 0
+for _, index in ipairs(KEYS) do
+    local members = redis.call('SMEMBERS', index)
+    for i = 1, #members, 500 do
+        removed = removed + redis.call('UNLINK', unpack(members, i, math.min(i + 499, #members)))
+    end
+    redis.call('UNLINK', index)
+end
+return removed
+"""
+
+
+def cache_key(channel_id: str, kind: str) -> str:
+    return f"channel:{channel_id}:{kind}"
+
+
+def index_key(channel_id: str) -> str:
+    return f"channel:{channel_id}:keys"
+
+
+def _ttl(kind: str, ttl):
+    return KIND_TTLS.get(kind) if ttl is None else ttl
+
+
+class MemoryChannelCache:
+    """In-process stand-in with the same interface (single process, offline runs)"""
+
+    def __init__(self, codec=None):
+        self.codec = codec or default_codec()
+        self._lock = threading.Lock()
+        self._values = {}  # key → (encoded value, expires_at or None)
+        self._index = {}
+
+    def set(self, channel_id: str, kind: str, value, ttl: int = None):
+        self.set_many([(channel_id, kind, value, ttl)])
+
+    def set_many(self, items: list):
+        """items: (channel_id, kind, value[, ttl])"""
+        with self._lock:
+            for channel_id, kind, value, *ttl in items:
+                ttl = _ttl(kind, ttl[0] if ttl else None)
+                key = cache_key(channel_id, kind)
+                self._values[key] = (self.codec.encode(value), time.monotonic() + ttl if ttl else None)
+                self._index.setdefault(channel_id, set()).add(key)
+
+    def get(self, channel_id: str, kind: str):
+        return self.get_many([channel_id], kind)[0]
+
+    def get_many(self, channel_ids: list, kind: str) -> list:
+        now = time.monotonic()
+        with self._lock:
+            entries = [self._values.get(cache_key(cid, kind)) for cid in channel_ids]
+        return [self.codec.decode(value) if value and (expires is None or expires > now) else None
+                for value, expires in (entry or (None, None) for entry in entries)]
+
+    def invalidate(self, channel_id: str) -> int:
+        return self.invalidate_many([channel_id])
+
+    def invalidate_many(self, channel_ids: list) -> int:
+        removed = 0
+        with self._lock:
+            for channel_id in channel_ids:
+                for key in self._index.pop(channel_id, ()):
+                    removed += self._values.pop(key, None) is not None
+        return removed
+
+
+class RedisChannelCache:
+    """Channel cache on Redis; writes maintain channel:{id}:keys, invalidation uses it
+
+    Values are bytes, so the client must not use decode_responses=True.
+    """
+
+    def __init__(self, redis_client, batch_size: int = INVALIDATE_BATCH, codec=None):
+        self.redis = redis_client
+        self.codec = codec or default_codec()
+        self.batch_size = batch_size
+        self._invalidate = redis_client.register_script(INVALIDATE_SCRIPT)
+
+    def set(self, channel_id: str, kind: str, value, ttl: int = None):
+        self.set_many([(channel_id, kind, value, ttl)])
+
+    def set_many(self, items: list):
+        """items: (channel_id, kind, value[, ttl]); one pipelined round-trip"""
+        pipe = self.redis.pipeline(transaction=False)
+        for channel_id, kind, value, *ttl in items:
+            key = cache_key(channel_id, kind)
+            pipe.set(key, self.codec.encode(value), ex=_ttl(kind, ttl[0] if ttl else None))
+            pipe.sadd(index_key(channel_id), key)
+        pipe.execute()
+
+    def get(self, channel_id: str, kind: str):
+        return self.get_many([channel_id], kind)[0]
+
+    def get_many(self, channel_ids: list, kind: str) -> list:
+        if not channel_ids:
+            return []
+        values = self.redis.mget([cache_key(cid, kind) for cid in channel_ids])
+        return [self.codec.decode(value) if value is not None else None for value in values]
+
+    def invalidate(self, channel_id: str) -> int:
+        return int(self._invalidate(keys=[index_key(channel_id)]))
+
+    def invalidate_many(self, channel_ids: list) -> int:
+        """All channels' keys in one round-trip (one script call per batch_size channels)"""
+        channel_ids = list(dict.fromkeys(channel_ids))
+        if not channel_ids:
+            return 0
+        pipe = self.redis.pipeline(transaction=False)
+        for start in range(0, len(channel_ids), self.batch_size):
+            batch = channel_ids[start:start + self.batch_size]
+            self._invalidate(keys=[index_key(cid) for cid in batch], client=pipe)
+        return sum(int(removed) for removed in pipe.execute())
+
+    def rebuild_index(self, count: int = 1000) -> int:
+        """Index existing channel:{id}:{kind} keys (SCAN, pipelined SADD per page)"""
+        indexed = 0
+        pipe = self.redis.pipeline(transaction=False)
+        for key in self.redis.scan_iter(match='channel:*', count=count):
+            key = key.decode() if isinstance(key, bytes) else key
+            _, channel_id, kind = key.split(':', 2)
+            if kind == 'keys':
+                continue
+            pipe.sadd(index_key(channel_id), key)
+            indexed += 1
+            if indexed % count == 0:
+                pipe.execute()
+        pipe.execute()
+        return indexed
+
+
+class TierStats:
+    """Per-tier lookup counters (local / redis hits, loader = upstream fetches)"""
+
+    TIERS = ('local', 'redis', 'loader')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = dict.fromkeys(self.TIERS, 0)
+        self.lookups = 0
+        self.coalesced = 0  # misses served by another caller's in-flight load
+
+    def record(self, lookups: int = 0, coalesced: int = 0, **hits):
+        with self._lock:
+            self.lookups += lookups
+            self.coalesced += coalesced
+            for tier, count in hits.items():
+                self.hits[tier] += count
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            total = self.lookups or 1
+            stats = {f"{tier}_hits": count for tier, count in self.hits.items()}
+            stats.update({f"{tier}_hit_rate": round(count / total, 3) for tier, count in self.hits.items()})
+            stats.update(lookups=self.lookups, coalesced=self.coalesced)
+        return stats
+
+
+class LRUCache:
+    """Bounded in-process cache with per-entry expiry"""
+
+    def __init__(self, maxsize: int = LOCAL_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # key → (value, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, ttl: float):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ReadThroughCache:
+    """Local LRU → store (MGET) → loader, with single-flight loads
+
+    loader(channel_ids) returns {channel_id: value} for the channels it found
+    (e.g. fetch_channels); missing channels are not cached. Returned values
+    are shared with the local tier, so treat them as read-only.
+    """
+
+    def __init__(self, store, local_size: int = LOCAL_SIZE, local_ttls: dict = None):
+        self.store = store
+        self.local = LRUCache(local_size)
+        self.local_ttls = dict(LOCAL_TTLS, **(local_ttls or {}))
+        self.stats = TierStats()
+        self._flights = {}  # (kind, channel_id) → Future
+        self._lock = threading.Lock()
+
+    def get(self, channel_id: str, kind: str, loader):
+        return self.get_many([channel_id], kind, loader).get(channel_id)
+
+    def get_many(self, channel_ids: list, kind: str, loader) -> dict:
+        channel_ids = list(dict.fromkeys(channel_ids))
+        found = {}
+        missing = []
+        for channel_id in channel_ids:
+            value = self.local.get((kind, channel_id))
+            if value is None:
+                missing.append(channel_id)
+            else:
+                found[channel_id] = value
+        local_hits = len(found)
+
+        redis_hits = 0
+        if missing:
+            for channel_id, value in zip(missing, self.store.get_many(missing, kind)):
+                if value is not None:
+                    found[channel_id] = value
+                    self._remember(kind, channel_id, value)
+                    redis_hits += 1
+            missing = [cid for cid in missing if cid not in found]
+
+        loaded = coalesced = 0
+        if missing:
+            loaded, coalesced = self._load(missing, kind, loader, found)
+
+        self.stats.record(lookups=len(channel_ids), coalesced=coalesced,
+                          local=local_hits, redis=redis_hits, loader=loaded)
+        return {cid: found[cid] for cid in channel_ids if cid in found}
+
+    def invalidate(self, channel_ids: list) -> int:
+        """Drop channels from both tiers (other processes' local tiers expire by TTL)"""
+        for channel_id in channel_ids:
+            for kind in self.local_ttls:
+                self.local.pop((kind, channel_id))
+        return self.store.invalidate_many(channel_ids)
+
+    def _remember(self, kind: str, channel_id: str, value):
+        self.local.put((kind, channel_id), value, self.local_ttls.get(kind, LOCAL_TTLS['stats']))
+
+    def _load(self, channel_ids: list, kind: str, loader, found: dict) -> tuple:
+        """Load what nobody else is loading, wait for the rest; returns (loaded, coalesced)"""
+        own, waiting = {}, {}
+        with self._lock:
+            for channel_id in channel_ids:
+                flight = self._flights.get((kind, channel_id))
+                if flight is None:
+                    own[channel_id] = self._flights[(kind, channel_id)] = Future()
+                else:
+                    waiting[channel_id] = flight
+
+        loaded = 0
+        if own:
+            try:
+                values = loader(list(own)) or {}
+                values = {cid: value for cid, value in values.items() if cid in own and value is not None}
+                if values:
+                    self.store.set_many([(cid, kind, value) for cid, value in values.items()])
+                for channel_id, value in values.items():
+                    self._remember(kind, channel_id, value)
+                found.update(values)
+                loaded = len(values)
+                for channel_id, flight in own.items():
+                    flight.set_result(values.get(channel_id))
+            except BaseException as e:
+                for flight in own.values():
+                    if not flight.done():
+                        flight.set_exception(e)
+                raise
+            finally:
+                with self._lock:
+                    for channel_id in own:
+                        self._flights.pop((kind, channel_id), None)
+
+        for channel_id, flight in waiting.items():
+            value = flight.result()
+            if value is not None:
+                found[channel_id] = value
+        return loaded, len(waiting)
+
+
+def task_channel_ids(connection, task_id: str) -> list:
+    """Channels of a task (idx_task_channel range scan)"""
+    cursor = connection.cursor()
+    cursor.execute("SELECT channel_id FROM channel_video_stats WHERE task_id = %s", (task_id,))
+    channel_ids = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    return channel_ids
+
+
+def invalidate_task(cache, connection, task_id: str) -> int:
+    """Drop the cache of every channel a task found (before a full re-search refreshes them)"""
+    return cache.invalidate_many(task_channel_ids(connection, task_id))
+
+
+def main():
+    import redis
+
+    parser = argparse.ArgumentParser(description='Invalidate cached channel data')
+    parser.add_argument('--redis-url', required=True, help='Redis URL (e.g. redis://localhost:6379/0)')
+    parser.add_argument('--channel', action='append', default=[], help='Channel ID (repeatable)')
+    parser.add_argument('--task-id', help='Invalidate every channel of this task (needs MySQL)')
+    parser.add_argument('--rebuild-index', action='store_true', help='Index keys written before the index existed')
+    parser.add_argument('--host', default='localhost', help='MySQL host')
+    parser.add_argument('--port', type=int, default=3306, help='MySQL port')
+    parser.add_argument('--user', default='root', help='MySQL user')
+    parser.add_argument('--password', help='MySQL password (with --task-id)')
+    parser.add_argument('--database', default='youtube_kol_db', help='Database name')
+
+    args = parser.parse_args()
+
+    cache = RedisChannelCache(redis.Redis.from_url(args.redis_url))
+
+    if args.rebuild_index:
+        logger.info(f"✓ Indexed {cache.rebuild_index()} cache keys")
+
+    channel_ids = list(args.channel)
+    if args.task_id:
+        import mysql.connector
+
+        if not args.password:
+            parser.error('--task-id needs --password')
+        connection = mysql.connector.connect(host=args.host, port=args.port, user=args.user,
+                                             password=args.password, database=args.database)
+        try:
+            channel_ids += task_channel_ids(connection, args.task_id)
+        finally:
+            connection.close()
+
+    if channel_ids:
+        started = time.perf_counter()
+        removed = cache.invalidate_many(channel_ids)
+        logger.info(f"✓ Removed {removed} keys of {len(set(channel_ids))} channels "
+                    f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+    elif not args.rebuild_index:
+        parser.error('nothing to do (use --channel, --task-id or --rebuild-index)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Vectorized channel video metrics
+
+Computes the channel_video_stats values of many channels at once:
+
+- avg_view_count / avg_like_count / avg_comment_count (integer averages)
+- avg_engagement_rate: mean of (likes + comments) / views per video
+- has_outliers / outlier_videos: videos whose views fall outside
+  [Q1 - 1.5×IQR, Q3 + 1.5×IQR] of their channel (channels with at least
+  MIN_OUTLIER_VIDEOS videos; quartiles use np.percentile's linear method)
+
+Channels are rows of (channels × videos) arrays padded to the longest video
+list, so a batch of thousands of channels is a handful of NumPy operations
+instead of a Python loop per channel. bulk_writer.stats_row and the synthetic
+dataset use it; recompute_all() re-derives the stored stats of every task
+snapshot in one streaming pass over channel_videos after a formula change.
+
+Usage:
+    python channel_metrics.py --password PASS [--task-id TASK] [--dry-run]   # recompute stored stats
+    python channel_metrics.py --benchmark [--channels 20000]                 # vectorized vs per-channel loop
+"""
+
+import argparse
+import json
+import logging
+import time
+from itertools import groupby
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+IQR_FACTOR = 1.5
+MIN_OUTLIER_VIDEOS = 4  # quartiles of fewer videos flag nothing meaningful
+RECOMPUTE_BATCH = 5000  # channel snapshots per vectorized batch and upsert
+
+COUNT_FIELDS = ('view_count', 'like_count', 'comment_count')
+METRIC_COLUMNS = ('avg_view_count', 'avg_like_count', 'avg_comment_count', 'avg_engagement_rate',
+                  'has_outliers', 'outlier_videos')
+
+# every stored snapshot in primary-key order, so one channel's videos are adjacent
+SNAPSHOT_VIDEOS_SQL = """
+    SELECT cv.task_id, cv.task_date, cv.channel_id, cv.video_id, v.title,
+           cv.view_count, cv.like_count, cv.comment_count
+    FROM channel_videos cv
+    JOIN videos v ON v.video_id = cv.video_id
+    {where}
+    ORDER BY cv.task_id, cv.channel_id, cv.position
+"""
+
+LEGACY_SNAPSHOTS_SQL = """
+    SELECT vs.task_id, vs.task_date, vs.channel_id, vs.recent_videos
+    FROM channel_video_stats vs
+    WHERE vs.recent_videos IS NOT NULL
+      AND NOT EXISTS (SELECT 1 FROM channel_videos cv
+                      WHERE cv.task_id = vs.task_id AND cv.channel_id = vs.channel_id)
+      {task_filter}
+"""
+
+
+def pad(video_lists: list, fields: tuple = COUNT_FIELDS) -> tuple:
+    """Ragged per-channel video dicts → ([int64 (channels, width) array per field], counts)"""
+    counts = np.fromiter((len(videos) for videos in video_lists), dtype=np.int64, count=len(video_lists))
+    width = int(counts.max()) if len(counts) else 0
+    total = int(counts.sum())
+    flat = np.fromiter((video.get(field) or 0 for videos in video_lists for video in videos for field in fields),
+                       dtype=np.int64, count=total * len(fields)).reshape(total, len(fields))
+
+    rows = np.repeat(np.arange(len(counts)), counts)
+    positions = np.arange(len(flat)) - np.repeat(np.cumsum(counts) - counts, counts)
+    arrays = []
+    for column in range(len(fields)):
+        array = np.zeros((len(counts), width), dtype=np.int64)
+        array[rows, positions] = flat[:, column]
+        arrays.append(array)
+    return arrays, counts
+
+
+def quartiles(values: np.ndarray, counts: np.ndarray) -> tuple:
+    """Q1 and Q3 of each row's first counts[i] values (np.percentile, method='linear')"""
+    n, width = values.shape
+    if width == 0:
+        return np.zeros(n), np.zeros(n)
+    valid = np.arange(width)[None, :] < counts[:, None]
+    ordered = np.sort(np.where(valid, values.astype(np.float64), np.inf), axis=1)
+
+    result = []
+    for q in (0.25, 0.75):
+        position = q * np.maximum(counts - 1, 0)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, np.maximum(counts - 1, 0))
+        a = np.take_along_axis(ordered, lower[:, None], axis=1)[:, 0]
+        b = np.take_along_axis(ordered, upper[:, None], axis=1)[:, 0]
+        t = position - lower
+        with np.errstate(invalid='ignore'):
+            # NumPy's lerp: stable from both ends
+            value = np.where(t >= 0.5, b - (b - a) * (1 - t), a + (b - a) * t)
+        result.append(np.where(counts > 0, value, 0.0))
+    return tuple(result)
+
+
+def compute(views: np.ndarray, likes: np.ndarray, comments: np.ndarray, counts: np.ndarray = None) -> dict:
+    """Per-channel aggregates of (channels, width) arrays; counts = videos per row (default: width)"""
+    n, width = views.shape
+    if counts is None:
+        counts = np.full(n, width, dtype=np.int64)
+    valid = np.arange(width)[None, :] < counts[:, None]
+    divisor = np.maximum(counts, 1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        engagement = np.where(views > 0, (likes + comments) / np.maximum(views, 1), 0.0)
+
+    q1, q3 = quartiles(views, counts)
+    spread = IQR_FACTOR * (q3 - q1)
+    eligible = valid & (counts >= MIN_OUTLIER_VIDEOS)[:, None]
+    high = eligible & (views > (q3 + spread)[:, None])
+    low = eligible & (views < (q1 - spread)[:, None])
+
+    return {
+        'avg_view_count': np.where(valid, views, 0).sum(axis=1) // divisor,
+        'avg_like_count': np.where(valid, likes, 0).sum(axis=1) // divisor,
+        'avg_comment_count': np.where(valid, comments, 0).sum(axis=1) // divisor,
+        'avg_engagement_rate': np.where(valid, engagement, 0.0).sum(axis=1) / divisor,
+        'engagement': engagement,
+        'high': high,
+        'low': low,
+        'has_outliers': (high | low).any(axis=1),
+    }
+
+
+def outlier_positions(metrics: dict) -> dict:
+    """row → [(position, reason)] for rows with outliers (higher first, then lower)"""
+    positions = {}
+    for mask, reason in ((metrics['high'], 'significantly_higher'), (metrics['low'], 'significantly_lower')):
+        rows, columns = np.nonzero(mask)
+        for row, column in zip(rows.tolist(), columns.tolist()):
+            positions.setdefault(row, []).append((column, reason))
+    return positions
+
+
+def channel_stats(video_lists: list) -> list:
+    """channel_video_stats metric values for each channel's list of video dicts (parse_video shape)"""
+    if not video_lists:
+        return []
+    (views, likes, comments), counts = pad(video_lists)
+    metrics = compute(views, likes, comments, counts)
+
+    averages = np.stack([metrics['avg_view_count'], metrics['avg_like_count'],
+                         metrics['avg_comment_count']], axis=1).tolist()
+    engagement = metrics['avg_engagement_rate'].tolist()
+    outliers = outlier_positions(metrics)
+
+    return [{
+        'avg_view_count': averages[k][0],
+        'avg_like_count': averages[k][1],
+        'avg_comment_count': averages[k][2],
+        'avg_engagement_rate': engagement[k],
+        'has_outliers': int(k in outliers),
+        'outlier_videos': [
+            {'video_id': videos[p].get('video_id'), 'title': videos[p].get('title'),
+             'view_count': videos[p].get('view_count') or 0, 'reason': reason}
+            for p, reason in outliers.get(k, ())
+        ],
+    } for k, videos in enumerate(video_lists)]
+
+
+# ── recompute stored stats ────────────────────────────────────────────
+
+def upsert_sql(row_count: int) -> str:
+    """Multi-row upsert that only rewrites the metric columns of existing snapshots"""
+    columns = ('channel_id', 'task_id', 'task_date') + METRIC_COLUMNS
+    row = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    return (
+        f"INSERT INTO channel_video_stats ({', '.join(columns)}) VALUES "
+        + ', '.join([row] * row_count)
+        + " ON DUPLICATE KEY UPDATE "
+        + ', '.join(f"{c} = VALUES({c})" for c in METRIC_COLUMNS)
+    )
+
+
+def snapshots(connection, task_id: str = None):
+    """((task_id, task_date, channel_id), [video dicts]) for every stored snapshot"""
+    from excel_export import stream
+
+    where, params = ("WHERE cv.task_id = %s", (task_id,)) if task_id else ('', ())
+    rows = stream(connection, SNAPSHOT_VIDEOS_SQL.format(where=where), params)
+    for key, group in groupby(rows, key=lambda row: row[:3]):
+        yield key, [dict(zip(('video_id', 'title') + COUNT_FIELDS, row[3:])) for row in group]
+
+    task_filter, params = ("AND vs.task_id = %s", (task_id,)) if task_id else ('', ())
+    for task, task_date, channel_id, blob in stream(connection, LEGACY_SNAPSHOTS_SQL.format(task_filter=task_filter),
+                                                    params):
+        videos = json.loads(blob) if isinstance(blob, (str, bytes)) else blob
+        yield (task, task_date, channel_id), videos or []
+
+
+def recompute_all(connection, write_connection, task_id: str = None, dry_run: bool = False,
+                  batch_size: int = RECOMPUTE_BATCH) -> dict:
+    """Re-derive the metrics of every (or one task's) snapshot in one streaming pass
+
+    connection streams the snapshots (unbuffered), write_connection receives
+    the upserts, one per batch_size snapshots.
+    """
+    summary = {'snapshots': 0, 'with_outliers': 0, 'statements': 0}
+    cursor = None if dry_run else write_connection.cursor()
+
+    def flush(batch):
+        stats = channel_stats([videos for _, videos in batch])
+        summary['snapshots'] += len(batch)
+        summary['with_outliers'] += sum(s['has_outliers'] for s in stats)
+        if cursor is None:
+            return
+        values = []
+        for ((task, task_date, channel_id), _), s in zip(batch, stats):
+            values.extend((channel_id, task, task_date))
+            values.extend(json.dumps(s[c]) if c == 'outlier_videos' else s[c] for c in METRIC_COLUMNS)
+        cursor.execute(upsert_sql(len(batch)), values)
+        write_connection.commit()
+        summary['statements'] += 1
+
+    batch = []
+    try:
+        for snapshot in snapshots(connection, task_id):
+            batch.append(snapshot)
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+    finally:
+        if cursor is not None:
+            cursor.close()
+    return summary
+
+
+# ── benchmark ─────────────────────────────────────────────────────────
+
+def _python_stats(videos: list) -> dict:
+    """Baseline: one channel at a time in plain Python (same formulas)"""
+    count = len(videos) or 1
+    views = [v['view_count'] for v in videos]
+    ordered = sorted(views)
+
+    def percentile(q):
+        position = q * (len(ordered) - 1)
+        lower = int(position)
+        upper = min(lower + 1, len(ordered) - 1)
+        a, b, t = ordered[lower], ordered[upper], position - lower
+        return b - (b - a) * (1 - t) if t >= 0.5 else a + (b - a) * t
+
+    outliers = []
+    if len(videos) >= MIN_OUTLIER_VIDEOS:
+        q1, q3 = percentile(0.25), percentile(0.75)
+        spread = IQR_FACTOR * (q3 - q1)
+        outliers = [
+            {'video_id': v['video_id'], 'title': v['title'], 'view_count': v['view_count'], 'reason': reason}
+            for reason, test in (('significantly_higher', lambda x: x > q3 + spread),
+                                 ('significantly_lower', lambda x: x < q1 - spread))
+            for v in videos if test(v['view_count'])
+        ]
+    return {
+        'avg_view_count': sum(views) // count,
+        'avg_like_count': sum(v['like_count'] for v in videos) // count,
+        'avg_comment_count': sum(v['comment_count'] for v in videos) // count,
+        'avg_engagement_rate': sum((v['like_count'] + v['comment_count']) / v['view_count'] if v['view_count'] else 0.0
+                                   for v in videos) / count,
+        'has_outliers': int(bool(outliers)),
+        'outlier_videos': outliers,
+    }
+
+
+def run_benchmark(channels: int = 20000, videos_per_channel: int = 10, seed: int = 7) -> dict:
+    rng = np.random.default_rng(seed)
+    sizes = np.where(rng.random(channels) < 0.1, rng.integers(0, videos_per_channel, channels), videos_per_channel)
+    views = (rng.lognormal(8, 1.2, (channels, videos_per_channel))).astype(np.int64)
+    likes = (views * rng.beta(2, 60, views.shape)).astype(np.int64)
+    comments = (likes * rng.beta(2, 30, views.shape)).astype(np.int64)
+    video_lists = [
+        [{'video_id': f"v{i}x{p}", 'title': '', 'view_count': int(views[i, p]), 'like_count': int(likes[i, p]),
+          'comment_count': int(comments[i, p])} for p in range(sizes[i])]
+        for i in range(channels)
+    ]
+
+    started = time.perf_counter()
+    baseline = [_python_stats(videos) for videos in video_lists]
+    python_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    vectorized = channel_stats(video_lists)
+    numpy_s = time.perf_counter() - started
+
+    # arrays in, arrays out (recompute batches and the synthetic dataset skip the dicts)
+    (views_a, likes_a, comments_a), counts = pad(video_lists)
+    started = time.perf_counter()
+    compute(views_a, likes_a, comments_a, counts)
+    arrays_s = time.perf_counter() - started
+
+    mismatches = sum(
+        b['outlier_videos'] != v['outlier_videos']
+        or any(abs(b[c] - v[c]) > 1e-12 for c in METRIC_COLUMNS if c != 'outlier_videos')
+        for b, v in zip(baseline, vectorized)
+    )
+    return {'channels': channels, 'python_s': python_s, 'numpy_s': numpy_s, 'arrays_s': arrays_s,
+            'mismatches': mismatches, 'with_outliers': sum(s['has_outliers'] for s in vectorized)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Vectorized channel video metrics')
+    parser.add_argument('--host', default='localhost', help='MySQL host')
+    parser.add_argument('--port', type=int, default=3306, help='MySQL port')
+    parser.add_argument('--user', default='root', help='MySQL user')
+    parser.add_argument('--password', help='MySQL password (required to recompute)')
+    parser.add_argument('--database', default='youtube_kol_db', help='Database name')
+    parser.add_argument('--task-id', help='Only recompute this task')
+    parser.add_argument('--dry-run', action='store_true', help='Compute without writing')
+    parser.add_argument('--batch-size', type=int, default=RECOMPUTE_BATCH, help='Snapshots per batch')
+    parser.add_argument('--benchmark', action='store_true', help='Compare with a per-channel Python loop')
+    parser.add_argument('--channels', type=int, default=20000, help='Channels in the benchmark')
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        result = run_benchmark(args.channels)
+        logger.info(f"✓ {result['channels']} channels ({result['with_outliers']} with outliers)")
+        logger.info(f"  per-channel Python: {result['python_s']:.3f}s")
+        logger.info(f"  vectorized NumPy:   {result['numpy_s']:.3f}s "
+                    f"({result['python_s'] / result['numpy_s']:.1f}x, dicts in and out)")
+        logger.info(f"  compute() only:     {result['arrays_s']:.3f}s "
+                    f"({result['python_s'] / result['arrays_s']:.1f}x, arrays in and out)")
+        if result['mismatches']:
+            logger.error(f"❌ {result['mismatches']} channels differ from the baseline")
+            raise SystemExit(1)
+        return
+
+    if not args.password:
+        parser.error('--password is required to recompute stored stats')
+
+    import mysql.connector
+
+    def connect():
+        return mysql.connector.connect(host=args.host, port=args.port, user=args.user,
+                                       password=args.password, database=args.database)
+
+    reader, writer = connect(), connect()
+    try:
+        started = time.perf_counter()
+        summary = recompute_all(reader, writer, args.task_id, args.dry_run, args.batch_size)
+    finally:
+        reader.close()
+        writer.close()
+
+    prefix = '[dry-run] ' if args.dry_run else ''
+    logger.info(f"✓ {prefix}Recomputed {summary['snapshots']} snapshots "
+                f"({summary['with_outliers']} with outliers) in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Persisted per-keyword channel sets for incremental searches
+
+Every completed task stores (bulk_writer.store_task), per keyword, the set of
+channels it found as a sorted array of interned IDs (`channels.id`, the
+table's integer surrogate key), delta-encoded and zlib-compressed into
+`task_channel_sets`; 500 channels take about 1 KB.
+
+Incremental diffing is then set arithmetic on two arrays instead of
+re-reading `channels` and running NOT EXISTS subqueries:
+
+    new            = current - parent
+    still_present  = current & parent
+    disappeared    = parent - current
+
+`search_known_pages` uses the parent's set during the search phase and stops
+a stream once `patience` consecutive pages contain only known channels.
+
+Usage:
+    python channel_sets.py --password PASS --task-id NEW_TASK --keyword "PC cleanup"
+"""
+
+import argparse
+import logging
+import struct
+import zlib
+
+import numpy as np
+
+from youtube_collector import extract_channel_ids, search_pages
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+LOOKUP_CHUNK = 1000  # channel IDs per IN (...) lookup
+
+
+class ChannelIdSet:
+    """Immutable sorted set of interned channel IDs (uint32)"""
+
+    __slots__ = ('ids',)
+
+    def __init__(self, ids=()):
+        self.ids = np.unique(np.asarray(ids, dtype=np.uint32))
+
+    @classmethod
+    def _sorted(cls, ids: np.ndarray) -> 'ChannelIdSet':
+        result = cls.__new__(cls)
+        result.ids = ids
+        return result
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids.tolist())
+
+    def __contains__(self, value) -> bool:
+        i = np.searchsorted(self.ids, value)
+        return bool(i < len(self.ids) and self.ids[i] == value)
+
+    def __eq__(self, other):
+        return isinstance(other, ChannelIdSet) and np.array_equal(self.ids, other.ids)
+
+    def __or__(self, other):
+        return self._sorted(np.union1d(self.ids, other.ids))
+
+    def __and__(self, other):
+        return self._sorted(np.intersect1d(self.ids, other.ids, assume_unique=True))
+
+    def __sub__(self, other):
+        return self._sorted(np.setdiff1d(self.ids, other.ids, assume_unique=True))
+
+    def to_bytes(self) -> bytes:
+        """version byte + count + zlib(delta-encoded uint32, little-endian)"""
+        deltas = np.diff(self.ids, prepend=np.uint32(0)).astype('<u4')
+        return struct.pack('<BI', FORMAT_VERSION, len(self.ids)) + zlib.compress(deltas.tobytes(), 6)
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> 'ChannelIdSet':
+        version, count = struct.unpack_from('<BI', blob)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported channel set format {version}")
+        deltas = np.frombuffer(zlib.decompress(blob[5:]), dtype='<u4')
+        if len(deltas) != count:
+            raise ValueError("Corrupt channel set")
+        return cls._sorted(np.cumsum(deltas, dtype=np.uint32))
+
+
+def diff_sets(parent: ChannelIdSet, current: ChannelIdSet) -> dict:
+    return {
+        'new': current - parent,
+        'still_present': current & parent,
+        'disappeared': parent - current,
+    }
+
+
+def intern_channel_ids(connection, channel_ids: list) -> dict:
+    """channel_id → channels.id for channels already stored"""
+    interned = {}
+    cursor = connection.cursor()
+    for start in range(0, len(channel_ids), LOOKUP_CHUNK):
+        chunk = channel_ids[start:start + LOOKUP_CHUNK]
+        cursor.execute(
+            f"SELECT channel_id, id FROM channels WHERE channel_id IN ({', '.join(['%s'] * len(chunk))})",
+            tuple(chunk),
+        )
+        interned.update(cursor.fetchall())
+    cursor.close()
+    return interned
+
+
+def resolve_channel_ids(connection, id_set: ChannelIdSet) -> list:
+    """channels.id values → channel_id strings (sorted by id)"""
+    ids = id_set.ids.tolist()
+    resolved = {}
+    cursor = connection.cursor()
+    for start in range(0, len(ids), LOOKUP_CHUNK):
+        chunk = ids[start:start + LOOKUP_CHUNK]
+        cursor.execute(
+            f"SELECT id, channel_id FROM channels WHERE id IN ({', '.join(['%s'] * len(chunk))})",
+            tuple(chunk),
+        )
+        resolved.update(cursor.fetchall())
+    cursor.close()
+    return [resolved[i] for i in ids if i in resolved]
+
+
+def store_task_set(connection, task_id: str, keyword: str, channel_ids: list,
+                   parent_task_id: str = None) -> ChannelIdSet:
+    """Persist the channels a task found for one keyword (call once collection is stored)
+
+    An incremental task only found the channels new since its parent, so with
+    parent_task_id its set is parent | new.
+    """
+    interned = intern_channel_ids(connection, list(dict.fromkeys(channel_ids)))
+    id_set = ChannelIdSet(list(interned.values()))
+    if parent_task_id:
+        parent = load_task_set(connection, parent_task_id, keyword)
+        if parent is not None:
+            id_set = id_set | parent
+    cursor = connection.cursor()
+    cursor.execute("""
+        INSERT INTO task_channel_sets (task_id, keyword, channel_count, channel_set)
+        VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE channel_count = VALUES(channel_count),
+                                channel_set = VALUES(channel_set)
+    """, (task_id, keyword, len(id_set), id_set.to_bytes()))
+    connection.commit()
+    cursor.close()
+    return id_set
+
+
+def load_task_set(connection, task_id: str, keyword: str):
+    cursor = connection.cursor()
+    cursor.execute(
+        "SELECT channel_set FROM task_channel_sets WHERE task_id = %s AND keyword = %s",
+        (task_id, keyword),
+    )
+    row = cursor.fetchone()
+    cursor.close()
+    return ChannelIdSet.from_bytes(bytes(row[0])) if row else None
+
+
+def latest_task_set(connection, keyword: str, before_task_id: str = None) -> tuple:
+    """(task_id, ChannelIdSet) of the latest completed task with a set for keyword"""
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT s.task_id, s.channel_set
+        FROM task_channel_sets s
+        JOIN search_tasks t ON t.task_id = s.task_id
+        WHERE s.keyword = %s AND t.status = 'completed' AND t.task_id <> COALESCE(%s, '')
+        ORDER BY t.completed_at DESC
+        LIMIT 1
+    """, (keyword, before_task_id))
+    row = cursor.fetchone()
+    cursor.close()
+    if not row:
+        return None, None
+    return row[0], ChannelIdSet.from_bytes(bytes(row[1]))
+
+
+def search_known_pages(client, keyword: str, search_type: str, known: set,
+                       patience: int = 2, max_pages: int = None, stats: dict = None, **extra) -> list:
+    """Unseen channel IDs from one search stream, stopping after `patience` all-known pages
+
+    `known` holds channel_id strings (resolve_channel_ids of the parent set);
+    IDs found here are added to it. stats, if given, receives pages, the
+    first page's totalResults and whether the stream stopped early.
+    """
+    found = []
+    pages = quiet = total_results = 0
+    stopped_early = False
+    for page in search_pages(client, keyword, search_type, max_pages=max_pages, **extra):
+        pages += 1
+        if pages == 1:
+            total_results = page.get('pageInfo', {}).get('totalResults', 0)
+        fresh = [cid for cid in extract_channel_ids(page) if cid not in known]
+        known.update(fresh)
+        found.extend(fresh)
+        quiet = 0 if fresh else quiet + 1
+        if quiet >= patience and page.get('nextPageToken'):
+            stopped_early = True
+            break
+    if stats is not None:
+        stats[search_type] = {'pages': pages, 'total_results': total_results,
+                              'stopped_early': stopped_early}
+    return found
+
+
+def main():
+    import mysql.connector
+
+    parser = argparse.ArgumentParser(description='Diff a task\'s channel set against its parent')
+    parser.add_argument('--host', default='localhost', help='MySQL host')
+    parser.add_argument('--port', type=int, default=3306, help='MySQL port')
+    parser.add_argument('--user', default='root', help='MySQL user')
+    parser.add_argument('--password', required=True, help='MySQL password')
+    parser.add_argument('--database', default='youtube_kol_db', help='Database name')
+    parser.add_argument('--task-id', required=True, help='Task to compare')
+    parser.add_argument('--keyword', required=True, help='Keyword of the task')
+
+    args = parser.parse_args()
+
+    connection = mysql.connector.connect(host=args.host, port=args.port, user=args.user,
+                                         password=args.password, database=args.database)
+    try:
+        current = load_task_set(connection, args.task_id, args.keyword)
+        if current is None:
+            logger.error(f"❌ No channel set stored for {args.task_id} / '{args.keyword}'")
+            raise SystemExit(1)
+        parent_id, parent = latest_task_set(connection, args.keyword, before_task_id=args.task_id)
+        if parent is None:
+            logger.info(f"✓ {len(current)} channels, no earlier task to compare with")
+            return
+
+        diff = diff_sets(parent, current)
+        logger.info(f"✓ {args.task_id} vs {parent_id}")
+        for name, id_set in diff.items():
+            logger.info(f"  {name:14s} {len(id_set)}")
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Columnar (Parquet / Arrow) export of task results for analysts
+
+Excel is slow to write and slow to read back into pandas. This writes one
+task, several tasks or a date range of tasks as two typed files:
+
+- channels_<label>.parquet: one row per (task, channel) from channels +
+  channel_video_stats + ai_analysis (subscriber_count int64,
+  avg_engagement_rate float64, relevance_score int16, detected_language
+  dictionary-encoded, ...)
+- videos_<label>.parquet: one row per (task, channel, position) from
+  channel_videos + videos, plus legacy recent_videos blobs flattened
+
+Rows are streamed from unbuffered cursors and written in record batches, so
+memory does not grow with the range. A date range filters on task_date, the
+partition key of the fact tables, so only the matching monthly partitions
+are read.
+
+--format arrow writes uncompressed Arrow IPC files instead; those are read
+back zero-copy through a memory map (read_table), which is the fastest way
+to re-analyse the same export locally. Parquet files are read with
+memory_map=True as well.
+
+Usage:
+    python columnar_export.py --password PASS --task-id TASK [--task-id ...] [--output-dir DIR]
+    python columnar_export.py --password PASS --since 2026-01-01 --until 2026-03-31 [--format arrow]
+    python columnar_export.py --read exports/channels_2026-01-01_2026-03-31.arrow [--language en]
+"""
+
+import argparse
+import json
+import logging
+import time
+from datetime import date
+from pathlib import Path
+
+from bulk_writer import video_row
+from excel_export import stream
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+BATCH_ROWS = 50000
+
+# (name, arrow type name); order = SELECT order
+CHANNEL_COLUMNS = (
+    ('task_id', 'string'), ('task_date', 'date32'), ('keyword', 'dictionary'),
+    ('channel_id', 'string'), ('channel_title', 'string'), ('channel_url', 'string'),
+    ('subscriber_count', 'int64'), ('detected_language', 'dictionary'), ('language_confidence', 'float32'),
+    ('status', 'dictionary'), ('avg_view_count', 'int64'), ('avg_like_count', 'int64'),
+    ('avg_comment_count', 'int64'), ('avg_engagement_rate', 'float64'), ('has_outliers', 'bool'),
+    ('relevance_score', 'int16'), ('recommendation', 'string'), ('analysis_status', 'dictionary'),
+    ('ai_provider', 'dictionary'), ('analyzed_at', 'timestamp'),
+)
+VIDEO_COLUMNS = (
+    ('task_id', 'string'), ('task_date', 'date32'), ('channel_id', 'string'), ('position', 'uint8'),
+    ('video_id', 'string'), ('title', 'string'), ('language', 'dictionary'), ('published_at', 'timestamp'),
+    ('view_count', 'int64'), ('like_count', 'int64'), ('comment_count', 'int64'),
+    ('engagement_rate', 'float64'),
+)
+
+CHANNELS_SQL = """
+    SELECT vs.task_id, vs.task_date, t.keyword,
+           c.channel_id, c.channel_title, c.channel_url, c.subscriber_count,
+           c.detected_language, c.language_confidence, c.status,
+           vs.avg_view_count, vs.avg_like_count, vs.avg_comment_count, vs.avg_engagement_rate,
+           vs.has_outliers,
+           ai.relevance_score, ai.recommendation, ai.analysis_status, ai.ai_provider, ai.analyzed_at
+    FROM channel_video_stats vs
+    JOIN search_tasks t ON t.task_id = vs.task_id
+    JOIN channels c ON c.channel_id = vs.channel_id
+    LEFT JOIN ai_analysis ai ON ai.channel_id = vs.channel_id AND ai.task_id = vs.task_id
+    WHERE {where}
+"""
+
+VIDEOS_SQL = """
+    SELECT cv.task_id, cv.task_date, cv.channel_id, cv.position, v.video_id, v.title, v.language,
+           v.published_at, cv.view_count, cv.like_count, cv.comment_count, cv.engagement_rate
+    FROM channel_videos cv
+    JOIN videos v ON v.video_id = cv.video_id
+    WHERE {where}
+"""
+
+LEGACY_VIDEOS_SQL = """
+    SELECT vs.task_id, vs.task_date, vs.channel_id, vs.recent_videos
+    FROM channel_video_stats vs
+    WHERE {where}
+      AND vs.recent_videos IS NOT NULL
+      AND NOT EXISTS (SELECT 1 FROM channel_videos cv
+                      WHERE cv.task_id = vs.task_id AND cv.channel_id = vs.channel_id)
+"""
+
+
+def arrow_schema(columns: tuple):
+    import pyarrow as pa
+
+    types = {
+        'string': pa.string(),
+        'dictionary': pa.dictionary(pa.int32(), pa.string()),
+        'date32': pa.date32(),
+        'timestamp': pa.timestamp('s'),
+        'bool': pa.bool_(),
+        'int16': pa.int16(),
+        'int64': pa.int64(),
+        'uint8': pa.uint8(),
+        'float32': pa.float32(),
+        'float64': pa.float64(),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+
+def task_filter(alias: str, task_ids: list = None, since: date = None, until: date = None) -> tuple:
+    """(WHERE clause, params) selecting tasks by id or by task_date range"""
+    if task_ids:
+        placeholders = ', '.join(['%s'] * len(task_ids))
+        return f"{alias}.task_id IN ({placeholders})", tuple(task_ids)
+    return f"{alias}.task_date BETWEEN %s AND %s", (since, until)
+
+
+def channel_rows(connection, task_ids: list = None, since: date = None, until: date = None):
+    where, params = task_filter('vs', task_ids, since, until)
+    for row in stream(connection, CHANNELS_SQL.format(where=where), params):
+        row = list(row)
+        row[14] = bool(row[14])  # has_outliers
+        yield row
+
+
+def video_rows(connection, task_ids: list = None, since: date = None, until: date = None):
+    where, params = task_filter('cv', task_ids, since, until)
+    yield from stream(connection, VIDEOS_SQL.format(where=where), params)
+
+    where, params = task_filter('vs', task_ids, since, until)
+    for task_id, task_date, channel_id, blob in stream(connection, LEGACY_VIDEOS_SQL.format(where=where), params):
+        videos = json.loads(blob) if isinstance(blob, (str, bytes)) else blob
+        for position, video in enumerate(videos or []):
+            row = video_row(video, channel_id)
+            yield (task_id, task_date, channel_id, position, row['video_id'], row['title'], row['language'],
+                   row['published_at'], row['view_count'], row['like_count'], row['comment_count'],
+                   row['engagement_rate'])
+
+
+def _batches(rows, columns: tuple, schema, size: int = BATCH_ROWS):
+    """Record batches of at most size rows (one column list per field while filling)
+
+    Dictionary columns share one growing dictionary across batches, so every
+    batch only appends to the previous one (Arrow IPC files accept dictionary
+    deltas, not replacements).
+    """
+    import pyarrow as pa
+
+    dictionaries = {index: {} for index, (_, kind) in enumerate(columns) if kind == 'dictionary'}
+
+    def array(index, column, field):
+        if index not in dictionaries:
+            return pa.array(column, type=field.type)
+        codes = dictionaries[index]
+        indices = [None if value is None else codes.setdefault(value, len(codes)) for value in column]
+        return pa.DictionaryArray.from_arrays(pa.array(indices, type=pa.int32()),
+                                              pa.array(list(codes), type=pa.string()))
+
+    def batch(values):
+        return pa.RecordBatch.from_arrays(
+            [array(index, column, field) for index, (column, field) in enumerate(zip(values, schema))],
+            schema=schema)
+
+    values = [[] for _ in columns]
+    for row in rows:
+        for column, value in zip(values, row):
+            column.append(value)
+        if len(values[0]) >= size:
+            yield batch(values)
+            values = [[] for _ in columns]
+    if values[0]:
+        yield batch(values)
+
+
+def write_file(path: Path, rows, columns: tuple, file_format: str = 'parquet', batch_rows: int = BATCH_ROWS) -> int:
+    """Stream rows into a Parquet (zstd) or Arrow IPC file; returns the row count"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = arrow_schema(columns)
+    count = 0
+    if file_format == 'parquet':
+        writer = pq.ParquetWriter(path, schema, compression='zstd')
+    else:
+        writer = pa.ipc.new_file(str(path), schema, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+    try:
+        for batch in _batches(rows, columns, schema, batch_rows):
+            writer.write_batch(batch)
+            count += batch.num_rows
+    finally:
+        writer.close()
+    return count
+
+
+def export_tasks(connection, output_dir: str, task_ids: list = None, since: date = None,
+                 until: date = None, file_format: str = 'parquet') -> dict:
+    """Write channels_<label> and videos_<label>; returns {path: rows}"""
+    if not task_ids and not (since and until):
+        raise ValueError("Give task ids or a since/until date range")
+    label = task_ids[0] if task_ids and len(task_ids) == 1 else (
+        f"{len(task_ids)}_tasks" if task_ids else f"{since}_{until}")
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+
+    results = {}
+    for name, rows, columns in (('channels', channel_rows, CHANNEL_COLUMNS), ('videos', video_rows, VIDEO_COLUMNS)):
+        path = output / f"{name}_{label}.{file_format}"
+        started = time.perf_counter()
+        results[str(path)] = write_file(path, rows(connection, task_ids, since, until), columns, file_format)
+        logger.info(f"  ✓ {path}: {results[str(path)]} rows in {time.perf_counter() - started:.2f}s")
+    return results
+
+
+def read_table(path: str, columns: list = None):
+    """Memory-mapped read: zero-copy for Arrow IPC files, mmap-backed decode for Parquet"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if str(path).endswith('.parquet'):
+        return pq.read_table(path, columns=columns, memory_map=True)
+    table = pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+    return table.select(columns) if columns else table
+
+
+def top_channels(table, language: str = None, limit: int = 20):
+    """Best channels of an exported channels table (relevance, then engagement)"""
+    import pyarrow.compute as pc
+
+    if language:
+        table = table.filter(pc.equal(table['detected_language'].cast('string'), language))
+    table = table.filter(pc.is_valid(table['relevance_score']))
+    return table.sort_by([('relevance_score', 'descending'), ('avg_engagement_rate', 'descending')]).slice(0, limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export task results as Parquet / Arrow, or read an export')
+    parser.add_argument('--host', default='localhost', help='MySQL host')
+    parser.add_argument('--port', type=int, default=3306, help='MySQL port')
+    parser.add_argument('--user', default='root', help='MySQL user')
+    parser.add_argument('--password', help='MySQL password (required for exports)')
+    parser.add_argument('--database', default='youtube_kol_db', help='Database name')
+    parser.add_argument('--task-id', action='append', help='Task to export (repeatable)')
+    parser.add_argument('--since', type=date.fromisoformat, help='First task date (YYYY-MM-DD)')
+    parser.add_argument('--until', type=date.fromisoformat, help='Last task date (YYYY-MM-DD)')
+    parser.add_argument('--format', dest='file_format', choices=('parquet', 'arrow'), default='parquet',
+                        help='parquet (zstd, smallest) or arrow (uncompressed IPC, zero-copy reads)')
+    parser.add_argument('--output-dir', default='exports', help='Output directory')
+    parser.add_argument('--read', help='Read an exported channels file (memory-mapped) and list top channels')
+    parser.add_argument('--language', help='With --read: only this detected_language')
+
+    args = parser.parse_args()
+
+    if args.read:
+        started = time.perf_counter()
+        table = read_table(args.read)
+        logger.info(f"✓ {table.num_rows} rows, {table.num_columns} columns "
+                    f"read in {(time.perf_counter() - started) * 1000:.1f} ms")
+        if 'relevance_score' in table.column_names:
+            for row in top_channels(table, args.language).to_pylist():
+                logger.info(f"  {row['relevance_score']:>3}  {row['avg_engagement_rate']:.3f}  "
+                            f"{row['detected_language'] or '-':<4} {row['channel_title']}")
+        return
+
+    if not args.password:
+        parser.error('--password is required for exports')
+    if not args.task_id and not (args.since and args.until):
+        parser.error('give --task-id or both --since and --until')
+
+    import mysql.connector
+
+    connection = mysql.connector.connect(host=args.host, port=args.port, user=args.user,
+                                         password=args.password, database=args.database)
+    try:
+        started = time.perf_counter()
+        results = export_tasks(connection, args.output_dir, args.task_id, args.since, args.until,
+                               args.file_format)
+    finally:
+        connection.close()
+    logger.info(f"✓ Exported {sum(results.values())} rows in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
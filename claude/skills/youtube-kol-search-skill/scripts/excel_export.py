@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Streaming Excel export of one search task
+
+Writes the 3-sheet report (Channel Overview, Video Details, AI Analysis)
+without ever holding a task's results in memory:
+
+- rows come from unbuffered cursors (MySQL streams the result set, rows are
+  fetched FETCH_BATCH at a time), one sheet's query at a time
+- the workbook is openpyxl's write-only workbook, which serialises each row
+  to the sheet's temporary file as it is appended (inline strings, no
+  shared-string table)
+- Video Details reads the videos / channel_videos tables; channels of older
+  tasks that only have the legacy recent_videos JSON blob are flattened one
+  blob at a time
+
+Peak RSS is therefore flat in the task size (a 5,000-channel / 50,000-video
+task exports in the same memory as a 50-channel one); it is printed after
+every export.
+
+Usage:
+    python excel_export.py --password PASS --task-id TASK [--output report.xlsx]
+"""
+
+import argparse
+import json
+import logging
+import re
+import resource
+import sys
+import time
+from dataclasses import dataclass
+
+from bulk_writer import video_row
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FETCH_BATCH = 1000
+MAX_CELL_CHARS = 32767  # Excel's limit per cell
+# control characters Excel rejects (openpyxl raises IllegalCharacterError)
+ILLEGAL_CHARACTERS = re.compile(r'[\000-\010]|[\013-\014]|[\016-\037]')
+
+
+@dataclass(frozen=True)
+class Sheet:
+    title: str
+    columns: tuple  # (header, width)
+
+
+CHANNEL_OVERVIEW = Sheet('Channel Overview', (
+    ('Channel ID', 26), ('Channel', 32), ('URL', 45), ('Subscribers', 13), ('Language', 10),
+    ('Status', 12), ('New', 6), ('Avg Views', 12), ('Avg Likes', 11), ('Avg Comments', 13),
+    ('Avg Engagement', 15), ('Has Outliers', 12), ('Relevance Score', 15), ('Analysis Status', 15),
+    ('Recommendation', 60),
+))
+VIDEO_DETAILS = Sheet('Video Details', (
+    ('Channel ID', 26), ('Channel', 32), ('#', 4), ('Video ID', 14), ('Title', 50), ('Published', 18),
+    ('Views', 12), ('Likes', 10), ('Comments', 10), ('Engagement Rate', 15), ('Video URL', 45),
+))
+AI_ANALYSIS = Sheet('AI Analysis', (
+    ('Channel ID', 26), ('Channel', 32), ('Relevance Score', 15), ('Audience Match', 50),
+    ('Content Alignment', 50), ('Recommendation', 60), ('Key Strengths', 50), ('Concerns', 50),
+    ('Provider', 10), ('Status', 11), ('Analyzed At', 18), ('Error', 30),
+))
+
+# Query pattern 1 plus the [NEW] tag of incremental tasks
+CHANNEL_OVERVIEW_SQL = """
+    SELECT c.channel_id, c.channel_title, c.channel_url, c.subscriber_count, c.detected_language,
+           c.status,
+           CASE WHEN t.parent_task_id IS NOT NULL AND p.channel_id IS NULL THEN 'NEW' ELSE '' END,
+           vs.avg_view_count, vs.avg_like_count, vs.avg_comment_count, vs.avg_engagement_rate,
+           vs.has_outliers, ai.relevance_score, ai.analysis_status, ai.recommendation
+    FROM channel_video_stats vs
+    JOIN search_tasks t ON t.task_id = vs.task_id
+    JOIN channels c ON c.channel_id = vs.channel_id
+    LEFT JOIN channel_video_stats p ON p.channel_id = vs.channel_id AND p.task_id = t.parent_task_id
+    LEFT JOIN ai_analysis ai ON ai.channel_id = vs.channel_id AND ai.task_id = vs.task_id
+    WHERE vs.task_id = %s
+    ORDER BY c.subscriber_count DESC
+"""
+
+# channel_videos primary key order: one range scan, no filesort
+VIDEO_DETAILS_SQL = """
+    SELECT cv.channel_id, c.channel_title, cv.position, v.video_id, v.title, v.published_at,
+           cv.view_count, cv.like_count, cv.comment_count, cv.engagement_rate
+    FROM channel_videos cv
+    JOIN videos v ON v.video_id = cv.video_id
+    JOIN channels c ON c.channel_id = cv.channel_id
+    WHERE cv.task_id = %s
+    ORDER BY cv.channel_id, cv.position
+"""
+
+# channels whose videos were never copied out of the legacy blob
+LEGACY_VIDEOS_SQL = """
+    SELECT vs.channel_id, c.channel_title, vs.recent_videos
+    FROM channel_video_stats vs
+    JOIN channels c ON c.channel_id = vs.channel_id
+    WHERE vs.task_id = %s
+      AND vs.recent_videos IS NOT NULL
+      AND NOT EXISTS (SELECT 1 FROM channel_videos cv
+                      WHERE cv.task_id = vs.task_id AND cv.channel_id = vs.channel_id)
+    ORDER BY vs.channel_id
+"""
+
+AI_ANALYSIS_SQL = """
+    SELECT ai.channel_id, c.channel_title, ai.relevance_score, ai.audience_match,
+           ai.content_alignment, ai.recommendation, ai.key_strengths, ai.concerns,
+           ai.ai_provider, ai.analysis_status, ai.analyzed_at, ai.error_message
+    FROM ai_analysis ai
+    JOIN channels c ON c.channel_id = ai.channel_id
+    WHERE ai.task_id = %s
+    ORDER BY ai.relevance_score DESC
+"""
+
+
+def stream(connection, sql: str, params: tuple, batch: int = FETCH_BATCH):
+    """Rows of an unbuffered cursor; the result set is never materialised"""
+    cursor = connection.cursor(buffered=False)
+    try:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cursor.close()
+
+
+def _json(value):
+    if value is None or isinstance(value, (list, dict)):
+        return value
+    return json.loads(value)
+
+
+def _cell(value):
+    """Excel-safe cell value (booleans as Yes/No, control characters removed, long text cut)"""
+    if isinstance(value, bool):
+        return 'Yes' if value else 'No'
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode('utf-8', errors='replace')
+    if isinstance(value, str):
+        value = ILLEGAL_CHARACTERS.sub('', value)
+        if len(value) > MAX_CELL_CHARS:
+            value = value[:MAX_CELL_CHARS - 1] + '…'
+    return value
+
+
+def _video_url(video_id: str) -> str:
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+def overview_rows(connection, task_id: str):
+    for row in stream(connection, CHANNEL_OVERVIEW_SQL, (task_id,)):
+        row = list(row)
+        row[11] = bool(row[11])  # has_outliers
+        yield row
+
+
+def video_detail_rows(connection, task_id: str):
+    for channel_id, title, position, video_id, *rest in stream(connection, VIDEO_DETAILS_SQL, (task_id,)):
+        yield [channel_id, title, position + 1, video_id, *rest, _video_url(video_id)]
+
+    for channel_id, title, blob in stream(connection, LEGACY_VIDEOS_SQL, (task_id,)):
+        for position, video in enumerate(_json(blob) or [], start=1):
+            row = video_row(video, channel_id)
+            yield [channel_id, title, position, row['video_id'], row['title'], row['published_at'],
+                   row['view_count'], row['like_count'], row['comment_count'], row['engagement_rate'],
+                   _video_url(row['video_id'])]
+
+
+def analysis_rows(connection, task_id: str):
+    for row in stream(connection, AI_ANALYSIS_SQL, (task_id,)):
+        row = list(row)
+        row[6] = '; '.join(map(str, _json(row[6]) or []))  # key_strengths
+        row[7] = '; '.join(map(str, _json(row[7]) or []))  # concerns
+        yield row
+
+
+SHEETS = (
+    (CHANNEL_OVERVIEW, overview_rows),
+    (VIDEO_DETAILS, video_detail_rows),
+    (AI_ANALYSIS, analysis_rows),
+)
+
+
+def _header(worksheet, sheet: Sheet):
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill
+
+    bold = Font(bold=True, color='FFFFFF')
+    fill = PatternFill('solid', fgColor='305496')
+    cells = []
+    for header, _ in sheet.columns:
+        cell = WriteOnlyCell(worksheet, value=header)
+        cell.font, cell.fill = bold, fill
+        cells.append(cell)
+    return cells
+
+
+def write_sheet(workbook, sheet: Sheet, rows) -> int:
+    """Append a sheet and stream rows into it; returns the row count"""
+    from openpyxl.utils import get_column_letter
+
+    worksheet = workbook.create_sheet(sheet.title)
+    for index, (_, width) in enumerate(sheet.columns, start=1):
+        worksheet.column_dimensions[get_column_letter(index)].width = width
+    worksheet.freeze_panes = 'A2'
+    worksheet.append(_header(worksheet, sheet))
+
+    count = 0
+    for row in rows:
+        worksheet.append([_cell(value) for value in row])
+        count += 1
+    worksheet.auto_filter.ref = f"A1:{get_column_letter(len(sheet.columns))}{count + 1}"
+    return count
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def export_task(connection, task_id: str, path: str) -> dict:
+    """Write the 3-sheet report of a task to path; returns {sheet title: rows}"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    counts = {}
+    for sheet, rows in SHEETS:
+        started = time.perf_counter()
+        counts[sheet.title] = write_sheet(workbook, sheet, rows(connection, task_id))
+        logger.info(f"  ✓ {sheet.title}: {counts[sheet.title]} rows in {time.perf_counter() - started:.2f}s")
+    workbook.save(path)
+    return counts
+
+
+def main():
+    import mysql.connector
+
+    parser = argparse.ArgumentParser(description='Export a search task to Excel (streaming)')
+    parser.add_argument('--host', default='localhost', help='MySQL host')
+    parser.add_argument('--port', type=int, default=3306, help='MySQL port')
+    parser.add_argument('--user', default='root', help='MySQL user')
+    parser.add_argument('--password', required=True, help='MySQL password')
+    parser.add_argument('--database', default='youtube_kol_db', help='Database name')
+    parser.add_argument('--task-id', required=True, help='Task to export')
+    parser.add_argument('--output', help='Output file (default: kol_<task-id>.xlsx)')
+
+    args = parser.parse_args()
+    output = args.output or f"kol_{args.task_id}.xlsx"
+
+    connection = mysql.connector.connect(host=args.host, port=args.port, user=args.user,
+                                         password=args.password, database=args.database)
+    try:
+        started = time.perf_counter()
+        counts = export_task(connection, args.task_id, output)
+    finally:
+        connection.close()
+
+    logger.info(f"✓ Exported {sum(counts.values())} rows to {output} "
+                f"in {time.perf_counter() - started:.2f}s (peak RSS {peak_rss_mb():.0f} MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,551 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for the YouTube Data API v3
+
+Serves search, channels, playlistItems and videos with realistic pagination,
+per-endpoint latency distributions, per-key quota accounting and optional
+403/429 injection, so the collection flow can be exercised without network
+access or quota.
+
+Usage:
+    python fake_youtube_server.py [--port 8765] [--channels 2000] [--latency-scale 1.0]
+                                  [--error-rate-403 0.0] [--error-rate-429 0.0]
+
+Point a client at http://localhost:PORT/youtube/v3 instead of
+https://www.googleapis.com/youtube/v3. GET /_stats returns request and quota
+counters.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+API_PREFIX = '/youtube/v3/'
+
+# Quota cost per call, mirrors the table in references/anti_ban_strategy.md
+QUOTA_COSTS = {
+    'search': 100,
+    'channels': 1,
+    'playlistItems': 1,
+    'videos': 1,
+}
+
+# Median latency (ms) per endpoint; samples are log-normal around the median
+LATENCY_MEDIANS_MS = {
+    'search': 180.0,
+    'channels': 60.0,
+    'playlistItems': 50.0,
+    'videos': 70.0,
+}
+LATENCY_SIGMA = 0.45
+
+SEARCH_RESULT_CAP = 500  # The real API stops paginating around 500 results
+MAX_RESULTS_LIMIT = 50
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+SAMPLE_WORDS = {
+    'en': ['clean', 'your', 'pc', 'windows', 'speed', 'up', 'guide', 'review', 'best', 'tools'],
+    'es': ['limpia', 'tu', 'ordenador', 'rápido', 'guía', 'mejores', 'herramientas', 'para'],
+    'de': ['reinigen', 'sie', 'ihren', 'computer', 'schnell', 'anleitung', 'die', 'besten'],
+    'zh': ['电脑', '清理', '加速', '教程', '系统', '优化', '软件', '推荐'],
+    'ja': ['パソコン', 'の', '掃除', '高速化', 'ガイド', 'おすすめ', 'ソフト', 'です'],
+}
+
+
+def _stable_int(*parts) -> int:
+    """Deterministic integer from arbitrary parts (independent of PYTHONHASHSEED)"""
+    digest = hashlib.md5('|'.join(str(p) for p in parts).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+def _iso(dt: datetime) -> str:
+    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _parse_iso(value: str) -> datetime:
+    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+
+
+class FakeYouTubeData:
+    """Deterministic synthetic catalogue of channels and videos"""
+
+    def __init__(self, num_channels: int = 2000, videos_per_channel: int = 30, seed: int = 42):
+        self.num_channels = num_channels
+        self.videos_per_channel = videos_per_channel
+        self.seed = seed
+        self.channels = {}
+        self.videos = {}
+        self.channel_order = []
+        self.uploads = {}  # uploads playlist id -> [video ids], newest first
+        self._matches = {}
+
+        rng = random.Random(seed)
+        languages = list(SAMPLE_WORDS)
+
+        for index in range(num_channels):
+            channel_id = f"UC{index:020d}fake"
+            language = rng.choices(languages, weights=[60, 12, 8, 12, 8])[0]
+            words = SAMPLE_WORDS[language]
+            # Pareto-distributed subscriber counts: most channels small, a few huge
+            subscribers = int(min(50_000_000, 500 * rng.paretovariate(1.1)))
+            uploads_id = 'UU' + channel_id[2:]
+            created = EPOCH - timedelta(days=rng.randint(30, 3000))
+
+            video_ids = []
+            last_published = EPOCH + timedelta(days=rng.randint(0, 600))
+            base_views = max(50, int(subscribers * rng.uniform(0.02, 0.3)))
+            for v in range(videos_per_channel):
+                video_id = f"v{index:07d}x{v:03d}"
+                published = last_published - timedelta(days=v * rng.randint(2, 14))
+                views = max(0, int(base_views * rng.lognormvariate(0, 0.6)))
+                if rng.random() < 0.03:
+                    views *= rng.randint(10, 40)  # occasional viral outlier
+                self.videos[video_id] = {
+                    'id': video_id,
+                    'channel_id': channel_id,
+                    'title': ' '.join(rng.choices(words, k=6)),
+                    'description': ' '.join(rng.choices(words, k=25)),
+                    'published_at': published,
+                    'view_count': views,
+                    'like_count': int(views * rng.uniform(0.01, 0.06)),
+                    'comment_count': int(views * rng.uniform(0.001, 0.01)),
+                }
+                video_ids.append(video_id)
+
+            self.uploads[uploads_id] = video_ids
+            self.channels[channel_id] = {
+                'id': channel_id,
+                'title': f"{words[0].title()} {words[3]} {index}",
+                'description': ' '.join(rng.choices(words, k=40)),
+                'language': language,
+                'subscriber_count': subscribers,
+                'video_count': videos_per_channel,
+                'view_count': base_views * videos_per_channel,
+                'custom_url': f"@fakechannel{index}",
+                'published_at': created,
+                'uploads': uploads_id,
+            }
+            self.channel_order.append(channel_id)
+
+    def match_channels(self, keyword: str) -> list:
+        """Channels relevant to a keyword, in relevance order
+
+        Each keyword matches a deterministic ~25% slice of the catalogue. Keywords
+        sharing words overlap heavily, like related campaign keywords do.
+        """
+        cache_key = ('channel', keyword.lower())
+        if cache_key in self._matches:
+            return self._matches[cache_key]
+
+        words = [w for w in keyword.lower().split() if w] or ['']
+        matched = []
+        for channel_id in self.channel_order:
+            for word in words:
+                if _stable_int(self.seed, word, channel_id) % 4 == 0:
+                    matched.append(channel_id)
+                    break
+        matched.sort(key=lambda cid: _stable_int(self.seed, keyword.lower(), cid))
+        self._matches[cache_key] = matched
+        return matched
+
+    def match_videos(self, keyword: str) -> list:
+        """Videos relevant to a keyword, in relevance order"""
+        cache_key = ('video', keyword.lower())
+        if cache_key in self._matches:
+            return self._matches[cache_key]
+
+        video_ids = []
+        for channel_id in self.match_channels(keyword):
+            uploads = self.uploads[self.channels[channel_id]['uploads']]
+            video_ids.extend(uploads[:_stable_int(keyword, channel_id) % 3 + 1])
+        video_ids.sort(key=lambda vid: _stable_int(self.seed, keyword.lower(), vid))
+        self._matches[cache_key] = video_ids
+        return video_ids
+
+
+class FakeYouTubeAPIError(Exception):
+    """Error rendered in the Google API error envelope"""
+
+    def __init__(self, code: int, reason: str, message: str, domain: str = 'youtube.quota'):
+        super().__init__(message)
+        self.code = code
+        self.reason = reason
+        self.message = message
+        self.domain = domain
+
+    def to_body(self) -> dict:
+        return {
+            'error': {
+                'code': self.code,
+                'message': self.message,
+                'errors': [{'message': self.message, 'domain': self.domain, 'reason': self.reason}],
+            }
+        }
+
+
+class FakeYouTubeService:
+    """Request router, quota ledger and fault injector behind the HTTP handler"""
+
+    def __init__(self, data: FakeYouTubeData, latency_scale: float = 1.0,
+                 error_rate_403: float = 0.0, error_rate_429: float = 0.0,
+                 daily_quota: int = 10000, seed: int = 42):
+        self.data = data
+        self.latency_scale = latency_scale
+        self.error_rate_403 = error_rate_403
+        self.error_rate_429 = error_rate_429
+        self.daily_quota = daily_quota
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.quota_used = {}
+        self.request_counts = {}
+        self.error_counts = {}
+
+    # ------------------------------------------------------------------
+    # Bookkeeping
+    # ------------------------------------------------------------------
+
+    def _sample(self, endpoint: str):
+        """Draw latency and fault injection outcome for one call"""
+        with self._lock:
+            median = LATENCY_MEDIANS_MS.get(endpoint, 50.0)
+            latency = median * math.exp(self._rng.gauss(0, LATENCY_SIGMA)) / 1000.0
+            roll = self._rng.random()
+        return latency * self.latency_scale, roll
+
+    def _charge(self, api_key: str, endpoint: str):
+        cost = QUOTA_COSTS[endpoint]
+        with self._lock:
+            self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+            used = self.quota_used.get(api_key, 0)
+            if used + cost > self.daily_quota:
+                raise FakeYouTubeAPIError(
+                    403, 'quotaExceeded',
+                    'The request cannot be completed because you have exceeded your quota.'
+                )
+            self.quota_used[api_key] = used + cost
+
+    def _count_error(self, code: int):
+        with self._lock:
+            self.error_counts[code] = self.error_counts.get(code, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'requests': dict(self.request_counts),
+                'errors': {str(k): v for k, v in self.error_counts.items()},
+                'quota_used': dict(self.quota_used),
+                'total_quota_used': sum(self.quota_used.values()),
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.quota_used.clear()
+            self.request_counts.clear()
+            self.error_counts.clear()
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+
+    def handle(self, endpoint: str, params: dict) -> dict:
+        """Serve one API call; raises FakeYouTubeAPIError for error responses"""
+
+        if endpoint not in QUOTA_COSTS:
+            raise FakeYouTubeAPIError(404, 'notFound', f"Unknown endpoint: {endpoint}", 'global')
+
+        api_key = params.get('key', '')
+        if not api_key:
+            raise FakeYouTubeAPIError(403, 'forbidden', 'The request is missing a valid API key.', 'global')
+
+        latency, roll = self._sample(endpoint)
+        if latency > 0:
+            time.sleep(latency)
+
+        if roll < self.error_rate_429:
+            raise FakeYouTubeAPIError(429, 'rateLimitExceeded', 'Too many requests.', 'youtube.quota')
+        if roll < self.error_rate_429 + self.error_rate_403:
+            raise FakeYouTubeAPIError(403, 'forbidden', 'Request forbidden (injected).', 'youtube.api')
+
+        self._charge(api_key, endpoint)
+        return getattr(self, f"_{endpoint}")(params)
+
+    @staticmethod
+    def _page_bounds(params: dict, total: int):
+        max_results = max(0, min(int(params.get('maxResults', 5)), MAX_RESULTS_LIMIT))
+        token = params.get('pageToken', '')
+        offset = int(token[1:]) if token.startswith('P') and token[1:].isdigit() else 0
+        end = min(offset + max_results, total)
+        next_token = f"P{end}" if end < total else None
+        return offset, end, max_results, next_token
+
+    def _search(self, params: dict) -> dict:
+        keyword = params.get('q', '')
+        search_type = params.get('type', 'video')
+
+        if search_type == 'channel':
+            ids = self.data.match_channels(keyword)
+            catalogue = self.data.channels
+        else:
+            ids = self.data.match_videos(keyword)
+            catalogue = self.data.videos
+
+        if params.get('publishedAfter'):
+            try:
+                after = _parse_iso(params['publishedAfter'])
+            except ValueError:
+                raise FakeYouTubeAPIError(400, 'invalidPublishedAfter', 'Invalid publishedAfter value',
+                                          domain='youtube.parameter')
+            ids = [i for i in ids if catalogue[i]['published_at'] > after]
+        if params.get('order') == 'date':
+            ids = sorted(ids, key=lambda i: catalogue[i]['published_at'], reverse=True)
+
+        total_results = len(ids) * 3 + 17  # totalResults is only an estimate upstream
+        ids = ids[:SEARCH_RESULT_CAP]
+        offset, end, max_results, next_token = self._page_bounds(params, len(ids))
+
+        items = []
+        for item_id in ids[offset:end]:
+            if search_type == 'channel':
+                channel = self.data.channels[item_id]
+                items.append({
+                    'kind': 'youtube#searchResult',
+                    'id': {'kind': 'youtube#channel', 'channelId': item_id},
+                    'snippet': {
+                        'channelId': item_id,
+                        'title': channel['title'],
+                        'description': channel['description'][:160],
+                        'publishedAt': _iso(channel['published_at']),
+                    },
+                })
+            else:
+                video = self.data.videos[item_id]
+                items.append({
+                    'kind': 'youtube#searchResult',
+                    'id': {'kind': 'youtube#video', 'videoId': item_id},
+                    'snippet': {
+                        'channelId': video['channel_id'],
+                        'channelTitle': self.data.channels[video['channel_id']]['title'],
+                        'title': video['title'],
+                        'publishedAt': _iso(video['published_at']),
+                    },
+                })
+
+        response = {
+            'kind': 'youtube#searchListResponse',
+            'pageInfo': {'totalResults': total_results, 'resultsPerPage': max_results},
+            'items': items,
+        }
+        if next_token:
+            response['nextPageToken'] = next_token
+        return response
+
+    def _split_ids(self, params: dict) -> list:
+        ids = [i for i in params.get('id', '').split(',') if i]
+        if len(ids) > MAX_RESULTS_LIMIT:
+            raise FakeYouTubeAPIError(400, 'badRequest', 'Too many ids (max 50).', 'youtube.parameter')
+        return ids
+
+    def _channels(self, params: dict) -> dict:
+        items = []
+        for channel_id in self._split_ids(params):
+            channel = self.data.channels.get(channel_id)
+            if channel is None:
+                continue
+            items.append({
+                'kind': 'youtube#channel',
+                'id': channel_id,
+                'snippet': {
+                    'title': channel['title'],
+                    'description': channel['description'],
+                    'customUrl': channel['custom_url'],
+                    'publishedAt': _iso(channel['published_at']),
+                    'thumbnails': {'default': {'url': f"https://yt3.example/{channel_id}.jpg"}},
+                },
+                'statistics': {
+                    'subscriberCount': str(channel['subscriber_count']),
+                    'videoCount': str(channel['video_count']),
+                    'viewCount': str(channel['view_count']),
+                },
+                'contentDetails': {'relatedPlaylists': {'uploads': channel['uploads']}},
+            })
+        return {
+            'kind': 'youtube#channelListResponse',
+            'pageInfo': {'totalResults': len(items), 'resultsPerPage': len(items)},
+            'items': items,
+        }
+
+    def _playlistItems(self, params: dict) -> dict:
+        playlist_id = params.get('playlistId', '')
+        if playlist_id not in self.data.uploads:
+            raise FakeYouTubeAPIError(404, 'playlistNotFound', 'Playlist not found.', 'youtube.playlistItem')
+
+        video_ids = self.data.uploads[playlist_id]
+        offset, end, max_results, next_token = self._page_bounds(params, len(video_ids))
+        items = [{
+            'kind': 'youtube#playlistItem',
+            'contentDetails': {
+                'videoId': vid,
+                'videoPublishedAt': _iso(self.data.videos[vid]['published_at']),
+            },
+        } for vid in video_ids[offset:end]]
+
+        response = {
+            'kind': 'youtube#playlistItemListResponse',
+            'pageInfo': {'totalResults': len(video_ids), 'resultsPerPage': max_results},
+            'items': items,
+        }
+        if next_token:
+            response['nextPageToken'] = next_token
+        return response
+
+    def _videos(self, params: dict) -> dict:
+        items = []
+        for video_id in self._split_ids(params):
+            video = self.data.videos.get(video_id)
+            if video is None:
+                continue
+            items.append({
+                'kind': 'youtube#video',
+                'id': video_id,
+                'snippet': {
+                    'channelId': video['channel_id'],
+                    'title': video['title'],
+                    'description': video['description'],
+                    'publishedAt': _iso(video['published_at']),
+                },
+                'statistics': {
+                    'viewCount': str(video['view_count']),
+                    'likeCount': str(video['like_count']),
+                    'commentCount': str(video['comment_count']),
+                },
+            })
+        return {
+            'kind': 'youtube#videoListResponse',
+            'pageInfo': {'totalResults': len(items), 'resultsPerPage': len(items)},
+            'items': items,
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like googleapis.com
+    disable_nagle_algorithm = True  # headers and body are separate writes
+    service = None  # set by FakeYouTubeServer
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+
+        if parsed.path == '/_stats':
+            self._send(200, self.service.stats())
+            return
+
+        if not parsed.path.startswith(API_PREFIX):
+            self._send(404, FakeYouTubeAPIError(404, 'notFound', 'Not found', 'global').to_body())
+            return
+
+        endpoint = parsed.path[len(API_PREFIX):].strip('/')
+        try:
+            self._send(200, self.service.handle(endpoint, params))
+        except FakeYouTubeAPIError as e:
+            self.service._count_error(e.code)
+            self._send(e.code, e.to_body())
+
+    def _send(self, status: int, body: dict):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class FakeYouTubeServer:
+    """Threaded fake API server; usable as a context manager for in-process runs"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, **service_options):
+        data_options = {k: service_options.pop(k) for k in ('num_channels', 'videos_per_channel')
+                        if k in service_options}
+        self.data = FakeYouTubeData(seed=service_options.get('seed', 42), **data_options)
+        self.service = FakeYouTubeService(self.data, **service_options)
+        handler = type('FakeYouTubeHandler', (_Handler,), {'service': self.service})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/youtube/v3"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run an offline YouTube Data API v3 stand-in')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address')
+    parser.add_argument('--port', type=int, default=8765, help='Listen port')
+    parser.add_argument('--channels', type=int, default=2000, help='Number of synthetic channels')
+    parser.add_argument('--videos-per-channel', type=int, default=30, help='Uploads per channel')
+    parser.add_argument('--latency-scale', type=float, default=1.0,
+                        help='Multiplier for simulated latency (0 disables it)')
+    parser.add_argument('--error-rate-403', type=float, default=0.0, help='Probability of an injected 403')
+    parser.add_argument('--error-rate-429', type=float, default=0.0, help='Probability of an injected 429')
+    parser.add_argument('--daily-quota', type=int, default=10000, help='Quota units per API key')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for data and latency')
+
+    args = parser.parse_args()
+
+    logger.info(f"Generating {args.channels} channels...")
+    server = FakeYouTubeServer(
+        host=args.host,
+        port=args.port,
+        num_channels=args.channels,
+        videos_per_channel=args.videos_per_channel,
+        latency_scale=args.latency_scale,
+        error_rate_403=args.error_rate_403,
+        error_rate_429=args.error_rate_429,
+        daily_quota=args.daily_quota,
+        seed=args.seed,
+    )
+
+    logger.info(f"✓ Fake YouTube API listening on {server.base_url}")
+    logger.info(f"  Stats: http://{args.host}:{server.httpd.server_address[1]}/_stats")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("\n✓ Shutting down")
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
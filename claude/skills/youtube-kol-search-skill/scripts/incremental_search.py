@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Incremental re-search with early-terminating pagination
+
+An incremental task only cares about channels that are new since its parent
+task (`search_tasks.parent_task_id`). Instead of walking every page of both
+searches again (100 units a page):
+
+- type=video is searched with order=date and publishedAfter = the parent's
+  completed_at, and stops at the first page without an unseen channel
+- type=channel keeps relevance order and stops after `channel_patience`
+  consecutive pages of known channels (see channel_sets.py)
+- search units used, the cost of a full re-search and the difference are
+  recorded on the task
+- run_for_task collects the new channels and stores them with the task's
+  channel set, parent | new (bulk_writer.store_task)
+
+Usage:
+    python incremental_search.py --api-key KEY --keyword "PC cleanup" \\
+        --known channels.json --published-after 2024-06-01T00:00:00Z [--base-url URL]
+"""
+
+import argparse
+import json
+import logging
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from bulk_writer import store_task
+from channel_sets import load_task_set, resolve_channel_ids, search_known_pages
+from quota_planner import MAX_SEARCH_PAGES
+from youtube_collector import (
+    DEFAULT_BASE_URL, MAX_IDS_PER_CALL, QUOTA_COSTS, RECENT_VIDEOS, YouTubeClient, collection_phase,
+)
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def rfc3339(moment: datetime) -> str:
+    """publishedAfter value; naive datetimes (MySQL TIMESTAMP) are taken as UTC"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+@dataclass
+class IncrementalResult:
+    keyword: str
+    new_channel_ids: list
+    pages: dict
+    search_units: int
+    full_search_units: int
+    stats: dict = field(default_factory=dict, repr=False)
+    channels: dict = field(default_factory=dict, repr=False)
+
+    @property
+    def units_saved(self) -> int:
+        return max(0, self.full_search_units - self.search_units)
+
+
+def estimate_full_search_units(stats: dict) -> int:
+    """Fallback when the parent recorded no full-search cost: pages from totalResults
+
+    The date-filtered video stream reports fewer results than an unfiltered
+    search would, so this is a lower bound.
+    """
+    pages = sum(
+        max(1, min(MAX_SEARCH_PAGES, math.ceil(s['total_results'] / MAX_IDS_PER_CALL)))
+        for s in stats.values()
+    )
+    return pages * QUOTA_COSTS['search']
+
+
+def incremental_search(client: YouTubeClient, keyword: str, known: set, published_after: datetime,
+                       full_search_units: int = None, channel_patience: int = 2,
+                       max_pages: int = None) -> IncrementalResult:
+    """Search only for channels not in `known` (channel_id strings)"""
+
+    known = set(known)
+    stats = {}
+    new_ids = search_known_pages(client, keyword, 'channel', known, patience=channel_patience,
+                                 max_pages=max_pages, stats=stats)
+    new_ids += search_known_pages(client, keyword, 'video', known, patience=1,
+                                  max_pages=max_pages, stats=stats,
+                                  order='date', publishedAfter=rfc3339(published_after))
+
+    pages = {search_type: s['pages'] for search_type, s in stats.items()}
+    search_units = sum(pages.values()) * QUOTA_COSTS['search']
+    if full_search_units is None:
+        full_search_units = estimate_full_search_units(stats)
+    return IncrementalResult(keyword, new_ids, pages, search_units, full_search_units, stats)
+
+
+def load_parent(connection, parent_task_id: str) -> dict:
+    """completed_at and full-search cost of the parent task"""
+    cursor = connection.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT task_id, keyword, completed_at, full_search_units
+        FROM search_tasks
+        WHERE task_id = %s AND status = 'completed'
+    """, (parent_task_id,))
+    parent = cursor.fetchone()
+    cursor.close()
+    if parent is None:
+        raise ValueError(f"Parent task {parent_task_id} not found or not completed")
+    return parent
+
+
+def known_channel_ids(connection, parent_task_id: str, keyword: str) -> set:
+    """channel_id strings of the parent's stored channel set (empty if it has none)"""
+    id_set = load_task_set(connection, parent_task_id, keyword)
+    return set(resolve_channel_ids(connection, id_set)) if id_set is not None else set()
+
+
+def run_for_task(connection, client: YouTubeClient, task_id: str, parent_task_id: str,
+                 keyword: str, videos_per_channel: int = RECENT_VIDEOS, **options) -> IncrementalResult:
+    """Incremental search and collection for a task row that has parent_task_id set
+
+    Stores the new channels with the task's set (parent | new) and records the savings.
+    """
+    parent = load_parent(connection, parent_task_id)
+    known = known_channel_ids(connection, parent_task_id, keyword)
+
+    result = incremental_search(client, keyword, known, parent['completed_at'],
+                                full_search_units=parent['full_search_units'], **options)
+    result.channels = collection_phase(client, result.new_channel_ids, videos_per_channel)
+    store_task(connection, task_id, result.channels, {keyword: result.new_channel_ids},
+               parent_task_id=parent_task_id)
+    record_search_units(connection, task_id, result.search_units, result.full_search_units,
+                        new_channels=len(result.new_channel_ids))
+    return result
+
+
+def record_search_units(connection, task_id: str, search_units: int,
+                        full_search_units: int = None, new_channels: int = None):
+    """search.list units used and saved; full tasks pass only search_units"""
+    full_search_units = search_units if full_search_units is None else full_search_units
+    cursor = connection.cursor()
+    cursor.execute("""
+        UPDATE search_tasks
+        SET search_units = %s, full_search_units = %s, units_saved = %s,
+            new_channels_count = COALESCE(%s, new_channels_count)
+        WHERE task_id = %s
+    """, (search_units, full_search_units, max(0, full_search_units - search_units),
+          new_channels, task_id))
+    connection.commit()
+    cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Incremental search for channels new since a previous run')
+    parser.add_argument('--api-key', action='append', required=True, help='YouTube API key (repeatable)')
+    parser.add_argument('--keyword', required=True, help='Search keyword')
+    parser.add_argument('--known', required=True, help='JSON file written by youtube_collector.py --output')
+    parser.add_argument('--published-after', required=True, help='Parent completion time (RFC 3339, UTC)')
+    parser.add_argument('--full-search-units', type=int, help='Units a full re-search costs (if known)')
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL, help='API base URL')
+    parser.add_argument('--collect', action='store_true', help='Also collect the new channels')
+
+    args = parser.parse_args()
+
+    with open(args.known, encoding='utf-8') as f:
+        known = set(json.load(f))
+    published_after = datetime.strptime(args.published_after, '%Y-%m-%dT%H:%M:%SZ')
+
+    client = YouTubeClient(args.api_key, base_url=args.base_url)
+    result = incremental_search(client, args.keyword, known, published_after,
+                                full_search_units=args.full_search_units)
+
+    logger.info(f"✓ {len(result.new_channel_ids)} new channels for '{args.keyword}'")
+    logger.info(f"  Search pages:      {result.pages}")
+    logger.info(f"  Search units:      {result.search_units}")
+    logger.info(f"  Full re-search:    {result.full_search_units}")
+    logger.info(f"  Units saved:       {result.units_saved}")
+
+    if args.collect and result.new_channel_ids:
+        channels = collection_phase(client, result.new_channel_ids, RECENT_VIDEOS)
+        logger.info(f"✓ Collected {len(channels)} new channels ({client.stats.quota_units} units total)")
+
+
+if __name__ == '__main__':
+    main()
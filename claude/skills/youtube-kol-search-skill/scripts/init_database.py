@@ -4,15 +4,27 @@ Initialize MySQL database schema for YouTube KOL Search System
 
 Usage:
     python init_database.py [--host HOST] [--port PORT] [--user USER] [--password PASSWORD] [--database DATABASE]
+                            [--dry-run] [--clear-video-blobs] [--synthetic-channels N [--load-data]]
+    python init_database.py --password PASSWORD --partition-fact-tables
+    python init_database.py --password PASSWORD --maintain-partitions [--retention-months 3]
+
+Tables are created if missing, then pending migrations from migrations/ are
+applied (see migrate.py).
 """
 
 import argparse
+import json
+import re
 import sys
+import time
+from datetime import date, datetime, timezone
 from pathlib import Path
 import mysql.connector
 from mysql.connector import Error
 import logging
 
+from migrate import run_migrations
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -39,7 +51,9 @@ def create_tables(connection):
             CREATE TABLE IF NOT EXISTS search_tasks (
                 id INT PRIMARY KEY AUTO_INCREMENT,
                 task_id VARCHAR(64) UNIQUE NOT NULL COMMENT 'UUID for task tracking',
-                keyword VARCHAR(255) NOT NULL COMMENT 'Search keyword',
+                keyword VARCHAR(255) NOT NULL COMMENT 'Search keyword (display label for batch tasks)',
+                task_type ENUM('single', 'batch') DEFAULT 'single',
+                keywords JSON COMMENT 'All keywords of a batch task',
                 product_info TEXT COMMENT 'Product information snapshot',
                 status ENUM('pending', 'running', 'completed', 'failed', 'paused') DEFAULT 'pending',
                 total_channels INT DEFAULT 0,
@@ -48,6 +62,12 @@ def create_tables(connection):
                 parent_task_id VARCHAR(64),
                 new_channels_count INT DEFAULT 0,
                 accelerated_mode BOOLEAN DEFAULT 0,
+                plan_type ENUM('full', 'truncated', 'channel_only') NULL COMMENT 'Quota plan chosen by the planner',
+                planned_units INT NULL COMMENT 'Estimated YouTube quota units',
+                actual_units INT NULL COMMENT 'YouTube quota units actually used',
+                search_units INT NULL COMMENT 'search.list units used by this task',
+                full_search_units INT NULL COMMENT 'search.list units of a full (non-incremental) search',
+                units_saved INT NULL COMMENT 'full_search_units - search_units for incremental tasks',
                 error_message TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 started_at TIMESTAMP NULL,
@@ -78,8 +98,8 @@ def create_tables(connection):
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                 
-                INDEX idx_channel_id (channel_id),
                 INDEX idx_language (detected_language),
+                INDEX idx_language_status (detected_language, status, subscriber_count),
                 INDEX idx_subscribers (subscriber_count DESC),
                 INDEX idx_status (status),
                 INDEX idx_last_seen (last_seen_at DESC),
@@ -92,27 +112,68 @@ def create_tables(connection):
                 id INT PRIMARY KEY AUTO_INCREMENT,
                 channel_id VARCHAR(64) NOT NULL,
                 task_id VARCHAR(64) NOT NULL,
+                task_date DATE NOT NULL DEFAULT '1970-01-01' COMMENT 'Partition key: DATE(search_tasks.created_at)',
                 avg_view_count BIGINT DEFAULT 0,
                 avg_like_count INT DEFAULT 0,
                 avg_comment_count INT DEFAULT 0,
                 avg_engagement_rate FLOAT DEFAULT 0,
                 has_outliers BOOLEAN DEFAULT 0,
                 outlier_videos JSON,
-                recent_videos JSON NOT NULL,
+                recent_videos JSON NULL COMMENT 'Legacy blob, see videos / channel_videos',
                 video_languages JSON,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 
-                INDEX idx_channel_task (channel_id, task_id),
+                UNIQUE KEY uk_channel_task (channel_id, task_id),
+                INDEX idx_task_channel (task_id, channel_id, avg_view_count, avg_engagement_rate, has_outliers),
                 INDEX idx_engagement (avg_engagement_rate DESC),
                 INDEX idx_views (avg_view_count DESC)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
         """,
         
+        'videos': """
+            CREATE TABLE IF NOT EXISTS videos (
+                video_id VARCHAR(32) PRIMARY KEY,
+                channel_id VARCHAR(64) NOT NULL,
+                title VARCHAR(255) NOT NULL DEFAULT '',
+                description TEXT,
+                language VARCHAR(10),
+                published_at DATETIME NULL,
+                view_count BIGINT DEFAULT 0,
+                like_count INT DEFAULT 0,
+                comment_count INT DEFAULT 0,
+                engagement_rate FLOAT DEFAULT 0,
+                first_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                
+                INDEX idx_channel_published (channel_id, published_at, view_count, like_count, comment_count),
+                INDEX idx_published (published_at)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """,
+        
+        'channel_videos': """
+            CREATE TABLE IF NOT EXISTS channel_videos (
+                task_id VARCHAR(64) NOT NULL,
+                task_date DATE NOT NULL DEFAULT '1970-01-01' COMMENT 'Partition key: DATE(search_tasks.created_at)',
+                channel_id VARCHAR(64) NOT NULL,
+                position TINYINT UNSIGNED NOT NULL,
+                video_id VARCHAR(32) NOT NULL,
+                view_count BIGINT DEFAULT 0,
+                like_count INT DEFAULT 0,
+                comment_count INT DEFAULT 0,
+                engagement_rate FLOAT DEFAULT 0,
+                
+                PRIMARY KEY (task_id, channel_id, position),
+                INDEX idx_channel_task (channel_id, task_id, position, video_id),
+                INDEX idx_video_task (video_id, task_id)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """,
+        
         'ai_analysis': """
             CREATE TABLE IF NOT EXISTS ai_analysis (
                 id INT PRIMARY KEY AUTO_INCREMENT,
                 channel_id VARCHAR(64) NOT NULL,
                 task_id VARCHAR(64) NOT NULL,
+                task_date DATE NOT NULL DEFAULT '1970-01-01' COMMENT 'Partition key: DATE(search_tasks.created_at)',
                 relevance_score INT,
                 audience_match TEXT,
                 content_alignment TEXT,
@@ -126,14 +187,56 @@ def create_tables(connection):
                 analyzed_at TIMESTAMP NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 
-                INDEX idx_channel_task (channel_id, task_id),
                 INDEX idx_score (relevance_score DESC),
                 INDEX idx_status (analysis_status),
+                INDEX idx_task_status (task_id, analysis_status, channel_id),
                 INDEX idx_provider (ai_provider),
                 UNIQUE KEY uk_channel_task (channel_id, task_id)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
         """,
         
+        'task_channel_sets': """
+            CREATE TABLE IF NOT EXISTS task_channel_sets (
+                task_id VARCHAR(64) NOT NULL,
+                keyword VARCHAR(255) NOT NULL,
+                channel_count INT NOT NULL DEFAULT 0,
+                channel_set MEDIUMBLOB NOT NULL COMMENT 'zlib(delta-encoded sorted channels.id)',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                
+                PRIMARY KEY (task_id, keyword),
+                INDEX idx_keyword (keyword)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """,
+        
+        'ai_analysis_cache': """
+            CREATE TABLE IF NOT EXISTS ai_analysis_cache (
+                cache_key CHAR(64) PRIMARY KEY,
+                provider VARCHAR(20),
+                model_version VARCHAR(64),
+                analysis_detail JSON NOT NULL,
+                tokens_used INT DEFAULT 0,
+                hit_count INT DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_hit_at TIMESTAMP NULL,
+                
+                INDEX idx_last_hit (last_hit_at)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """,
+        
+        'task_keyword_channels': """
+            CREATE TABLE IF NOT EXISTS task_keyword_channels (
+                id INT PRIMARY KEY AUTO_INCREMENT,
+                task_id VARCHAR(64) NOT NULL,
+                keyword VARCHAR(255) NOT NULL,
+                channel_id VARCHAR(64) NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                
+                UNIQUE KEY uk_task_keyword_channel (task_id, keyword, channel_id),
+                INDEX idx_keyword_channel (keyword, channel_id),
+                INDEX idx_channel (channel_id)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """,
+        
         'api_keys': """
             CREATE TABLE IF NOT EXISTS api_keys (
                 id INT PRIMARY KEY AUTO_INCREMENT,
@@ -215,6 +318,27 @@ def add_foreign_keys(connection):
         ON DELETE CASCADE
         """,
         
+        """
+        ALTER TABLE videos
+        ADD CONSTRAINT fk_videos_channel
+        FOREIGN KEY (channel_id) REFERENCES channels(channel_id)
+        ON DELETE CASCADE
+        """,
+        
+        """
+        ALTER TABLE channel_videos
+        ADD CONSTRAINT fk_channel_videos_task
+        FOREIGN KEY (task_id) REFERENCES search_tasks(task_id)
+        ON DELETE CASCADE
+        """,
+        
+        """
+        ALTER TABLE channel_videos
+        ADD CONSTRAINT fk_channel_videos_video
+        FOREIGN KEY (video_id) REFERENCES videos(video_id)
+        ON DELETE CASCADE
+        """,
+        
         """
         ALTER TABLE ai_analysis
         ADD CONSTRAINT fk_analysis_channel
@@ -227,10 +351,36 @@ def add_foreign_keys(connection):
         ADD CONSTRAINT fk_analysis_task
         FOREIGN KEY (task_id) REFERENCES search_tasks(task_id)
         ON DELETE CASCADE
+        """,
+        
+        """
+        ALTER TABLE task_keyword_channels
+        ADD CONSTRAINT fk_keyword_channels_task
+        FOREIGN KEY (task_id) REFERENCES search_tasks(task_id)
+        ON DELETE CASCADE
+        """,
+        
+        """
+        ALTER TABLE task_channel_sets
+        ADD CONSTRAINT fk_channel_sets_task
+        FOREIGN KEY (task_id) REFERENCES search_tasks(task_id)
+        ON DELETE CASCADE
+        """,
+        
+        """
+        ALTER TABLE task_keyword_channels
+        ADD CONSTRAINT fk_keyword_channels_channel
+        FOREIGN KEY (channel_id) REFERENCES channels(channel_id)
+        ON DELETE CASCADE
         """
     ]
     
+    # partitioned tables cannot have foreign keys (see partition_fact_tables)
+    partitioned = partitioned_tables(connection)
+    
     for constraint_sql in constraints:
+        if re.search(r'ALTER TABLE (\w+)', constraint_sql).group(1) in partitioned:
+            continue
         try:
             cursor.execute(constraint_sql)
             logger.info("✓ Foreign key constraint added")
@@ -277,30 +427,331 @@ def seed_initial_data(connection):
     cursor.close()
 
 
-def create_schema_version_table(connection):
-    """Create schema migrations tracking table"""
-    
+def _json_value(value):
+    if value is None or isinstance(value, (list, dict)):
+        return value
+    return json.loads(value.decode('utf-8') if isinstance(value, (bytes, bytearray)) else value)
+
+
+def migrate_recent_videos(connection, batch_size=500, clear_blobs=False):
+    """Copy channel_video_stats.recent_videos blobs into videos / channel_videos
+
+    Runs as migration 0014. Safe to re-run: both tables are upserted. Stats rows are read in id order,
+    so videos ends up with the counts of the latest task that saw each video.
+    clear_blobs sets recent_videos to NULL once a batch is copied.
+    """
+    from bulk_writer import BulkWriter, video_rows
+
+    cursor = connection.cursor()
+    last_id = 0
+    migrated = {'stats_rows': 0, 'videos': 0}
+    with BulkWriter(connection, batch_size=batch_size, flush_interval=0) as writer:
+        while True:
+            cursor.execute("""
+                SELECT id, channel_id, task_id, recent_videos, video_languages
+                FROM channel_video_stats
+                WHERE id > %s AND recent_videos IS NOT NULL
+                ORDER BY id
+                LIMIT %s
+            """, (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            for _, channel_id, task_id, recent_videos, video_languages in rows:
+                videos = _json_value(recent_videos) or []
+                for table, row in video_rows(channel_id, task_id, videos, _json_value(video_languages)):
+                    writer.add(table, row)
+                migrated['videos'] += len(videos)
+            writer.flush()
+
+            if clear_blobs:
+                cursor.execute(
+                    "UPDATE channel_video_stats SET recent_videos = NULL WHERE id > %s AND id <= %s",
+                    (last_id, rows[-1][0]),
+                )
+                connection.commit()
+            last_id = rows[-1][0]
+            migrated['stats_rows'] += len(rows)
+
+    cursor.close()
+    logger.info(f"✓ Migrated {migrated['videos']} videos from {migrated['stats_rows']} stats rows")
+    return migrated
+
+
+def backfill_task_date(connection, batch_size=5000):
+    """Set task_date of rows written before the column existed
+
+    Runs as migration 0017. channel_video_stats / ai_analysis are walked in id ranges, channel_videos
+    one task's primary-key prefix at a time (LIMIT batch_size), committing after every statement, so no
+    transaction locks more than batch_size rows. Safe to re-run: only rows still at the default change.
+    """
+    cursor = connection.cursor()
+    updated = {}
+
+    for table in ('channel_video_stats', 'ai_analysis'):
+        started = time.perf_counter()
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+        max_id = cursor.fetchone()[0]
+        updated[table] = 0
+        for start in range(0, max_id, batch_size):
+            cursor.execute(f"""
+                UPDATE {table} x JOIN search_tasks t ON t.task_id = x.task_id
+                SET x.task_date = DATE(t.created_at)
+                WHERE x.id > %s AND x.id <= %s AND x.task_date = '1970-01-01'
+            """, (start, start + batch_size))
+            connection.commit()
+            updated[table] += cursor.rowcount
+        logger.info(f"    ✓ {time.perf_counter() - started:7.2f}s  {table}: {updated[table]} rows")
+
+    started = time.perf_counter()
+    cursor.execute("SELECT task_id, DATE(created_at) FROM search_tasks ORDER BY id")
+    updated['channel_videos'] = 0
+    for task_id, task_date in cursor.fetchall():
+        while True:
+            cursor.execute("""
+                UPDATE channel_videos SET task_date = %s
+                WHERE task_id = %s AND task_date = '1970-01-01'
+                LIMIT %s
+            """, (task_date, task_id, batch_size))
+            connection.commit()
+            updated['channel_videos'] += cursor.rowcount
+            if cursor.rowcount < batch_size:
+                break
+    logger.info(f"    ✓ {time.perf_counter() - started:7.2f}s  channel_videos: {updated['channel_videos']} rows")
+
+    cursor.close()
+    return updated
+
+
+# ── partitioning ──────────────────────────────────────────────────────
+
+# Fact tables partitioned by month of task_date. Every unique key must contain
+# the partition column, and partitioned InnoDB tables cannot have foreign keys.
+FACT_TABLES = {
+    'channel_video_stats': {
+        'primary_key': ('id', 'task_date'),
+        'unique_keys': {'uk_channel_task': ('channel_id', 'task_id', 'task_date')},
+        'foreign_keys': ('fk_stats_channel', 'fk_stats_task'),
+    },
+    'ai_analysis': {
+        'primary_key': ('id', 'task_date'),
+        'unique_keys': {'uk_channel_task': ('channel_id', 'task_id', 'task_date')},
+        'foreign_keys': ('fk_analysis_channel', 'fk_analysis_task'),
+    },
+    'channel_videos': {
+        'primary_key': ('task_id', 'channel_id', 'position', 'task_date'),
+        'unique_keys': {},
+        'foreign_keys': ('fk_channel_videos_task', 'fk_channel_videos_video'),
+    },
+}
+LEGACY_PARTITION = 'p_legacy'  # rows older than the first month when partitioning
+FUTURE_PARTITION = 'p_future'
+ARCHIVE_ROW_FORMAT = 'ROW_FORMAT=COMPRESSED KEY_BLOCK_SIZE=8'
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _month_range(first: date, last: date) -> list:
+    months = []
+    while first <= last:
+        months.append(first)
+        first = _add_months(first, 1)
+    return months
+
+
+def _partition_name(month: date) -> str:
+    return f"p{month:%Y%m}"
+
+
+def _partition_month(name: str):
+    match = re.fullmatch(r'p(\d{4})(\d{2})', name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def _partition_defs(months: list) -> str:
+    return ', '.join(
+        f"PARTITION {_partition_name(month)} VALUES LESS THAN ('{_add_months(month, 1)}')" for month in months
+    )
+
+
+def _timed(cursor, sql, params=None):
+    started = time.perf_counter()
+    cursor.execute(sql, params)
+    logger.info(f"    ✓ {time.perf_counter() - started:7.2f}s  {' '.join(sql.split())[:90]}")
+
+
+def partitioned_tables(connection) -> set:
     cursor = connection.cursor()
-    
     cursor.execute("""
-        CREATE TABLE IF NOT EXISTS schema_migrations (
-            version INT PRIMARY KEY,
-            description VARCHAR(255),
-            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        ) ENGINE=InnoDB
+        SELECT DISTINCT TABLE_NAME FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND PARTITION_NAME IS NOT NULL
     """)
-    
+    tables = {row[0] for row in cursor.fetchall()}
+    cursor.close()
+    return tables
+
+
+def table_partitions(connection, table) -> list:
+    cursor = connection.cursor()
     cursor.execute("""
-        INSERT IGNORE INTO schema_migrations (version, description) VALUES
-        (1, 'Initial schema'),
-        (2, 'Add incremental update support'),
-        (3, 'Add AI provider field'),
-        (4, 'Add language detection confidence')
-    """)
-    
-    logger.info("✓ Schema version tracking ready")
+        SELECT PARTITION_NAME FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """, (table,))
+    names = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    return names
+
+
+def partition_fact_tables(connection, months_ahead=3, today=None):
+    """Convert the fact tables to monthly RANGE COLUMNS(task_date) partitions
+
+    One-time and offline-ish: each table is copied (ALGORITHM=COPY, writes
+    blocked while it runs) and loses its foreign keys; task deletes no longer
+    cascade to it, retention is maintain_partitions' job.
+    """
+    this_month = (today or datetime.now(timezone.utc).date()).replace(day=1)
+    done = partitioned_tables(connection)
+    cursor = connection.cursor()
+
+    for table, spec in FACT_TABLES.items():
+        if table in done:
+            logger.info(f"✓ {table} already partitioned")
+            continue
+        cursor.execute(f"SELECT MIN(task_date) FROM {table} WHERE task_date > '1970-01-01'")
+        oldest = cursor.fetchone()[0]
+        first = min(oldest.replace(day=1), this_month) if oldest else this_month
+        months = _month_range(first, _add_months(this_month, months_ahead))
+
+        logger.info(f"Partitioning {table} ({len(months)} months from {first:%Y-%m})...")
+        for fk in spec['foreign_keys']:
+            try:
+                _timed(cursor, f"ALTER TABLE {table} DROP FOREIGN KEY {fk}")
+            except Error as e:
+                if e.errno != 1091:
+                    raise
+        keys = [f"DROP PRIMARY KEY, ADD PRIMARY KEY ({', '.join(spec['primary_key'])})"]
+        keys += [f"DROP INDEX {name}, ADD UNIQUE KEY {name} ({', '.join(columns)})"
+                 for name, columns in spec['unique_keys'].items()]
+        _timed(cursor, f"""
+            ALTER TABLE {table} {', '.join(keys)}
+            PARTITION BY RANGE COLUMNS(task_date) (
+                PARTITION {LEGACY_PARTITION} VALUES LESS THAN ('{first}'),
+                {_partition_defs(months)},
+                PARTITION {FUTURE_PARTITION} VALUES LESS THAN (MAXVALUE)
+            )
+        """)
+
+    cursor.close()
+
+
+def archive_partition(connection, table, partition):
+    """Move one partition into a compressed {table}_archive_YYYYMM table
+
+    EXCHANGE PARTITION swaps the rows into an empty staging table (metadata
+    only); the compression rebuild then runs on the staging table, not the
+    live one. Re-running after a failure resumes instead of losing rows.
+    """
+    suffix = partition[1:] if _partition_month(partition) else partition.replace('p_', '')
+    staging = f"{table}_x{suffix}"
+    archive = f"{table}_archive_{suffix}"
+    cursor = connection.cursor()
+
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {staging} LIKE {table}")
+    try:
+        cursor.execute(f"ALTER TABLE {staging} REMOVE PARTITIONING")
+    except Error as e:
+        if e.errno != 1505:  # not partitioned: left over from an earlier run
+            raise
+    cursor.execute(f"SELECT EXISTS(SELECT 1 FROM {staging})")
+    if not cursor.fetchone()[0]:
+        _timed(cursor, f"ALTER TABLE {table} EXCHANGE PARTITION {partition} WITH TABLE {staging}")
+    _timed(cursor, f"ALTER TABLE {staging} {ARCHIVE_ROW_FORMAT}")
+
+    cursor.execute("SHOW TABLES LIKE %s", (archive,))
+    if cursor.fetchone():
+        _timed(cursor, f"INSERT IGNORE INTO {archive} SELECT * FROM {staging}")
+        cursor.execute(f"DROP TABLE {staging}")
+    else:
+        _timed(cursor, f"RENAME TABLE {staging} TO {archive}")
     connection.commit()
+
+    cursor.execute(f"SELECT EXISTS(SELECT 1 FROM {table} PARTITION ({partition}))")
+    if cursor.fetchone()[0]:
+        raise RuntimeError(f"{table} partition {partition} not empty after archiving")
+    _timed(cursor, f"ALTER TABLE {table} DROP PARTITION {partition}")
+    cursor.close()
+    return archive
+
+
+def maintain_partitions(connection, retention_months=3, months_ahead=3, archive=True, today=None):
+    """Scheduled job: add future monthly partitions, archive (or drop) expired ones
+
+    A partition expires once its whole month is older than retention_months
+    full months. Expired search_tasks rows are deleted in small batches
+    afterwards (cascading only to the small per-task tables), and only once
+    every fact table is partitioned.
+    """
+    this_month = (today or datetime.now(timezone.utc).date()).replace(day=1)
+    cutoff = _add_months(this_month, -retention_months)
+    partitioned = partitioned_tables(connection)
+    cursor = connection.cursor()
+    summary = {'added': 0, 'archived': [], 'dropped': 0, 'tasks_deleted': 0}
+
+    for table in FACT_TABLES:
+        if table not in partitioned:
+            logger.warning(f"⚠ {table} is not partitioned (run --partition-fact-tables)")
+            continue
+        names = table_partitions(connection, table)
+        months = [m for m in map(_partition_month, names) if m]
+
+        wanted = _add_months(this_month, months_ahead)
+        start = _add_months(max(months), 1) if months else this_month
+        missing = _month_range(start, wanted)
+        if missing:
+            logger.info(f"{table}: adding {len(missing)} partitions up to {wanted:%Y-%m}")
+            _timed(cursor, f"""
+                ALTER TABLE {table} REORGANIZE PARTITION {FUTURE_PARTITION} INTO (
+                    {_partition_defs(missing)},
+                    PARTITION {FUTURE_PARTITION} VALUES LESS THAN (MAXVALUE)
+                )
+            """)
+            summary['added'] += len(missing)
+
+        expired = [name for name in names
+                   if name == LEGACY_PARTITION
+                   or (_partition_month(name) and _add_months(_partition_month(name), 1) <= cutoff)]
+        for name in expired:
+            logger.info(f"{table}: {'archiving' if archive else 'dropping'} {name}")
+            if archive:
+                summary['archived'].append(archive_partition(connection, table, name))
+            else:
+                _timed(cursor, f"ALTER TABLE {table} DROP PARTITION {name}")
+                summary['dropped'] += 1
+
+    # on an unpartitioned fact table the task delete cascades row by row through its FK
+    unpartitioned = [table for table in FACT_TABLES if table not in partitioned]
+    if unpartitioned:
+        logger.warning(f"⚠ Not deleting expired tasks: {', '.join(unpartitioned)} not partitioned")
+    while not unpartitioned:
+        cursor.execute("""
+            DELETE FROM search_tasks
+            WHERE created_at < %s AND status != 'running'
+            LIMIT 1000
+        """, (cutoff,))
+        connection.commit()
+        summary['tasks_deleted'] += cursor.rowcount
+        if cursor.rowcount < 1000:
+            break
+
     cursor.close()
+    logger.info(f"✓ Partitions: {summary['added']} added, {len(summary['archived'])} archived, "
+                f"{summary['dropped']} dropped; {summary['tasks_deleted']} expired tasks deleted")
+    return summary
 
 
 def main():
@@ -310,6 +761,22 @@ def main():
     parser.add_argument('--user', default='root', help='MySQL user')
     parser.add_argument('--password', required=True, help='MySQL password')
     parser.add_argument('--database', default='youtube_kol_db', help='Database name')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Only print the pending migrations of an existing database')
+    parser.add_argument('--clear-video-blobs', action='store_true',
+                        help='Set recent_videos to NULL once copied into videos / channel_videos')
+    parser.add_argument('--synthetic-channels', type=int, default=0,
+                        help='Also load N synthetic channels for load testing (see synthetic_data.py)')
+    parser.add_argument('--load-data', action='store_true',
+                        help='Load synthetic data with LOAD DATA LOCAL INFILE instead of INSERTs')
+    parser.add_argument('--partition-fact-tables', action='store_true',
+                        help='One-time: partition stats / analyses / video links by month (drops their FKs)')
+    parser.add_argument('--maintain-partitions', action='store_true',
+                        help='Scheduled job: add future partitions, archive expired ones, delete old tasks')
+    parser.add_argument('--retention-months', type=int, default=3, help='Full months of data to keep')
+    parser.add_argument('--months-ahead', type=int, default=3, help='Future monthly partitions to keep ready')
+    parser.add_argument('--drop-expired', action='store_true',
+                        help='Drop expired partitions instead of archiving them')
     
     args = parser.parse_args()
     
@@ -320,12 +787,29 @@ def main():
             host=args.host,
             port=args.port,
             user=args.user,
-            password=args.password
+            password=args.password,
+            allow_local_infile=args.load_data
         )
         
         if connection.is_connected():
             logger.info("✓ Connected to MySQL server")
             
+            if args.dry_run:
+                connection.database = args.database
+                run_migrations(connection, dry_run=True)
+                return
+            
+            # Maintenance commands work on an existing, migrated database
+            if args.partition_fact_tables or args.maintain_partitions:
+                connection.database = args.database
+                run_migrations(connection)
+                if args.partition_fact_tables:
+                    partition_fact_tables(connection, months_ahead=args.months_ahead)
+                if args.maintain_partitions:
+                    maintain_partitions(connection, retention_months=args.retention_months,
+                                        months_ahead=args.months_ahead, archive=not args.drop_expired)
+                return
+            
             # Create database
             create_database(connection, args.database)
             
@@ -344,9 +828,19 @@ def main():
             logger.info("\nSeeding initial data...")
             seed_initial_data(connection)
             
-            # Create schema version table
-            logger.info("\nSetting up schema versioning...")
-            create_schema_version_table(connection)
+            # Bring existing databases up to date
+            logger.info("\nApplying schema migrations...")
+            run_migrations(connection)
+            
+            if args.clear_video_blobs:
+                logger.info("\nClearing migrated recent_videos blobs...")
+                migrate_recent_videos(connection, clear_blobs=True)
+            
+            if args.synthetic_channels:
+                from synthetic_data import generate
+                logger.info(f"\nLoading {args.synthetic_channels:,d} synthetic channels...")
+                result = generate(connection, args.synthetic_channels, load_data=args.load_data)
+                logger.info(f"✓ {sum(result['rows'].values()):,d} synthetic rows in {result['seconds']:.1f}s")
             
             logger.info("\n✅ Database initialization completed successfully!")
             logger.info(f"\nDatabase: {args.database}")
@@ -355,7 +849,7 @@ def main():
             logger.info("2. Add your API keys via the web interface")
             logger.info("3. Start the application with: docker-compose up -d")
             
-    except Error as e:
+    except (Error, RuntimeError) as e:
         logger.error(f"\n❌ Database initialization failed: {e}")
         sys.exit(1)
     
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Vectorized language identification for channels and videos
+
+Replaces one `langdetect.detect` call per text (10+ per channel) with a
+batch engine:
+
+- n-gram profiles (langdetect's 55 language profiles) are loaded once into a
+  sorted n-gram key array and a (n-grams × languages) log-probability matrix
+- a whole batch of texts is turned into one codepoint array; 1-3 character
+  grams are encoded as integers, looked up with `np.searchsorted` and summed
+  per text in a single pass
+- texts dominated by Hangul, kana, Han, Cyrillic or Arabic script are
+  labelled ko / ja / zh / ru / ar without n-gram scoring
+- no sampling, so the same text always gets the same answer
+- LanguageDetectionStage runs it on a warmed process pool for asyncio callers
+
+Scoring follows langdetect's model (log(p(gram|lang) + alpha)) but uses every
+gram instead of random trials.
+
+Usage:
+    python language_detector.py "text one" "text two" ...
+    python language_detector.py --channels channels.json    # youtube_collector.py --output
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+ALPHA = 0.5 / 10000        # langdetect's ALPHA_DEFAULT / BASE_FREQ
+CHUNK_CELLS = 4_000_000    # texts × distinct grams per count-matrix block
+SCRIPT_SHARE = 0.5         # share of letters a script needs for the fast path
+MIN_GRAMS = 1
+LANGUAGE_ALIASES = {'zh-cn': 'zh', 'zh-tw': 'zh'}
+
+URL_RE = re.compile(r'https?://[-_.?&~;+=/#0-9A-Za-z]{1,2076}')
+MAIL_RE = re.compile(r'[-_.0-9A-Za-z]{1,64}@[-_0-9A-Za-z]{1,255}[-_.0-9A-Za-z]{1,255}')
+
+# (first codepoint, last codepoint, script); other letters count as 'letter',
+# everything else (digits, punctuation, spaces) is ignored
+SCRIPT_RANGES = [
+    (0x0400, 0x052F, 'cyrillic'),
+    (0x0600, 0x06FF, 'arabic'), (0x0750, 0x077F, 'arabic'), (0xFB50, 0xFDFF, 'arabic'),
+    (0x1100, 0x11FF, 'hangul'), (0x3130, 0x318F, 'hangul'), (0xAC00, 0xD7AF, 'hangul'),
+    (0x3040, 0x30FF, 'kana'), (0x31F0, 0x31FF, 'kana'), (0xFF66, 0xFF9F, 'kana'),
+    (0x3400, 0x4DBF, 'han'), (0x4E00, 0x9FFF, 'han'), (0xF900, 0xFAFF, 'han'),
+]
+SCRIPTS = ('none', 'letter', 'cyrillic', 'arabic', 'hangul', 'kana', 'han')
+
+
+def default_profiles_dir() -> str:
+    """langdetect ships its profiles as JSON files; only the data is used"""
+    spec = importlib.util.find_spec('langdetect')
+    if spec is None:
+        raise ImportError("langdetect profiles not found (pip install langdetect) "
+                          "or pass profiles_dir")
+    return os.path.join(os.path.dirname(spec.origin), 'profiles')
+
+
+def _script_of(codepoint: int) -> int:
+    for first, last, script in SCRIPT_RANGES:
+        if first <= codepoint <= last:
+            return SCRIPTS.index(script)
+    return SCRIPTS.index('letter') if unicodedata.category(chr(codepoint))[0] == 'L' else 0
+
+
+class _CharNormalizer(dict):
+    """str.translate table that normalizes (and caches) each char like langdetect"""
+
+    def __init__(self):
+        super().__init__()
+        try:
+            from langdetect.utils.ngram import NGram
+            self._normalize = NGram.normalize
+        except ImportError:
+            self._normalize = self._fallback
+
+    @staticmethod
+    def _fallback(ch: str) -> str:
+        return ch if unicodedata.category(ch)[0] == 'L' else ' '
+
+    def __missing__(self, codepoint: int) -> str:
+        value = self._normalize(chr(codepoint))
+        self[codepoint] = value
+        return value
+
+
+def _encode(gram: str) -> int:
+    """1-3 codepoints packed into 21-bit fields (longer grams sort higher)"""
+    key = 0
+    for ch in gram:
+        key = (key << 21) | ord(ch)
+    return key
+
+
+def channel_texts(channel: dict) -> list:
+    """Description first, then one title + description text per recent video"""
+    texts = [(channel.get('description') or '')[:500]]
+    for video in channel.get('recent_videos') or []:
+        texts.append(f"{video.get('title') or ''} {(video.get('description') or '')[:200]}")
+    return texts
+
+
+class LanguageDetector:
+    """Batch language identification; create once and reuse (profiles load once)"""
+
+    def __init__(self, profiles_dir: str = None, languages: list = None):
+        profiles_dir = profiles_dir or default_profiles_dir()
+        names = sorted(languages or os.listdir(profiles_dir))
+
+        profiles = {}
+        for name in names:
+            with open(os.path.join(profiles_dir, name), encoding='utf-8') as f:
+                profiles[name] = json.load(f)
+
+        vocabulary = sorted({_encode(g) for p in profiles.values() for g in p['freq'] if 1 <= len(g) <= 3})
+        self.keys = np.array(vocabulary, dtype=np.int64)
+        self.languages = [LANGUAGE_ALIASES.get(name, name) for name in names]
+
+        freq = np.zeros((len(self.keys), len(names)), dtype=np.float64)
+        for column, name in enumerate(names):
+            profile = profiles[name]
+            grams = [g for g in profile['freq'] if 1 <= len(g) <= 3]
+            rows = np.searchsorted(self.keys, [_encode(g) for g in grams])
+            counts = np.array([profile['freq'][g] for g in grams], dtype=np.float64)
+            totals = np.array([profile['n_words'][len(g) - 1] for g in grams], dtype=np.float64)
+            freq[rows, column] = counts / totals
+        self.log_prob = np.log(freq + ALPHA).astype(np.float32)
+
+        self._normalizer = _CharNormalizer()
+        self._scripts = {}
+        self._fast_path = {
+            SCRIPTS.index('hangul'): 'ko',
+            SCRIPTS.index('cyrillic'): 'ru',
+            SCRIPTS.index('arabic'): 'ar',
+        }
+
+    # ── batch scoring ────────────────────────────────────────────────
+
+    def _codepoints(self, texts: list) -> tuple:
+        """One codepoint stream for the batch: ' text ' blocks separated by NUL"""
+        cleaned = [MAIL_RE.sub(' ', URL_RE.sub(' ', (t or '').replace('\0', ' '))) for t in texts]
+        raw = '\0'.join(f' {t} ' for t in cleaned)
+        codes = np.frombuffer(raw.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+        normalized = raw.translate(self._normalizer)
+        norm = np.frombuffer(normalized.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+        norm[codes == 0] = 0  # keep the text separators
+        text_ids = np.cumsum(codes == 0)
+        return codes, norm, text_ids
+
+    def _script_shares(self, codes: np.ndarray, text_ids: np.ndarray, count: int) -> np.ndarray:
+        """(texts × scripts) character counts"""
+        unique, inverse = np.unique(codes, return_inverse=True)
+        for codepoint in unique.tolist():
+            if codepoint not in self._scripts:
+                self._scripts[codepoint] = _script_of(codepoint)
+        scripts = np.array([self._scripts[c] for c in unique.tolist()], dtype=np.int64)[inverse]
+        table = np.bincount(text_ids * len(SCRIPTS) + scripts, minlength=count * len(SCRIPTS))
+        return table.reshape(count, len(SCRIPTS))
+
+    def _gram_keys(self, norm: np.ndarray, text_ids: np.ndarray) -> tuple:
+        """Encoded 1-3 grams (langdetect's word-bounded rules) and their text ids"""
+        space, n = ord(' '), len(norm)
+        upper = np.zeros(n, dtype=bool)
+        letters = np.unique(norm)
+        upper_letters = letters[[chr(c).isupper() for c in letters]]
+        upper[np.isin(norm, upper_letters)] = True
+        capital = np.zeros(n, dtype=bool)
+        capital[1:] = upper[1:] & upper[:-1]  # inside an all-caps word
+
+        keys, owners = [], []
+        c0 = norm
+        ok = (c0 != 0) & (c0 != space) & ~capital
+        keys.append(c0[ok])
+        owners.append(text_ids[ok])
+
+        c0, c1 = norm[:-1], norm[1:]
+        ok = (c0 != 0) & (c1 != 0) & ~((c0 == space) & (c1 == space)) & ~capital[1:]
+        keys.append(((c0 << 21) | c1)[ok])
+        owners.append(text_ids[1:][ok])
+
+        c0, c1, c2 = norm[:-2], norm[1:-1], norm[2:]
+        ok = (c0 != 0) & (c2 != 0) & (c1 != space) & (c1 != 0) & ~capital[2:]
+        keys.append(((c0 << 42) | (c1 << 21) | c2)[ok])
+        owners.append(text_ids[2:][ok])
+
+        keys = np.concatenate(keys)
+        owners = np.concatenate(owners)
+        rows = np.searchsorted(self.keys, keys)
+        rows[rows == len(self.keys)] = 0
+        known = self.keys[rows] == keys
+        return rows[known], owners[known]
+
+    def _ngram_scores(self, rows: np.ndarray, owners: np.ndarray, count: int) -> tuple:
+        """(texts × languages) log-likelihoods and grams per text
+
+        Texts are scored in blocks: a (texts × distinct grams) count matrix
+        times the matching rows of the log-probability matrix.
+        """
+        scores = np.zeros((count, len(self.languages)), dtype=np.float32)
+        grams = np.bincount(owners, minlength=count)
+        order = np.argsort(owners, kind='stable')
+        rows, owners = rows[order], owners[order]
+        ends = np.cumsum(grams)
+
+        first = 0
+        while first < count:
+            # grow the block while texts × grams (an upper bound on its cells) fits CHUNK_CELLS
+            start = ends[first - 1] if first else 0
+            candidates = np.arange(first + 1, min(count, first + 4096) + 1)
+            cost = (candidates - first) * (ends[candidates - 1] - start)
+            last = first + max(1, int(np.searchsorted(cost, CHUNK_CELLS, side='right')))
+            lo, hi = start, ends[last - 1]
+            if hi > lo:
+                distinct, column = np.unique(rows[lo:hi], return_inverse=True)
+                local = owners[lo:hi] - first
+                width = len(distinct)
+                counts = np.bincount(local * width + column, minlength=(last - first) * width)
+                counts = counts.reshape(last - first, width).astype(np.float32)
+                scores[first:last] = counts @ self.log_prob[distinct]
+            first = last
+        return scores, grams
+
+    def detect_batch(self, texts: list) -> list:
+        """[(language, probability)] per text; ('unknown', 0.0) when there is nothing to score"""
+        if not texts:
+            return []
+        count = len(texts)
+        codes, norm, text_ids = self._codepoints(texts)
+        shares = self._script_shares(codes, text_ids, count)
+
+        # script fast path first; only the remaining texts are n-gram scored
+        labels = np.full(count, -1, dtype=np.int64)
+        threshold = SCRIPT_SHARE * shares[:, 1:].sum(axis=1)
+        has_letters = threshold > 0
+        kana, han = SCRIPTS.index('kana'), SCRIPTS.index('han')
+        fast = [(has_letters & (shares[:, kana] > 0) & (shares[:, kana] + shares[:, han] >= threshold), 'ja'),
+                (has_letters & (shares[:, han] >= threshold), 'zh')]
+        fast += [(has_letters & (shares[:, script] >= threshold), language)
+                 for script, language in self._fast_path.items()]
+        fast_languages = []
+        for mask, language in fast:
+            labels[(labels == -1) & mask] = len(fast_languages)
+            fast_languages.append(language)
+
+        rows, owners = self._gram_keys(norm, text_ids)
+        keep = labels[owners] == -1
+        scores, grams = self._ngram_scores(rows[keep], owners[keep], count)
+
+        best = np.argmax(scores, axis=1)
+        probs = np.exp(scores - scores.max(axis=1, keepdims=True), dtype=np.float64)
+        confidence = probs[np.arange(count), best] / probs.sum(axis=1)
+
+        results = []
+        for i in range(count):
+            if labels[i] >= 0:
+                results.append((fast_languages[labels[i]], 1.0))
+            elif grams[i] < MIN_GRAMS:
+                results.append(('unknown', 0.0))
+            else:
+                results.append((self.languages[best[i]], float(confidence[i])))
+        return results
+
+    def detect(self, text: str) -> str:
+        return self.detect_batch([text])[0][0]
+
+    # ── channels ─────────────────────────────────────────────────────
+
+    @staticmethod
+    def _vote(desc_lang: str, video_langs: list) -> dict:
+        """Statistical voting over videos, cross-checked with the description"""
+        votes = Counter(lang for lang in video_langs if lang != 'unknown')
+        if not votes:
+            return {'language': desc_lang, 'confidence': 0.5 if desc_lang != 'unknown' else 0.0,
+                    'distribution': {}, 'video_languages': video_langs}
+
+        language, count = votes.most_common(1)[0]
+        confidence = count / len(video_langs)
+        if desc_lang == language:
+            confidence = min(confidence + 0.2, 1.0)
+        return {'language': language, 'confidence': round(confidence, 3),
+                'distribution': dict(votes), 'video_languages': video_langs}
+
+    def detect_texts(self, items: list) -> dict:
+        """[(channel_id, [description, video text, ...])] → channel_id → vote, one batch for all"""
+        texts, spans = [], []
+        for channel_id, channel_texts in items:
+            spans.append((channel_id, len(texts), len(channel_texts)))
+            texts.extend(channel_texts)
+
+        detected = [lang for lang, _ in self.detect_batch(texts)]
+        return {
+            channel_id: self._vote(detected[start], detected[start + 1:start + size])
+            for channel_id, start, size in spans
+        }
+
+    def detect_channels(self, channels: list) -> dict:
+        """channel_id → {language, confidence, distribution, video_languages}"""
+        return self.detect_texts([(c['channel_id'], channel_texts(c)) for c in channels])
+
+    def detect_channel_language(self, channel: dict) -> dict:
+        return self.detect_channels([channel])[channel['channel_id']]
+
+
+_detector = None
+_detector_lock = threading.Lock()
+
+
+def get_detector() -> LanguageDetector:
+    """Process-wide detector (profiles are loaded on first use only)"""
+    global _detector
+    with _detector_lock:
+        if _detector is None:
+            _detector = LanguageDetector()
+        return _detector
+
+
+def _warm_worker():
+    get_detector()
+
+
+def _detect_in_worker(items: list) -> dict:
+    return get_detector().detect_texts(items)
+
+
+class LanguageDetectionStage:
+    """Language detection on a process pool, awaited from asyncio code
+
+    Every worker loads the profiles once at start(); callers hand over
+    (channel_id, texts) batches and only await the results, so detection
+    never runs on the event loop and scales with the number of cores.
+    """
+
+    def __init__(self, workers: int = None, batch_channels: int = 50):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_channels = batch_channels
+        self.executor = None
+
+    def start(self):
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=get_detector)
+        # the initializer loads profiles in every worker; waiting on one warm-up
+        # job per worker keeps that load off the first real batch
+        for future in [self.executor.submit(_warm_worker) for _ in range(self.workers)]:
+            future.result()
+        logger.info(f"✓ Language detection stage ready ({self.workers} workers)")
+        return self
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    async def __aenter__(self):
+        await asyncio.to_thread(self.start)
+        return self
+
+    async def __aexit__(self, *exc):
+        await asyncio.to_thread(self.close)
+
+    async def detect(self, items: list) -> dict:
+        """[(channel_id, texts)] → channel_id → vote; batches run on all workers in parallel"""
+        loop = asyncio.get_running_loop()
+        batches = [items[i:i + self.batch_channels] for i in range(0, len(items), self.batch_channels)]
+        results = {}
+        for part in await asyncio.gather(*(
+            loop.run_in_executor(self.executor, _detect_in_worker, batch) for batch in batches
+        )):
+            results.update(part)
+        return results
+
+    async def detect_channels(self, channels) -> dict:
+        return await self.detect([(c['channel_id'], channel_texts(c)) for c in channels])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Detect text / channel languages')
+    parser.add_argument('texts', nargs='*', help='Texts to classify')
+    parser.add_argument('--channels', help='JSON file written by youtube_collector.py --output')
+
+    args = parser.parse_args()
+
+    detector = get_detector()
+    for text, (language, probability) in zip(args.texts, detector.detect_batch(args.texts)):
+        logger.info(f"  {language:8s} {probability:.3f}  {text[:60]}")
+
+    if args.channels:
+        with open(args.channels, encoding='utf-8') as f:
+            channels = list(json.load(f).values())
+        results = detector.detect_channels(channels)
+        for channel in channels:
+            result = results[channel['channel_id']]
+            logger.info(f"  {result['language']:8s} {result['confidence']:.2f}  {channel.get('channel_title', '')}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations for existing databases
+
+create_tables only uses CREATE TABLE IF NOT EXISTS, so column and index
+changes never reach a database that already exists. Migrations live in
+scripts/migrations/ as NNNN_description.sql (statements ending in ';' at the
+end of a line, '--' comment lines) or NNNN_description.py (defines
+upgrade(connection)) and are applied in version order:
+
+- applied versions are recorded in schema_migrations with the file checksum
+  and the time the migration took
+- steps are idempotent: "already exists" errors (duplicate column, index,
+  table or foreign key, dropping something that is gone) count as done, so a
+  migration that failed halfway can simply be re-run
+- ALTER TABLE runs as online DDL (ALGORITHM=INPLACE, LOCK=NONE); if MySQL
+  cannot do that change in place it falls back to the default algorithm
+- every step is timed; --dry-run prints the plan without touching anything
+
+Usage:
+    python migrate.py --password PASS [--dry-run] [--target VERSION]
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import logging
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from mysql.connector import Error
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / 'migrations'
+LOCK_NAME = 'youtube_kol_schema_migrations'
+LOCK_TIMEOUT = 10
+
+ONLINE_DDL = 'ALGORITHM=INPLACE, LOCK=NONE'
+
+# errno → what it means for an idempotent step
+ALREADY_APPLIED = {
+    1050: 'table exists',
+    1060: 'column exists',
+    1061: 'index exists',
+    1091: 'nothing to drop',
+    1826: 'foreign key exists',
+}
+# ER_ALTER_OPERATION_NOT_SUPPORTED(_REASON): not possible in place / without a lock
+ONLINE_DDL_UNSUPPORTED = (1845, 1846)
+
+_FILE_PATTERN = re.compile(r'^(\d{4})_(\w+)\.(sql|py)$')
+
+
+@dataclass
+class Migration:
+    version: int
+    description: str
+    path: Path
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.path.read_bytes()).hexdigest()
+
+    def statements(self) -> list:
+        """SQL statements of a .sql migration, comments removed"""
+        lines = [line for line in self.path.read_text(encoding='utf-8').splitlines()
+                 if not line.strip().startswith('--')]
+        return [s.strip() for s in re.split(r';\s*$', '\n'.join(lines), flags=re.M) if s.strip()]
+
+
+def discover(directory: Path = MIGRATIONS_DIR) -> list:
+    """Migrations in version order; duplicate versions are an error"""
+    migrations = {}
+    for path in sorted(directory.iterdir()):
+        match = _FILE_PATTERN.match(path.name)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version {version}: {path.name}")
+        description = match.group(2).replace('_', ' ').capitalize()
+        migrations[version] = Migration(version, description, path)
+    return [migrations[v] for v in sorted(migrations)]
+
+
+def online(statement: str) -> str:
+    """Add ALGORITHM=INPLACE, LOCK=NONE to an ALTER TABLE that does not choose its own"""
+    if re.match(r'ALTER\s+TABLE\b', statement, re.I) and not re.search(r'\bALGORITHM\s*=', statement, re.I):
+        return f"{statement}, {ONLINE_DDL}"
+    return statement
+
+
+def _summary(statement: str, width: int = 90) -> str:
+    text = ' '.join(statement.split())
+    return text if len(text) <= width else text[:width - 1] + '…'
+
+
+def ensure_migrations_table(connection):
+    cursor = connection.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(255),
+            checksum CHAR(64) NULL,
+            execution_ms INT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB
+    """)
+    # tables created before the runner existed have neither column
+    for column in ("checksum CHAR(64) NULL AFTER description", "execution_ms INT NULL AFTER checksum"):
+        try:
+            cursor.execute(f"ALTER TABLE schema_migrations ADD COLUMN {column}")
+        except Error as e:
+            if e.errno != 1060:
+                raise
+    cursor.close()
+
+
+def applied_versions(connection) -> dict:
+    """version → checksum (None for versions recorded before checksums)"""
+    cursor = connection.cursor()
+    cursor.execute("SELECT version, checksum FROM schema_migrations")
+    applied = dict(cursor.fetchall())
+    cursor.close()
+    return applied
+
+
+class MigrationRunner:
+    """Applies pending migrations; one runner at a time via GET_LOCK"""
+
+    def __init__(self, connection, directory: Path = MIGRATIONS_DIR, dry_run: bool = False):
+        self.connection = connection
+        self.directory = directory
+        self.dry_run = dry_run
+
+    def pending(self, target: int = None) -> list:
+        applied = applied_versions(self.connection) if self._table_exists() else {}
+        pending = []
+        for migration in discover(self.directory):
+            if target is not None and migration.version > target:
+                break
+            if migration.version in applied:
+                recorded = applied[migration.version]
+                if recorded and recorded != migration.checksum:
+                    logger.warning(f"⚠ Migration {migration.version} changed after it was applied")
+                continue
+            pending.append(migration)
+        return pending
+
+    def run(self, target: int = None) -> list:
+        """Apply (or with dry_run, list) pending migrations; returns [(version, seconds)]"""
+        if not self.dry_run:
+            ensure_migrations_table(self.connection)
+        pending = self.pending(target)
+        if not pending:
+            logger.info("✓ Schema is up to date")
+            return []
+
+        results = []
+        self._lock()
+        try:
+            for migration in pending:
+                results.append((migration.version, self._apply(migration)))
+        finally:
+            self._unlock()
+
+        if not self.dry_run:
+            total = sum(seconds for _, seconds in results)
+            logger.info(f"✓ Applied {len(results)} migrations in {total:.2f}s")
+        return results
+
+    def _apply(self, migration: Migration) -> float:
+        prefix = '[dry-run] ' if self.dry_run else ''
+        logger.info(f"{prefix}→ {migration.version:04d} {migration.description}")
+        started = time.perf_counter()
+
+        if migration.path.suffix == '.sql':
+            for statement in migration.statements():
+                self._execute(statement)
+        elif self.dry_run:
+            logger.info(f"    would run {migration.path.name}:upgrade()")
+        else:
+            step_started = time.perf_counter()
+            self._load(migration).upgrade(self.connection)
+            self.connection.commit()
+            logger.info(f"    ✓ {time.perf_counter() - step_started:7.2f}s  {migration.path.name}:upgrade()")
+
+        elapsed = time.perf_counter() - started
+        if not self.dry_run:
+            self._record(migration, elapsed)
+        return elapsed
+
+    def _execute(self, statement: str):
+        sql = online(statement)
+        if self.dry_run:
+            logger.info(f"    {_summary(sql)}")
+            return
+
+        cursor = self.connection.cursor()
+        started = time.perf_counter()
+        try:
+            try:
+                cursor.execute(sql)
+            except Error as e:
+                if sql == statement or e.errno not in ONLINE_DDL_UNSUPPORTED:
+                    raise
+                logger.warning(f"    ⚠ Not possible online ({e.msg}), using the default algorithm")
+                cursor.execute(statement)
+            self.connection.commit()
+            logger.info(f"    ✓ {time.perf_counter() - started:7.2f}s  {_summary(statement)}")
+        except Error as e:
+            if e.errno not in ALREADY_APPLIED:
+                logger.error(f"    ❌ {_summary(statement)}: {e}")
+                raise
+            logger.info(f"    ✓ {time.perf_counter() - started:7.2f}s  {_summary(statement)} "
+                        f"({ALREADY_APPLIED[e.errno]})")
+        finally:
+            cursor.close()
+
+    def _record(self, migration: Migration, elapsed: float):
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            INSERT INTO schema_migrations (version, description, checksum, execution_ms)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE checksum = VALUES(checksum), execution_ms = VALUES(execution_ms)
+        """, (migration.version, migration.description, migration.checksum, int(elapsed * 1000)))
+        self.connection.commit()
+        cursor.close()
+
+    @staticmethod
+    def _load(migration: Migration):
+        spec = importlib.util.spec_from_file_location(f"migration_{migration.version:04d}", migration.path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    def _table_exists(self) -> bool:
+        cursor = self.connection.cursor()
+        cursor.execute("SHOW TABLES LIKE 'schema_migrations'")
+        exists = cursor.fetchone() is not None
+        cursor.close()
+        return exists
+
+    def _lock(self):
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (LOCK_NAME, LOCK_TIMEOUT))
+        acquired = cursor.fetchone()[0]
+        cursor.close()
+        if acquired != 1:
+            raise RuntimeError("Another migration run holds the schema lock")
+
+    def _unlock(self):
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+        cursor.fetchone()
+        cursor.close()
+
+
+def run_migrations(connection, dry_run: bool = False, target: int = None) -> list:
+    return MigrationRunner(connection, dry_run=dry_run).run(target)
+
+
+def main():
+    import mysql.connector
+
+    parser = argparse.ArgumentParser(description='Apply pending schema migrations')
+    parser.add_argument('--host', default='localhost', help='MySQL host')
+    parser.add_argument('--port', type=int, default=3306, help='MySQL port')
+    parser.add_argument('--user', default='root', help='MySQL user')
+    parser.add_argument('--password', required=True, help='MySQL password')
+    parser.add_argument('--database', default='youtube_kol_db', help='Database name')
+    parser.add_argument('--dry-run', action='store_true', help='Print pending steps without running them')
+    parser.add_argument('--target', type=int, help='Stop after this version')
+
+    args = parser.parse_args()
+
+    connection = mysql.connector.connect(host=args.host, port=args.port, user=args.user,
+                                         password=args.password, database=args.database)
+    try:
+        run_migrations(connection, dry_run=args.dry_run, target=args.target)
+    except (Error, RuntimeError) as e:
+        logger.error(f"❌ Migration failed: {e}")
+        raise SystemExit(1)
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
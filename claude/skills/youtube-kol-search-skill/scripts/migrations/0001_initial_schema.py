@@ -0,0 +1,8 @@
+"""Initial schema: every table create_tables knows about, plus foreign keys"""
+
+
+def upgrade(connection):
+    from init_database import add_foreign_keys, create_tables
+
+    create_tables(connection)
+    add_foreign_keys(connection)
@@ -0,0 +1,5 @@
+-- Incremental re-search of a keyword against a parent task
+ALTER TABLE search_tasks ADD COLUMN is_incremental BOOLEAN DEFAULT 0;
+ALTER TABLE search_tasks ADD COLUMN parent_task_id VARCHAR(64);
+ALTER TABLE search_tasks ADD COLUMN new_channels_count INT DEFAULT 0;
+ALTER TABLE search_tasks ADD INDEX idx_parent (parent_task_id);
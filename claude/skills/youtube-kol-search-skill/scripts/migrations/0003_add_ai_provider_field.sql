@@ -0,0 +1,2 @@
+ALTER TABLE ai_analysis ADD COLUMN ai_provider VARCHAR(20);
+ALTER TABLE ai_analysis ADD INDEX idx_provider (ai_provider);
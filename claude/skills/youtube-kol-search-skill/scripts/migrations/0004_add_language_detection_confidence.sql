@@ -0,0 +1 @@
+ALTER TABLE channels ADD COLUMN language_confidence FLOAT AFTER detected_language;
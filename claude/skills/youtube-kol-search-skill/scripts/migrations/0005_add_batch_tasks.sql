@@ -0,0 +1,3 @@
+-- Multi-keyword batch tasks
+ALTER TABLE search_tasks ADD COLUMN task_type ENUM('single', 'batch') DEFAULT 'single' AFTER keyword;
+ALTER TABLE search_tasks ADD COLUMN keywords JSON COMMENT 'All keywords of a batch task' AFTER task_type;
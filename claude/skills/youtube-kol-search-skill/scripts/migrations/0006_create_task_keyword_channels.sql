@@ -0,0 +1,16 @@
+-- Which keyword(s) of a batch task found each channel
+CREATE TABLE IF NOT EXISTS task_keyword_channels (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    task_id VARCHAR(64) NOT NULL,
+    keyword VARCHAR(255) NOT NULL,
+    channel_id VARCHAR(64) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    UNIQUE KEY uk_task_keyword_channel (task_id, keyword, channel_id),
+    INDEX idx_keyword_channel (keyword, channel_id),
+    INDEX idx_channel (channel_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+ALTER TABLE task_keyword_channels ADD CONSTRAINT fk_keyword_channels_task
+    FOREIGN KEY (task_id) REFERENCES search_tasks(task_id) ON DELETE CASCADE;
+ALTER TABLE task_keyword_channels ADD CONSTRAINT fk_keyword_channels_channel
+    FOREIGN KEY (channel_id) REFERENCES channels(channel_id) ON DELETE CASCADE;
@@ -0,0 +1,3 @@
+ALTER TABLE search_tasks ADD COLUMN plan_type ENUM('full', 'truncated', 'channel_only') NULL COMMENT 'Quota plan chosen by the planner';
+ALTER TABLE search_tasks ADD COLUMN planned_units INT NULL COMMENT 'Estimated YouTube quota units';
+ALTER TABLE search_tasks ADD COLUMN actual_units INT NULL COMMENT 'YouTube quota units actually used';
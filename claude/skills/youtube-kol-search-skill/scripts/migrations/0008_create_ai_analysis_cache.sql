@@ -0,0 +1,13 @@
+-- AI analyses keyed by channel snapshot + product config hash (analysis_cache.py)
+CREATE TABLE IF NOT EXISTS ai_analysis_cache (
+    cache_key CHAR(64) PRIMARY KEY,
+    provider VARCHAR(20),
+    model_version VARCHAR(64),
+    analysis_detail JSON NOT NULL,
+    tokens_used INT DEFAULT 0,
+    hit_count INT DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_hit_at TIMESTAMP NULL,
+
+    INDEX idx_last_hit (last_hit_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,13 @@
+-- Compressed per-keyword channel set of each task (channel_sets.py)
+CREATE TABLE IF NOT EXISTS task_channel_sets (
+    task_id VARCHAR(64) NOT NULL,
+    keyword VARCHAR(255) NOT NULL,
+    channel_count INT NOT NULL DEFAULT 0,
+    channel_set MEDIUMBLOB NOT NULL COMMENT 'zlib(delta-encoded sorted channels.id)',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (task_id, keyword),
+    INDEX idx_keyword (keyword)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+ALTER TABLE task_channel_sets ADD CONSTRAINT fk_channel_sets_task
+    FOREIGN KEY (task_id) REFERENCES search_tasks(task_id) ON DELETE CASCADE;
@@ -0,0 +1,3 @@
+ALTER TABLE search_tasks ADD COLUMN search_units INT NULL COMMENT 'search.list units used by this task';
+ALTER TABLE search_tasks ADD COLUMN full_search_units INT NULL COMMENT 'search.list units of a full (non-incremental) search';
+ALTER TABLE search_tasks ADD COLUMN units_saved INT NULL COMMENT 'full_search_units - search_units for incremental tasks';
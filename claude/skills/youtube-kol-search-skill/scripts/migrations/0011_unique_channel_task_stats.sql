@@ -0,0 +1,6 @@
+-- One stats row per (channel, task) so bulk_writer.py can upsert; keep the newest duplicate
+DELETE older FROM channel_video_stats older
+JOIN channel_video_stats newer
+  ON newer.channel_id = older.channel_id AND newer.task_id = older.task_id AND newer.id > older.id;
+ALTER TABLE channel_video_stats ADD UNIQUE KEY uk_channel_task (channel_id, task_id);
+ALTER TABLE channel_video_stats DROP INDEX idx_channel_task;
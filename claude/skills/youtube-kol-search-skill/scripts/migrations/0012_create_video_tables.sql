@@ -0,0 +1,40 @@
+-- Recent videos as rows instead of the channel_video_stats.recent_videos blob
+-- (channel_videos already has task_date: bulk_writer.py, which 0014 copies with, writes it)
+CREATE TABLE IF NOT EXISTS videos (
+    video_id VARCHAR(32) PRIMARY KEY,
+    channel_id VARCHAR(64) NOT NULL,
+    title VARCHAR(255) NOT NULL DEFAULT '',
+    description TEXT,
+    language VARCHAR(10),
+    published_at DATETIME NULL,
+    view_count BIGINT DEFAULT 0,
+    like_count INT DEFAULT 0,
+    comment_count INT DEFAULT 0,
+    engagement_rate FLOAT DEFAULT 0,
+    first_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+    INDEX idx_channel_published (channel_id, published_at, view_count, like_count, comment_count),
+    INDEX idx_published (published_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+CREATE TABLE IF NOT EXISTS channel_videos (
+    task_id VARCHAR(64) NOT NULL,
+    task_date DATE NOT NULL DEFAULT '1970-01-01' COMMENT 'Partition key: DATE(search_tasks.created_at)',
+    channel_id VARCHAR(64) NOT NULL,
+    position TINYINT UNSIGNED NOT NULL,
+    video_id VARCHAR(32) NOT NULL,
+    view_count BIGINT DEFAULT 0,
+    like_count INT DEFAULT 0,
+    comment_count INT DEFAULT 0,
+    engagement_rate FLOAT DEFAULT 0,
+
+    PRIMARY KEY (task_id, channel_id, position),
+    INDEX idx_channel_task (channel_id, task_id, position, video_id),
+    INDEX idx_video_task (video_id, task_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+ALTER TABLE videos ADD CONSTRAINT fk_videos_channel
+    FOREIGN KEY (channel_id) REFERENCES channels(channel_id) ON DELETE CASCADE;
+ALTER TABLE channel_videos ADD CONSTRAINT fk_channel_videos_task
+    FOREIGN KEY (task_id) REFERENCES search_tasks(task_id) ON DELETE CASCADE;
+ALTER TABLE channel_videos ADD CONSTRAINT fk_channel_videos_video
+    FOREIGN KEY (video_id) REFERENCES videos(video_id) ON DELETE CASCADE;
@@ -0,0 +1,2 @@
+-- Recent videos live in videos / channel_videos; new stats rows leave the blob NULL
+ALTER TABLE channel_video_stats MODIFY recent_videos JSON NULL COMMENT 'Legacy blob, see videos / channel_videos';
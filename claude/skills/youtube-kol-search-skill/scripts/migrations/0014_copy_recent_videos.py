@@ -0,0 +1,7 @@
+"""Copy recent_videos blobs into videos / channel_videos"""
+
+
+def upgrade(connection):
+    from init_database import migrate_recent_videos
+
+    migrate_recent_videos(connection)
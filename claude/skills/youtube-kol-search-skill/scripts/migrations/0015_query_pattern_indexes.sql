@@ -0,0 +1,15 @@
+-- Composite indexes for the "Common Query Patterns" in database_schema.md
+-- (checked with query_plans.py)
+
+-- Q1/Q4/Q5/Q6 start from one task's stats rows; covers the selected averages
+ALTER TABLE channel_video_stats ADD INDEX idx_task_channel (task_id, channel_id, avg_view_count, avg_engagement_rate, has_outliers);
+
+-- Q2 and the language/status list filters
+ALTER TABLE channels ADD INDEX idx_language_status (detected_language, status, subscriber_count);
+
+-- Q6: a task's pending/failed analyses
+ALTER TABLE ai_analysis ADD INDEX idx_task_status (task_id, analysis_status, channel_id);
+
+-- Duplicates of unique keys: only cost writes
+ALTER TABLE ai_analysis DROP INDEX idx_channel_task;
+ALTER TABLE channels DROP INDEX idx_channel_id;
@@ -0,0 +1,9 @@
+-- Partition key for the per-task fact tables: the day the task was created
+-- (init_database.py --partition-fact-tables partitions on it by month;
+-- 0017 fills it in for existing rows)
+ALTER TABLE channel_video_stats ADD COLUMN task_date DATE NOT NULL DEFAULT '1970-01-01'
+    COMMENT 'Partition key: DATE(search_tasks.created_at)' AFTER task_id;
+ALTER TABLE ai_analysis ADD COLUMN task_date DATE NOT NULL DEFAULT '1970-01-01'
+    COMMENT 'Partition key: DATE(search_tasks.created_at)' AFTER task_id;
+ALTER TABLE channel_videos ADD COLUMN task_date DATE NOT NULL DEFAULT '1970-01-01'
+    COMMENT 'Partition key: DATE(search_tasks.created_at)' AFTER task_id;
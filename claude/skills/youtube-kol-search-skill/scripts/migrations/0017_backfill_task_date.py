@@ -0,0 +1,7 @@
+"""Fill task_date of existing fact rows in committed primary-key batches"""
+
+
+def upgrade(connection):
+    from init_database import backfill_task_date
+
+    backfill_task_date(connection)
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression checks for the documented query patterns
+
+Runs EXPLAIN FORMAT=JSON for each canonical query of database_schema.md
+("Common Query Patterns") against a seeded database and fails when a plan
+contains
+
+- a full table scan (access_type ALL) or full index scan (index) over more
+  than --min-rows rows; small tables are cheaper to scan than to seek
+- a filesort, unless the query allows it: sorting one task's joined rows or
+  an aggregate is bounded by the task size and cannot come from an index
+  (computed ORDER BY, ORDER BY over a joined table)
+
+Use it after changing indexes or queries (seed with init_database.py first);
+the exit status is 1 when any query regressed.
+
+Usage:
+    python query_plans.py --password PASS [--task-id TASK] [--min-rows 1000]
+"""
+
+import argparse
+import json
+import logging
+from dataclasses import dataclass
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FULL_SCANS = {'ALL': 'full table scan', 'index': 'full index scan'}
+
+
+@dataclass(frozen=True)
+class QueryPattern:
+    name: str
+    sql: str
+    allow_filesort: bool = False
+
+
+QUERY_PATTERNS = (
+    QueryPattern('1. Channels with full details', """
+        SELECT c.channel_id, c.channel_title, c.channel_url, c.subscriber_count,
+               c.detected_language, c.status,
+               vs.avg_view_count, vs.avg_engagement_rate, vs.has_outliers,
+               ai.relevance_score, ai.recommendation, ai.analysis_status
+        FROM channel_video_stats vs
+        JOIN channels c ON c.channel_id = vs.channel_id
+        LEFT JOIN ai_analysis ai ON ai.channel_id = vs.channel_id AND ai.task_id = vs.task_id
+        WHERE vs.task_id = %(task_id)s
+        ORDER BY c.subscriber_count DESC
+    """, allow_filesort=True),
+    QueryPattern('2. Top performing channels', """
+        SELECT c.channel_title, c.subscriber_count, vs.avg_engagement_rate, ai.relevance_score,
+               (c.subscriber_count / 1000000) * 0.3
+               + (vs.avg_engagement_rate * 100) * 0.3
+               + (ai.relevance_score / 100) * 0.4 AS composite_score
+        FROM channels c
+        JOIN channel_video_stats vs ON vs.channel_id = c.channel_id
+        JOIN ai_analysis ai ON ai.channel_id = vs.channel_id AND ai.task_id = vs.task_id
+        WHERE ai.relevance_score >= 70
+          AND c.detected_language = %(language)s
+          AND c.status = 'active'
+        ORDER BY composite_score DESC
+        LIMIT 20
+    """, allow_filesort=True),
+    QueryPattern('3. Video details of a task', """
+        SELECT cv.channel_id, cv.position, v.video_id, v.title, v.published_at,
+               cv.view_count, cv.like_count, cv.comment_count, cv.engagement_rate
+        FROM channel_videos cv
+        JOIN videos v ON v.video_id = cv.video_id
+        WHERE cv.task_id = %(task_id)s
+        ORDER BY cv.channel_id, cv.position
+    """),
+    QueryPattern('4. Incremental update detection', """
+        SELECT c.*, 'NEW' AS tag
+        FROM channel_video_stats vs
+        JOIN channels c ON c.channel_id = vs.channel_id
+        WHERE vs.task_id = %(task_id)s
+          AND NOT EXISTS (
+              SELECT 1 FROM channel_video_stats vs2
+              WHERE vs2.channel_id = vs.channel_id
+                AND vs2.task_id = %(parent_task_id)s
+          )
+    """),
+    QueryPattern('5. Channel language distribution', """
+        SELECT c.detected_language, COUNT(*) AS channel_count,
+               AVG(c.subscriber_count) AS avg_subscribers,
+               AVG(vs.avg_engagement_rate) AS avg_engagement
+        FROM channel_video_stats vs
+        JOIN channels c ON c.channel_id = vs.channel_id
+        WHERE vs.task_id = %(task_id)s
+        GROUP BY c.detected_language
+        ORDER BY channel_count DESC
+    """, allow_filesort=True),
+    QueryPattern('6. Pending AI analysis', """
+        SELECT c.channel_id, c.channel_title
+        FROM channel_video_stats vs
+        JOIN channels c ON c.channel_id = vs.channel_id
+        LEFT JOIN ai_analysis ai ON ai.channel_id = vs.channel_id AND ai.task_id = vs.task_id
+        WHERE vs.task_id = %(task_id)s
+          AND (ai.id IS NULL OR ai.analysis_status = 'failed')
+        ORDER BY c.subscriber_count DESC
+    """, allow_filesort=True),
+    QueryPattern('7. API key quota status', """
+        SELECT id, display_name, api_type, used_quota, daily_quota,
+               (daily_quota - used_quota) AS remaining_quota
+        FROM api_keys
+        WHERE is_active = 1 AND api_type = 'youtube'
+        ORDER BY priority DESC, remaining_quota DESC
+    """, allow_filesort=True),
+)
+
+
+def sample_params(connection, task_id: str = None) -> dict:
+    """Parameters for the canonical queries: the given (or largest) task and an earlier one"""
+    cursor = connection.cursor()
+    if task_id is None:
+        cursor.execute("""
+            SELECT task_id FROM channel_video_stats
+            GROUP BY task_id ORDER BY COUNT(*) DESC LIMIT 1
+        """)
+        row = cursor.fetchone()
+        if row is None:
+            cursor.close()
+            raise ValueError("No channel_video_stats rows; seed the database first")
+        task_id = row[0]
+    cursor.execute("""
+        SELECT COALESCE(
+            (SELECT parent_task_id FROM search_tasks WHERE task_id = %s),
+            (SELECT task_id FROM search_tasks WHERE task_id <> %s ORDER BY created_at DESC LIMIT 1),
+            %s)
+    """, (task_id, task_id, task_id))
+    parent_task_id = cursor.fetchone()[0]
+    cursor.close()
+    return {'task_id': task_id, 'parent_task_id': parent_task_id, 'language': 'en'}
+
+
+def explain(connection, sql: str, params: dict) -> dict:
+    cursor = connection.cursor()
+    cursor.execute(f"EXPLAIN FORMAT=JSON {sql}", params)
+    plan = json.loads(cursor.fetchone()[0])
+    cursor.close()
+    return plan
+
+
+def _walk(node):
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _walk(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _walk(value)
+
+
+def plan_tables(plan: dict) -> list:
+    """(table, access_type, key, rows_examined_per_scan) for every table access in the plan"""
+    return [
+        (node['table_name'], node.get('access_type'), node.get('key'), node.get('rows_examined_per_scan', 0))
+        for node in _walk(plan) if 'table_name' in node and 'access_type' in node
+    ]
+
+
+def check_plan(plan: dict, pattern: QueryPattern, min_rows: int = 1000) -> list:
+    """Problems found in one plan (empty list = OK)"""
+    problems = []
+    for table, access_type, _, rows in plan_tables(plan):
+        if access_type in FULL_SCANS and rows > min_rows:
+            problems.append(f"{FULL_SCANS[access_type]} on {table} ({rows} rows)")
+    if not pattern.allow_filesort and any(node.get('using_filesort') for node in _walk(plan)):
+        problems.append("filesort")
+    return problems
+
+
+def check_query_plans(connection, task_id: str = None, min_rows: int = 1000) -> dict:
+    """pattern name → (problems, table accesses)"""
+    params = sample_params(connection, task_id)
+    results = {}
+    for pattern in QUERY_PATTERNS:
+        plan = explain(connection, pattern.sql, params)
+        results[pattern.name] = (check_plan(plan, pattern, min_rows), plan_tables(plan))
+    return results
+
+
+def main():
+    import mysql.connector
+
+    parser = argparse.ArgumentParser(description='EXPLAIN the documented query patterns and flag regressions')
+    parser.add_argument('--host', default='localhost', help='MySQL host')
+    parser.add_argument('--port', type=int, default=3306, help='MySQL port')
+    parser.add_argument('--user', default='root', help='MySQL user')
+    parser.add_argument('--password', required=True, help='MySQL password')
+    parser.add_argument('--database', default='youtube_kol_db', help='Database name')
+    parser.add_argument('--task-id', help='Task to run the per-task queries for (default: largest)')
+    parser.add_argument('--min-rows', type=int, default=1000,
+                        help='Full scans over at most this many rows are accepted')
+
+    args = parser.parse_args()
+
+    connection = mysql.connector.connect(host=args.host, port=args.port, user=args.user,
+                                         password=args.password, database=args.database)
+    try:
+        results = check_query_plans(connection, args.task_id, args.min_rows)
+    finally:
+        connection.close()
+
+    failed = 0
+    for name, (problems, tables) in results.items():
+        access = ', '.join(f"{table}:{access_type}({key or '-'})" for table, access_type, key, _ in tables)
+        if problems:
+            failed += 1
+            logger.error(f"❌ {name}: {'; '.join(problems)}")
+        else:
+            logger.info(f"✓ {name}")
+        logger.info(f"    {access}")
+
+    if failed:
+        logger.error(f"❌ {failed} of {len(results)} query plans regressed")
+        raise SystemExit(1)
+    logger.info(f"✓ All {len(results)} query plans use indexes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+YouTube API quota ledger with atomic reservations and write-behind to MySQL
+
+Replaces the per-call `UPDATE api_keys SET used_quota = used_quota + units`
+pattern: collectors reserve units against a shared counter (Redis INCRBY via
+a Lua script, or an in-process dict for single-process use) and the totals are
+flushed to `api_keys` periodically. Counters are namespaced by UTC date, so
+the daily reset at UTC midnight happens without a reset job.
+
+Crash safety: every reservation is appended to a local journal before the
+units are handed out. On startup, unflushed journal entries are added on top
+of the values stored in MySQL. A crash between a flush commit and dropping the
+flushed journal segment can only over-count usage, never under-count it.
+A journal has a single owner: QuotaJournal holds an exclusive lock on
+`<journal>.lock` for its lifetime, so a second collector (or the replay CLI)
+pointed at the same path fails instead of rotating a live process's segment
+away. Give each collector process its own journal path.
+
+Usage:
+    python quota_ledger.py --password PASSWORD [--journal quota.journal] [--redis-url URL]
+"""
+
+import argparse
+import fcntl
+import json
+import logging
+import os
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = 'quota'
+MIN_CALL_UNITS = 1  # channels / playlistItems / videos.list; a key below this is done for the day
+
+# KEYS[1] = counter, ARGV = units, daily limit, expire-at (unix time)
+# Returns the new total, or -1 (and rolls back) if the limit would be exceeded
+RESERVE_SCRIPT = """
+local used = redis.call('INCRBY', KEYS[1], ARGV[1])
+if used > tonumber(ARGV[2]) then
+    redis.call('DECRBY', KEYS[1], ARGV[1])
+    return -1
+end
+redis.call('EXPIREAT', KEYS[1], ARGV[3])
+return used
+"""
+
+# KEYS[1] = counter, ARGV = floor value, expire-at; raises the counter to at least the floor
+SEED_SCRIPT = """
+local used = tonumber(redis.call('GET', KEYS[1]) or '0')
+if used < tonumber(ARGV[1]) then
+    redis.call('SET', KEYS[1], ARGV[1])
+    used = tonumber(ARGV[1])
+end
+redis.call('EXPIREAT', KEYS[1], ARGV[2])
+return used
+"""
+
+
+class QuotaExhaustedException(Exception):
+    """No active key has enough quota left today"""
+
+
+class JournalInUseError(Exception):
+    """Another process owns the quota journal"""
+
+
+def utc_today():
+    return datetime.now(timezone.utc).date()
+
+
+def next_utc_midnight_ts(day) -> int:
+    midnight = datetime(day.year, day.month, day.day, tzinfo=timezone.utc) + timedelta(days=1)
+    return int(midnight.timestamp())
+
+
+class MemoryCounterStore:
+    """In-process counters for single-process deployments and offline runs"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def reserve(self, name: str, units: int, limit: int, expire_at: int) -> int:
+        with self._lock:
+            used = self._counters.get(name, 0) + units
+            if used > limit:
+                return -1
+            self._counters[name] = used
+            return used
+
+    def seed(self, name: str, floor: int, expire_at: int) -> int:
+        with self._lock:
+            self._counters[name] = max(self._counters.get(name, 0), floor)
+            return self._counters[name]
+
+    def get_many(self, names: list) -> list:
+        with self._lock:
+            return [self._counters.get(name, 0) for name in names]
+
+
+class RedisCounterStore:
+    """Shared counters in Redis; reservations are a single atomic script call"""
+
+    def __init__(self, redis_client):
+        self.redis = redis_client
+        self._reserve = redis_client.register_script(RESERVE_SCRIPT)
+        self._seed = redis_client.register_script(SEED_SCRIPT)
+
+    def reserve(self, name: str, units: int, limit: int, expire_at: int) -> int:
+        return int(self._reserve(keys=[name], args=[units, limit, expire_at]))
+
+    def seed(self, name: str, floor: int, expire_at: int) -> int:
+        return int(self._seed(keys=[name], args=[floor, expire_at]))
+
+    def get_many(self, names: list) -> list:
+        return [int(v or 0) for v in self.redis.mget(names)] if names else []
+
+
+class QuotaJournal:
+    """Append-only reservation log
+
+    flush() rotates the journal before reading the counters, so every entry
+    in the rotated segment is covered by the totals written to MySQL; the
+    segment is deleted only after the UPDATE commits.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rotated_path = path + '.flushing'
+        self.lock_path = path + '.lock'
+        self._lock = threading.Lock()
+        self._lock_fd = self._acquire()
+        self._fd = self._open()
+
+    def _acquire(self):
+        """Exclusive owner lock (a separate file: the journal itself is renamed on rotate)"""
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            owner = os.read(fd, 32).decode('ascii', 'replace').strip() or 'unknown'
+            os.close(fd)
+            raise JournalInUseError(
+                f"Quota journal {self.path} is in use by another process (pid {owner}); "
+                f"use a separate --journal per process"
+            ) from None
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode('ascii'))
+        return fd
+
+    def _open(self):
+        return os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+
+    def append(self, day, key_id: int, units: int):
+        line = json.dumps({'date': day.isoformat(), 'key_id': key_id, 'units': units}) + '\n'
+        with self._lock:
+            # os.write on an O_APPEND fd survives a process crash without an fsync per call
+            os.write(self._fd, line.encode('utf-8'))
+
+    def rotate(self):
+        """Start a new segment; a leftover segment from a failed flush is merged, not lost"""
+        with self._lock:
+            os.fsync(self._fd)
+            os.close(self._fd)
+            if os.path.exists(self.rotated_path):
+                with open(self.rotated_path, 'ab') as rotated, open(self.path, 'rb') as current:
+                    rotated.write(current.read())
+                    rotated.flush()
+                    os.fsync(rotated.fileno())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.rotated_path)
+            self._fd = self._open()
+
+    def commit_rotated(self):
+        """The rotated segment is reflected in MySQL and can be dropped"""
+        if os.path.exists(self.rotated_path):
+            os.remove(self.rotated_path)
+
+    def replay(self) -> dict:
+        """Sum unflushed units per (date, key_id) across both segments"""
+        totals = {}
+        for path in (self.rotated_path, self.path):
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line after a crash
+                    key = (entry['date'], entry['key_id'])
+                    totals[key] = totals.get(key, 0) + entry['units']
+        return totals
+
+    def close(self):
+        with self._lock:
+            os.close(self._fd)
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            os.close(self._lock_fd)
+
+
+class QuotaLedger:
+    """Reserve YouTube quota units per call and pick keys without touching MySQL"""
+
+    def __init__(self, keys: list, store=None, journal: QuotaJournal = None,
+                 min_remaining: int = 0):
+        """
+        keys: api_keys rows (dicts with id, api_key, daily_quota, used_quota,
+              last_reset_date, priority), in preference order
+        """
+        if not keys:
+            raise ValueError("At least one active API key is required")
+
+        self.keys = sorted(keys, key=lambda k: -(k.get('priority') or 0))
+        self.by_key = {k['api_key']: k for k in self.keys}
+        self.store = store or MemoryCounterStore()
+        self.journal = journal
+        self.min_remaining = min_remaining
+
+        self._lock = threading.Lock()
+        self._cursor = 0
+        self._exhausted = set()
+        self._day = None
+
+    def _counter(self, day, key_id: int) -> str:
+        return f"{REDIS_KEY_PREFIX}:{day.isoformat()}:{key_id}"
+
+    def _roll_day(self, day):
+        """New UTC day: every key becomes available again"""
+        if day != self._day:
+            self._day = day
+            self._exhausted.clear()
+            self._cursor = 0
+
+    def seed_from_database(self, pending: dict = None):
+        """Raise today's counters to MySQL usage plus unflushed journal units"""
+        day = utc_today()
+        pending = pending or {}
+        expire_at = next_utc_midnight_ts(day) + 3600
+        for key in self.keys:
+            stored = (key.get('used_quota') or 0) if key.get('last_reset_date') == day else 0
+            floor = stored + pending.get((day.isoformat(), key['id']), 0)
+            self.store.seed(self._counter(day, key['id']), floor, expire_at)
+
+    def reserve(self, units: int) -> str:
+        """Reserve units on the current key and return it; rotates when a key runs dry
+
+        The common case is one atomic counter increment on the current key.
+        A key is marked exhausted (skipped until the next UTC day) only once not
+        even a MIN_CALL_UNITS call fits, so rotation stays amortized O(1); a key
+        that is merely too low for this reservation (a 100-unit search) is
+        passed over for this call only and keeps serving 1-unit calls.
+        """
+        day = utc_today()
+        expire_at = next_utc_midnight_ts(day) + 3600
+
+        with self._lock:
+            self._roll_day(day)
+            start = self._cursor
+
+        for offset in range(len(self.keys)):
+            index = (start + offset) % len(self.keys)
+            key = self.keys[index]
+            if key['api_key'] in self._exhausted:
+                continue
+
+            limit = key['daily_quota'] - self.min_remaining
+            counter = self._counter(day, key['id'])
+            if self.store.reserve(counter, units, limit, expire_at) >= 0:
+                if self.journal:
+                    self.journal.append(day, key['id'], units)
+                if offset:
+                    with self._lock:
+                        self._cursor = index
+                return key['api_key']
+
+            if limit - self.store.get_many([counter])[0] < MIN_CALL_UNITS:
+                self.mark_exhausted(key['api_key'])
+
+        raise QuotaExhaustedException("All keys at quota limit")
+
+    def mark_exhausted(self, api_key: str):
+        """Skip a key until the next UTC day (e.g. after a quotaExceeded 403)"""
+        with self._lock:
+            self._exhausted.add(api_key)
+
+    def usage(self) -> dict:
+        """Today's used units per key id"""
+        day = utc_today()
+        values = self.store.get_many([self._counter(day, k['id']) for k in self.keys])
+        return {k['id']: used for k, used in zip(self.keys, values)}
+
+    def flush(self, connection):
+        """Write today's totals to api_keys in one transaction, then drop the flushed journal segment
+
+        The UPDATE is idempotent (GREATEST of stored and ledger totals), so any
+        collector may flush at any time.
+        """
+        day = utc_today()
+        if self.journal:
+            self.journal.rotate()
+        usage = self.usage()
+
+        cursor = connection.cursor()
+        try:
+            cursor.executemany("""
+                UPDATE api_keys
+                SET used_quota = IF(last_reset_date = %s, GREATEST(used_quota, %s), %s),
+                    last_reset_date = %s
+                WHERE id = %s
+            """, [(day, used, used, day, key_id) for key_id, used in usage.items()])
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+        if self.journal:
+            self.journal.commit_rotated()
+        return usage
+
+
+def load_keys(connection, api_type: str = 'youtube') -> list:
+    """Active api_keys rows in preference order"""
+    cursor = connection.cursor(dictionary=True)
+    cursor.execute("""
+        SELECT id, api_key, daily_quota, used_quota, last_reset_date, priority
+        FROM api_keys
+        WHERE is_active = 1 AND api_type = %s
+        ORDER BY priority DESC, used_quota ASC
+    """, (api_type,))
+    keys = cursor.fetchall()
+    cursor.close()
+    return keys
+
+
+def open_ledger(connection, journal_path: str, redis_client=None, min_remaining: int = 0) -> QuotaLedger:
+    """Build a ledger from api_keys, replaying any unflushed journal entries"""
+    journal = QuotaJournal(journal_path)
+    store = RedisCounterStore(redis_client) if redis_client is not None else MemoryCounterStore()
+    ledger = QuotaLedger(load_keys(connection), store=store, journal=journal, min_remaining=min_remaining)
+
+    pending = journal.replay()
+    if pending:
+        logger.info(f"Replaying {sum(pending.values())} unflushed quota units from {journal_path}")
+    ledger.seed_from_database(pending)
+    if pending:
+        ledger.flush(connection)
+    return ledger
+
+
+class LedgerFlusher:
+    """Background thread flushing a ledger every `interval` seconds"""
+
+    def __init__(self, ledger: QuotaLedger, connection_factory, interval: float = 5.0):
+        self.ledger = ledger
+        self.connection_factory = connection_factory
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the thread and perform a final flush"""
+        self._stop.set()
+        self._thread.join()
+        self._flush_once()
+
+    def _flush_once(self):
+        connection = self.connection_factory()
+        try:
+            self.ledger.flush(connection)
+        except Exception as e:
+            logger.warning(f"⚠ Quota flush failed (journal kept): {e}")
+        finally:
+            connection.close()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._flush_once()
+
+
+def main():
+    import mysql.connector
+
+    parser = argparse.ArgumentParser(description='Replay the quota journal and show per-key usage')
+    parser.add_argument('--host', default='localhost', help='MySQL host')
+    parser.add_argument('--port', type=int, default=3306, help='MySQL port')
+    parser.add_argument('--user', default='root', help='MySQL user')
+    parser.add_argument('--password', required=True, help='MySQL password')
+    parser.add_argument('--database', default='youtube_kol_db', help='Database name')
+    parser.add_argument('--journal', default='quota.journal', help='Quota journal path')
+    parser.add_argument('--redis-url', help='Redis URL (e.g. redis://localhost:6379/0)')
+
+    args = parser.parse_args()
+
+    redis_client = None
+    if args.redis_url:
+        import redis
+        redis_client = redis.Redis.from_url(args.redis_url)
+
+    connection = mysql.connector.connect(
+        host=args.host, port=args.port, user=args.user,
+        password=args.password, database=args.database
+    )
+    try:
+        ledger = open_ledger(connection, args.journal, redis_client)
+        usage = ledger.flush(connection)
+        logger.info("✓ Quota ledger flushed")
+        for key in ledger.keys:
+            used = usage.get(key['id'], 0)
+            logger.info(f"  {key['api_key'][:4]}...{key['api_key'][-4:]}: {used}/{key['daily_quota']}")
+    except Exception as e:
+        logger.error(f"❌ Quota ledger error: {e}")
+        sys.exit(1)
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
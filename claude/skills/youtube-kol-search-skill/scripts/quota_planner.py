@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Quota-aware query planner for search tasks
+
+Runs in front of the search phase: fetches the first type=channel and
+type=video search pages, estimates the total pages from
+`pageInfo.totalResults`, prices the whole task (search pages at 100 units,
+collection at ~1.2 units per channel) and picks the largest plan that fits the
+remaining quota in `api_keys`:
+
+    full          every page of both searches
+    truncated     every type=channel page, fewer type=video pages
+    channel_only  type=channel search only (possibly capped); the probe's
+                  type=video page is already paid for and its channels are kept
+
+The first pages are reused by the executor, so planning costs nothing extra.
+Planned and actual units are recorded on `search_tasks`.
+
+Usage:
+    python quota_planner.py --api-key KEY --keyword "PC cleanup" --budget UNITS [--base-url URL]
+    python quota_planner.py --api-key KEY --keyword "PC cleanup" --password PASS [--task-id TASK] [--execute]
+"""
+
+import argparse
+import itertools
+import logging
+import math
+from dataclasses import dataclass, field
+
+from youtube_collector import (
+    DEFAULT_BASE_URL, MAX_IDS_PER_CALL, QUOTA_COSTS, RECENT_VIDEOS,
+    YouTubeClient, collection_phase, extract_channel_ids, search_pages,
+)
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SEARCH_TYPES = ('channel', 'video')
+MAX_SEARCH_PAGES = 10          # search.list stops returning results after ~500 items
+VIDEO_RESULT_CHANNEL_RATIO = 0.5  # share of video results that belong to a not-yet-seen channel
+
+
+class InsufficientQuotaError(Exception):
+    """Not even the smallest plan fits the remaining quota"""
+
+
+def collection_units_per_channel(videos_per_channel: int = RECENT_VIDEOS) -> float:
+    """channels.list (1/50) + playlistItems (1) + batched videos.list (videos/50)"""
+    return (QUOTA_COSTS['channels'] / MAX_IDS_PER_CALL
+            + QUOTA_COSTS['playlistItems']
+            + QUOTA_COSTS['videos'] * videos_per_channel / MAX_IDS_PER_CALL)
+
+
+@dataclass
+class SearchPlan:
+    keyword: str
+    plan_type: str
+    max_pages: dict
+    planned_units: int
+    estimated_channels: int
+    first_pages: dict = field(default_factory=dict, repr=False)
+
+
+class QueryPlanner:
+    """Estimate and budget a search task before it runs"""
+
+    def __init__(self, client: YouTubeClient, videos_per_channel: int = RECENT_VIDEOS):
+        self.client = client
+        self.videos_per_channel = videos_per_channel
+        self.per_channel = collection_units_per_channel(videos_per_channel)
+
+    def _probe(self, keyword: str) -> dict:
+        """First page of each search type (these pages are reused, not re-fetched)"""
+        return {t: next(search_pages(self.client, keyword, t, max_pages=1)) for t in SEARCH_TYPES}
+
+    @staticmethod
+    def _estimated_pages(first_page: dict) -> int:
+        if not first_page.get('nextPageToken'):
+            return 1
+        total = first_page.get('pageInfo', {}).get('totalResults', 0)
+        return max(1, min(MAX_SEARCH_PAGES, math.ceil(total / MAX_IDS_PER_CALL)))
+
+    def _estimate(self, pages: dict, first_pages: dict) -> tuple:
+        """(units, channels) for given page counts per search type"""
+        channels = 0.0
+        for search_type, count in pages.items():
+            per_page = len(extract_channel_ids(first_pages[search_type])) or MAX_IDS_PER_CALL
+            ratio = VIDEO_RESULT_CHANNEL_RATIO if search_type == 'video' else 1.0
+            channels += count * per_page * ratio
+        units = sum(pages.values()) * QUOTA_COSTS['search'] + channels * self.per_channel
+        return int(math.ceil(units)), int(channels)
+
+    def plan(self, keyword: str, budget: int) -> SearchPlan:
+        """Pick the largest plan that fits `budget` units (including the probe pages)"""
+
+        # The smallest plan is the probe pages plus their channels; price it with
+        # full pages so a budget that cannot cover it is rejected before probing
+        minimum_units, _ = self._estimate({t: 1 for t in SEARCH_TYPES}, {t: {} for t in SEARCH_TYPES})
+        if budget < minimum_units:
+            raise InsufficientQuotaError(
+                f"'{keyword}' needs up to {minimum_units} units for the smallest plan, only {budget} remaining"
+            )
+        first_pages = self._probe(keyword)
+        full_pages = {t: self._estimated_pages(first_pages[t]) for t in SEARCH_TYPES}
+
+        units, channels = self._estimate(full_pages, first_pages)
+        if units <= budget:
+            return SearchPlan(keyword, 'full', full_pages, units, channels, first_pages)
+
+        # type=channel results are channels directly, so cap the video search first
+        for video_pages in range(full_pages['video'] - 1, 1, -1):
+            pages = {'channel': full_pages['channel'], 'video': video_pages}
+            units, channels = self._estimate(pages, first_pages)
+            if units <= budget:
+                return SearchPlan(keyword, 'truncated', pages, units, channels, first_pages)
+
+        # Drop the video search (its probe page is already paid for and kept),
+        # then cap the channel search
+        for channel_pages in range(full_pages['channel'], 0, -1):
+            pages = {'channel': channel_pages, 'video': 1}
+            units, channels = self._estimate(pages, first_pages)
+            if units <= budget:
+                return SearchPlan(keyword, 'channel_only', pages, units, channels, first_pages)
+
+        raise InsufficientQuotaError(
+            f"'{keyword}' needs at least {units} units, only {budget} remaining"
+        )
+
+
+def planned_search_phase(client: YouTubeClient, plan: SearchPlan) -> list:
+    """Search phase following a plan, continuing from the probe pages"""
+
+    channel_ids = []
+    seen = set()
+    for search_type, max_pages in plan.max_pages.items():
+        first_page = plan.first_pages[search_type]
+        pages = [first_page]
+        token = first_page.get('nextPageToken')
+        if token and max_pages > 1:
+            pages = itertools.chain(pages, search_pages(client, plan.keyword, search_type,
+                                                        max_pages=max_pages - 1, pageToken=token))
+        for page in pages:
+            for channel_id in extract_channel_ids(page):
+                if channel_id not in seen:
+                    seen.add(channel_id)
+                    channel_ids.append(channel_id)
+    return channel_ids
+
+
+def execute_plan(client: YouTubeClient, plan: SearchPlan,
+                 videos_per_channel: int = RECENT_VIDEOS) -> dict:
+    """Run a planned search + collection; returns channel_id → channel data"""
+    channel_ids = planned_search_phase(client, plan)
+    return collection_phase(client, channel_ids, videos_per_channel)
+
+
+def remaining_quota(connection) -> int:
+    """Units left today across active YouTube keys (UTC-midnight reset aware)"""
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT COALESCE(SUM(GREATEST(
+            daily_quota - IF(last_reset_date = UTC_DATE(), used_quota, 0), 0
+        )), 0)
+        FROM api_keys
+        WHERE is_active = 1 AND api_type = 'youtube'
+    """)
+    (remaining,) = cursor.fetchone()
+    cursor.close()
+    return int(remaining)
+
+
+def record_plan(connection, task_id: str, plan: SearchPlan, actual_units: int = None):
+    """Store planned (and, once known, actual) cost on search_tasks"""
+    cursor = connection.cursor()
+    cursor.execute("""
+        UPDATE search_tasks
+        SET plan_type = %s, planned_units = %s, actual_units = COALESCE(%s, actual_units)
+        WHERE task_id = %s
+    """, (plan.plan_type, plan.planned_units, actual_units, task_id))
+    connection.commit()
+    cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Plan a quota budget for a search keyword')
+    parser.add_argument('--api-key', action='append', required=True, help='YouTube API key (repeatable)')
+    parser.add_argument('--keyword', required=True, help='Search keyword')
+    parser.add_argument('--budget', type=int,
+                        help='Quota units available for this task (default: remaining quota in api_keys)')
+    parser.add_argument('--task-id', help='Record planned / actual units on this search_tasks row')
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL, help='API base URL')
+    parser.add_argument('--execute', action='store_true', help='Run the plan and report actual cost')
+    parser.add_argument('--host', default='localhost', help='MySQL host')
+    parser.add_argument('--port', type=int, default=3306, help='MySQL port')
+    parser.add_argument('--user', default='root', help='MySQL user')
+    parser.add_argument('--password', help='MySQL password (remaining quota, --task-id)')
+    parser.add_argument('--database', default='youtube_kol_db', help='Database name')
+
+    args = parser.parse_args()
+
+    if args.password is None and (args.budget is None or args.task_id):
+        parser.error('--password is needed for the remaining quota (or pass --budget) and for --task-id')
+
+    connection = None
+    if args.password is not None:
+        import mysql.connector
+
+        connection = mysql.connector.connect(host=args.host, port=args.port, user=args.user,
+                                             password=args.password, database=args.database)
+    try:
+        budget = args.budget if args.budget is not None else remaining_quota(connection)
+        client = YouTubeClient(args.api_key, base_url=args.base_url)
+        try:
+            plan = QueryPlanner(client).plan(args.keyword, budget)
+        except InsufficientQuotaError as e:
+            logger.error(f"❌ {e}")
+            raise SystemExit(1)
+
+        logger.info(f"✓ Plan for '{plan.keyword}': {plan.plan_type}")
+        logger.info(f"  Pages:              {plan.max_pages}")
+        logger.info(f"  Estimated channels: {plan.estimated_channels}")
+        logger.info(f"  Planned units:      {plan.planned_units} / {budget}")
+        if args.task_id:
+            record_plan(connection, args.task_id, plan)
+
+        if args.execute:
+            channels = execute_plan(client, plan)
+            logger.info(f"✓ Collected {len(channels)} channels")
+            logger.info(f"  Actual units:       {client.stats.quota_units}")
+            if args.task_id:
+                from incremental_search import record_search_units
+
+                record_plan(connection, args.task_id, plan, actual_units=client.stats.quota_units)
+                record_search_units(connection, args.task_id, client.stats.units.get('search', 0))
+    finally:
+        if connection is not None:
+            connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset generator for load-testing the schema
+
+Fills a database built by init_database.py with production-shaped data so
+list, filter and export latency (and query_plans.py) can be measured at
+scale:
+
+- channels with Pareto-distributed subscriber counts and descriptions in a
+  dozen languages/scripts, weighted like real search results
+- 10 videos per channel (videos), linked per task (channel_videos), with
+  log-normal views so some channels have IQR outliers
+- many tasks spread over the last --days days, repeated keywords forming
+  incremental chains, skewed task sizes; channels reappear in later tasks
+- channel_video_stats for every (channel, task) and AI analyses for most
+
+Rows are generated with NumPy in chunks of channels and loaded as batched
+multi-row INSERTs (default) or LOAD DATA LOCAL INFILE (--load-data, needs
+local_infile enabled on the server), with foreign key and unique checks off
+for the session. Synthetic rows use the 'UCsyn' / 'syn-' ID prefixes;
+--purge removes them again.
+
+Usage:
+    python synthetic_data.py --password PASS --channels 1000000 [--tasks 2000] [--load-data]
+    python synthetic_data.py --password PASS --purge
+"""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from channel_metrics import compute
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = 'UCsyn'
+TASK_PREFIX = 'syn-'
+CHUNK_CHANNELS = 5000
+INSERT_BATCH = 5000  # rows per INSERT statement
+
+# language → (share of channels, description words, title word)
+LANGUAGES = {
+    'en': (0.45, 'PC cleanup tutorials, Windows tips and honest software reviews every week', 'Review'),
+    'es': (0.10, 'Tutoriales de limpieza de PC, trucos de Windows y reseñas de software', 'Reseña'),
+    'pt': (0.07, 'Tutoriais de limpeza do PC, dicas de Windows e análises de programas', 'Análise'),
+    'hi': (0.06, 'पीसी सफाई ट्यूटोरियल, विंडोज़ टिप्स और सॉफ़्टवेयर समीक्षा हर सप्ताह', 'समीक्षा'),
+    'ja': (0.05, 'パソコンの掃除とWindowsの高速化を毎週わかりやすく解説します', 'レビュー'),
+    'zh': (0.05, '每周分享电脑清理教程、Windows优化技巧和软件测评', '测评'),
+    'ko': (0.04, '매주 PC 정리 방법과 윈도우 최적화 팁, 소프트웨어 리뷰를 올립니다', '리뷰'),
+    'ru': (0.04, 'Уроки по очистке ПК, советы по Windows и честные обзоры программ', 'Обзор'),
+    'de': (0.04, 'PC-Reinigung, Windows-Tipps und ehrliche Software-Tests jede Woche', 'Test'),
+    'fr': (0.04, 'Tutoriels de nettoyage PC, astuces Windows et tests de logiciels', 'Test'),
+    'id': (0.03, 'Tutorial membersihkan PC, tips Windows dan ulasan perangkat lunak', 'Ulasan'),
+    'ar': (0.03, 'دروس تنظيف الحاسوب ونصائح ويندوز ومراجعات البرامج كل أسبوع', 'مراجعة'),
+}
+KEYWORDS = ('PC cleanup', 'Windows optimizer', 'disk cleaner', 'system speedup', 'junk file removal',
+            'registry cleaner', 'free up disk space', 'speed up laptop', 'uninstall programs',
+            'privacy cleaner')
+TOPICS = ('Speed up Windows', 'Free disk space', 'Clean junk files', 'Best cleaner apps',
+          'Fix slow PC', 'Remove duplicates', 'Uninstall bloatware', 'Startup programs')
+
+COLUMNS = {
+    'search_tasks': ('task_id', 'keyword', 'task_type', 'status', 'total_channels', 'processed_channels',
+                     'is_incremental', 'parent_task_id', 'new_channels_count', 'created_at',
+                     'started_at', 'completed_at'),
+    'channels': ('channel_id', 'channel_title', 'channel_url', 'subscriber_count', 'description',
+                 'detected_language', 'language_confidence', 'first_discovered_at', 'last_seen_at',
+                 'status'),
+    'videos': ('video_id', 'channel_id', 'title', 'description', 'language', 'published_at',
+               'view_count', 'like_count', 'comment_count', 'engagement_rate'),
+    'channel_video_stats': ('channel_id', 'task_id', 'task_date', 'avg_view_count', 'avg_like_count',
+                            'avg_comment_count', 'avg_engagement_rate', 'has_outliers',
+                            'outlier_videos', 'video_languages', 'created_at'),
+    'channel_videos': ('task_id', 'task_date', 'channel_id', 'position', 'video_id', 'view_count', 'like_count',
+                       'comment_count', 'engagement_rate'),
+    'ai_analysis': ('channel_id', 'task_id', 'task_date', 'relevance_score', 'recommendation', 'key_strengths',
+                    'concerns', 'analysis_detail', 'ai_provider', 'analysis_status', 'analyzed_at',
+                    'created_at'),
+}
+LOAD_ORDER = tuple(COLUMNS)
+
+
+def task_ids(tasks: int) -> list:
+    return [f"{TASK_PREFIX}{t:07d}" for t in range(tasks)]
+
+
+def channel_id(i: int) -> str:
+    return f"{CHANNEL_PREFIX}{i:019d}"
+
+
+class SyntheticDataset:
+    """Deterministic row generator; every chunk is reproducible from (seed, chunk)"""
+
+    def __init__(self, channels: int, tasks: int, videos_per_channel: int = 10, days: int = 180,
+                 revisit: float = 0.3, analysis_share: float = 0.8, seed: int = 42, now: datetime = None):
+        self.channels = channels
+        self.tasks = tasks
+        self.videos_per_channel = videos_per_channel
+        self.days = days
+        self.revisit = revisit
+        self.analysis_share = analysis_share
+        self.seed = seed
+        self.now = (now or datetime.now(timezone.utc)).replace(tzinfo=None, microsecond=0)
+
+        self.languages = list(LANGUAGES)
+        shares = np.array([LANGUAGES[lang][0] for lang in self.languages])
+        self.language_p = shares / shares.sum()
+        # skewed task sizes: a few big searches, a long tail of small ones
+        weights = 1.0 / np.arange(1, tasks + 1) ** 0.8
+        self.task_p = np.random.default_rng(seed).permutation(weights / weights.sum())
+        self.task_created = [self.now - timedelta(days=days * (1 - t / max(1, tasks)))
+                             for t in range(tasks)]
+
+    def task_rows(self) -> list:
+        rows = []
+        ids = task_ids(self.tasks)
+        for t, task_id in enumerate(ids):
+            created = self.task_created[t]
+            parent = ids[t - len(KEYWORDS)] if t >= len(KEYWORDS) else None
+            rows.append((task_id, KEYWORDS[t % len(KEYWORDS)], 'single', 'completed', 0, 0,
+                         int(parent is not None), parent, 0, created,
+                         created + timedelta(seconds=5), created + timedelta(minutes=12)))
+        return rows
+
+    def chunk_rows(self, chunk: int) -> dict:
+        """table → rows for channels [chunk * CHUNK_CHANNELS, ...)"""
+        rng = np.random.default_rng((self.seed, chunk))
+        first = chunk * CHUNK_CHANNELS
+        n = min(CHUNK_CHANNELS, self.channels - first)
+        v = self.videos_per_channel
+
+        language_idx = rng.choice(len(self.languages), size=n, p=self.language_p)
+        subscribers = np.minimum((1000 * (rng.pareto(1.16, n) + 1)).astype(np.int64), 300_000_000)
+        confidence = np.round(rng.uniform(0.55, 1.0, n), 3)
+
+        # views ~ subscribers × log-normal reach; likes and comments as fractions
+        views = (subscribers[:, None] * rng.lognormal(-2.5, 1.0, (n, v))).astype(np.int64) + 1
+        likes = (views * rng.beta(2, 60, (n, v))).astype(np.int64)
+        comments = (likes * rng.beta(2, 30, (n, v))).astype(np.int64)
+        metrics = compute(views, likes, comments)
+        engagement, high, low = metrics['engagement'], metrics['high'], metrics['low']
+        published_days = np.sort(rng.uniform(0, 365, (n, v)), axis=1)
+        averages = np.stack([metrics['avg_view_count'], metrics['avg_like_count'], metrics['avg_comment_count']],
+                            axis=1)
+
+        primary = rng.choice(self.tasks, size=n, p=self.task_p)
+        extra = np.where(rng.random(n) < self.revisit, rng.integers(0, self.tasks, n), -1)
+        analysed = rng.random((n, 2)) < self.analysis_share
+        scores = np.clip(rng.normal(55, 20, (n, 2)), 0, 100).astype(int)
+        status_roll = rng.random((n, 2))
+
+        # plain Python values for the row loop
+        views_l, likes_l, comments_l = views.tolist(), likes.tolist(), comments.tolist()
+        engagement_l, published_l = engagement.tolist(), published_days.tolist()
+        averages_l, mean_engagement = averages.tolist(), metrics['avg_engagement_rate'].tolist()
+        subscribers_l, confidence_l = subscribers.tolist(), confidence.tolist()
+
+        ids = task_ids(self.tasks)
+        rows = {table: [] for table in COLUMNS if table != 'search_tasks'}
+        for k in range(n):
+            i = first + k
+            cid = channel_id(i)
+            lang = self.languages[language_idx[k]]
+            _, description, title_word = LANGUAGES[lang]
+            memberships = sorted({int(primary[k]), int(extra[k])} - {-1})
+            discovered = self.task_created[memberships[0]]
+            last_seen = self.task_created[memberships[-1]]
+
+            rows['channels'].append((
+                cid, f"{TOPICS[i % len(TOPICS)]} {title_word} {i}",
+                f"https://www.youtube.com/channel/{cid}", subscribers_l[k],
+                f"{description} #{i}", lang, confidence_l[k], discovered, last_seen, 'active',
+            ))
+
+            video_ids = [f"syn{i:08d}v{p}" for p in range(v)]
+            counts = list(zip(video_ids, views_l[k], likes_l[k], comments_l[k], engagement_l[k]))
+            for p, (video_id, views_p, likes_p, comments_p, engagement_p) in enumerate(counts):
+                rows['videos'].append((
+                    video_id, cid, f"{TOPICS[(i + p) % len(TOPICS)]} - {title_word} {p + 1}",
+                    description, lang, last_seen - timedelta(days=published_l[k][p]),
+                    views_p, likes_p, comments_p, engagement_p,
+                ))
+
+            outliers = json.dumps(
+                [{'video_id': video_ids[p], 'view_count': views_l[k][p], 'reason': 'significantly_higher'}
+                 for p in np.flatnonzero(high[k])]
+                + [{'video_id': video_ids[p], 'view_count': views_l[k][p], 'reason': 'significantly_lower'}
+                   for p in np.flatnonzero(low[k])]
+            )
+            video_languages = json.dumps([lang] * v)
+            for m, t in enumerate(memberships):
+                task_id, task_date = ids[t], self.task_created[t].date()
+                rows['channel_video_stats'].append((
+                    cid, task_id, task_date, *averages_l[k], mean_engagement[k], int(outliers != '[]'), outliers,
+                    video_languages, self.task_created[t],
+                ))
+                rows['channel_videos'].extend((task_id, task_date, cid, p, *count) for p, count in enumerate(counts))
+                if analysed[k, m]:
+                    rows['ai_analysis'].append(self._analysis_row(cid, task_id, t, int(scores[k, m]),
+                                                                  status_roll[k, m]))
+        return rows
+
+    def _analysis_row(self, cid: str, task_id: str, t: int, score: int, roll: float) -> tuple:
+        status = 'completed' if roll < 0.92 else 'failed' if roll < 0.97 else 'pending'
+        if status != 'completed':
+            return (cid, task_id, self.task_created[t].date(), None, None, '[]', '[]', '{}', 'deepseek',
+                    status, None, self.task_created[t])
+        detail = {'relevance_score': score, 'audience_match': 'Synthetic audience match',
+                  'content_alignment': 'Synthetic content alignment',
+                  'recommendation': 'Recommended' if score >= 70 else 'Consider' if score >= 40 else 'Skip'}
+        return (cid, task_id, self.task_created[t].date(), score, detail['recommendation'], json.dumps(['Relevant topics']),
+                json.dumps(['Synthetic concern']), json.dumps(detail), 'deepseek', 'completed',
+                self.task_created[t] + timedelta(minutes=10), self.task_created[t])
+
+    @property
+    def chunks(self) -> int:
+        return (self.channels + CHUNK_CHANNELS - 1) // CHUNK_CHANNELS
+
+
+# ── loading ───────────────────────────────────────────────────────────
+
+def insert_rows(cursor, table: str, rows: list, batch_size: int = INSERT_BATCH):
+    """Multi-row INSERTs (executemany batches INSERT ... VALUES into one statement)"""
+    columns = COLUMNS[table]
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    for start in range(0, len(rows), batch_size):
+        cursor.executemany(sql, rows[start:start + batch_size])
+
+
+def _tsv_value(value) -> str:
+    if value is None:
+        return '\\N'
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return str(value).replace('\\', '\\\\').replace('\t', ' ').replace('\n', ' ')
+
+
+def load_rows(cursor, table: str, rows: list, directory: str):
+    """LOAD DATA LOCAL INFILE from a temporary TSV file"""
+    path = os.path.join(directory, f"{table}.tsv")
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.writelines('\t'.join(_tsv_value(value) for value in row) + '\n' for row in rows)
+    cursor.execute(
+        f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+        f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+        f"({', '.join(COLUMNS[table])})",
+        (path,),
+    )
+    os.remove(path)
+
+
+def generate(connection, channels: int = 100_000, tasks: int = None, load_data: bool = False,
+             **options) -> dict:
+    """Load a synthetic dataset; returns rows per table and seconds"""
+    tasks = tasks or max(10, channels // 500)
+    dataset = SyntheticDataset(channels, tasks, **options)
+    counts = {table: 0 for table in LOAD_ORDER}
+
+    cursor = connection.cursor()
+    cursor.execute("SET SESSION foreign_key_checks = 0, unique_checks = 0")
+    workdir = tempfile.mkdtemp(prefix='synthetic_') if load_data else None
+    write = (lambda table, rows: load_rows(cursor, table, rows, workdir)) if load_data else \
+        (lambda table, rows: insert_rows(cursor, table, rows))
+
+    started = time.perf_counter()
+    try:
+        task_rows = dataset.task_rows()
+        write('search_tasks', task_rows)
+        counts['search_tasks'] = len(task_rows)
+        connection.commit()
+
+        for chunk in range(dataset.chunks):
+            for table, rows in dataset.chunk_rows(chunk).items():
+                write(table, rows)
+                counts[table] += len(rows)
+            connection.commit()
+            if (chunk + 1) % 20 == 0 or chunk + 1 == dataset.chunks:
+                done = min(channels, (chunk + 1) * CHUNK_CHANNELS)
+                elapsed = time.perf_counter() - started
+                logger.info(f"  {done:>9,d} / {channels:,d} channels  "
+                            f"{sum(counts.values()) / elapsed:,.0f} rows/s")
+
+        # totals the list views read from search_tasks
+        cursor.execute(f"""
+            UPDATE search_tasks t
+            JOIN (SELECT task_id, COUNT(*) AS n FROM channel_video_stats
+                  WHERE task_id LIKE '{TASK_PREFIX}%' GROUP BY task_id) s ON s.task_id = t.task_id
+            SET t.total_channels = s.n, t.processed_channels = s.n
+        """)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.execute("SET SESSION foreign_key_checks = 1, unique_checks = 1")
+        cursor.close()
+        if workdir:
+            os.rmdir(workdir)
+
+    return {'rows': counts, 'seconds': time.perf_counter() - started}
+
+
+def purge(connection):
+    """Remove synthetic rows (explicitly: partitioned fact tables have no cascading FKs)"""
+    cursor = connection.cursor()
+    for table in ('channel_videos', 'ai_analysis', 'channel_video_stats'):
+        cursor.execute(f"DELETE FROM {table} WHERE task_id LIKE '{TASK_PREFIX}%'")
+        connection.commit()
+    cursor.execute(f"DELETE FROM videos WHERE channel_id LIKE '{CHANNEL_PREFIX}%'")
+    cursor.execute(f"DELETE FROM search_tasks WHERE task_id LIKE '{TASK_PREFIX}%'")
+    cursor.execute(f"DELETE FROM channels WHERE channel_id LIKE '{CHANNEL_PREFIX}%'")
+    connection.commit()
+    cursor.close()
+
+
+def main():
+    import mysql.connector
+
+    parser = argparse.ArgumentParser(description='Load a synthetic dataset for load testing')
+    parser.add_argument('--host', default='localhost', help='MySQL host')
+    parser.add_argument('--port', type=int, default=3306, help='MySQL port')
+    parser.add_argument('--user', default='root', help='MySQL user')
+    parser.add_argument('--password', required=True, help='MySQL password')
+    parser.add_argument('--database', default='youtube_kol_db', help='Database name')
+    parser.add_argument('--channels', type=int, default=100_000, help='Channels to generate')
+    parser.add_argument('--tasks', type=int, help='Search tasks (default: channels / 500)')
+    parser.add_argument('--videos-per-channel', type=int, default=10, help='Videos per channel')
+    parser.add_argument('--days', type=int, default=180, help='Spread tasks over this many days')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--load-data', action='store_true', help='Use LOAD DATA LOCAL INFILE')
+    parser.add_argument('--purge', action='store_true', help='Delete synthetic rows and exit')
+
+    args = parser.parse_args()
+
+    connection = mysql.connector.connect(host=args.host, port=args.port, user=args.user,
+                                         password=args.password, database=args.database,
+                                         allow_local_infile=args.load_data)
+    try:
+        if args.purge:
+            purge(connection)
+            logger.info("✓ Synthetic data removed")
+            return
+        result = generate(connection, args.channels, args.tasks, load_data=args.load_data,
+                          videos_per_channel=args.videos_per_channel, days=args.days, seed=args.seed)
+    finally:
+        connection.close()
+
+    total = sum(result['rows'].values())
+    for table, count in result['rows'].items():
+        logger.info(f"  {table:20s} {count:>12,d}")
+    logger.info(f"✓ {total:,d} rows in {result['seconds']:.1f}s ({total / result['seconds']:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,14 +4,13 @@ Test YouTube and AI API connectivity
 
 Usage:
     python test_apis.py --youtube-key YOUR_KEY --ai-provider deepseek --ai-key YOUR_AI_KEY
+    python test_apis.py --benchmark [--benchmark-url URL] [--benchmark-keyword KEYWORD ...]
 """
 
 import argparse
 import sys
 import json
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-import requests
+import time
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
@@ -23,6 +22,14 @@ def test_youtube_api(api_key: str) -> bool:
     
     logger.info("\n🔍 Testing YouTube API...")
     
+    try:
+        from googleapiclient.discovery import build
+        from googleapiclient.errors import HttpError
+    except ImportError:
+        logger.error("\n❌ YouTube API: google-api-python-client library not installed")
+        logger.error("   Install with: pip install google-api-python-client")
+        return False
+    
     try:
         # Build YouTube service
         youtube = build('youtube', 'v3', developerKey=api_key)
@@ -115,6 +122,8 @@ def test_deepseek_api(api_key: str) -> bool:
     
     logger.info("\n🤖 Testing Deepseek AI API...")
     
+    import requests
+    
     try:
         # Test simple completion
         logger.info("  → Sending test prompt...")
@@ -175,6 +184,8 @@ def test_zhipu_api(api_key: str) -> bool:
     
     logger.info("\n🤖 Testing Zhipu AI API...")
     
+    import requests
+    
     try:
         # Test simple completion
         logger.info("  → Sending test prompt...")
@@ -230,6 +241,14 @@ def test_zhipu_api(api_key: str) -> bool:
         return False
 
 
+LANGUAGE_TEST_TEXTS = {
+    'en': 'This is a test for English language detection',
+    'zh': '这是一个中文语言检测测试',
+    'ja': 'これは日本語の言語検出テストです',
+    'es': 'Esta es una prueba de detección de idioma español'
+}
+
+
 def test_language_detection():
     """Test language detection library"""
     
@@ -238,14 +257,7 @@ def test_language_detection():
     try:
         from langdetect import detect
         
-        test_texts = {
-            'en': 'This is a test for English language detection',
-            'zh': '这是一个中文语言检测测试',
-            'ja': 'これは日本語の言語検出テストです',
-            'es': 'Esta es una prueba de detección de idioma español'
-        }
-        
-        for expected_lang, text in test_texts.items():
+        for expected_lang, text in LANGUAGE_TEST_TEXTS.items():
             detected = detect(text)
             if detected == expected_lang or detected.startswith(expected_lang):
                 logger.info(f"  ✓ Detected '{expected_lang}' correctly")
@@ -266,17 +278,197 @@ def test_language_detection():
         return False
 
 
+def benchmark_language_detection(repeat: int = 250) -> bool:
+    """Throughput of per-text langdetect vs. the batch LanguageDetector"""
+    
+    logger.info("\n🌐 Benchmarking language detection...")
+    
+    try:
+        from langdetect import DetectorFactory, detect
+        from language_detector import get_detector
+    except ImportError as e:
+        logger.error(f"\n❌ Language benchmark: {e}")
+        logger.error("   Install with: pip install langdetect numpy")
+        return False
+    
+    DetectorFactory.seed = 0
+    expected = list(LANGUAGE_TEST_TEXTS) * repeat
+    texts = list(LANGUAGE_TEST_TEXTS.values()) * repeat
+    
+    detect(texts[0])  # langdetect loads its profiles on first use
+    started = time.perf_counter()
+    baseline = [detect(text) for text in texts]
+    baseline_elapsed = time.perf_counter() - started
+    
+    detector = get_detector()
+    started = time.perf_counter()
+    batch = [lang for lang, _ in detector.detect_batch(texts)]
+    batch_elapsed = time.perf_counter() - started
+    
+    def accuracy(detected):
+        return sum(d.startswith(e) for d, e in zip(detected, expected)) / len(expected)
+    
+    speedup = baseline_elapsed / batch_elapsed if batch_elapsed else float('inf')
+    logger.info(f"  Texts:      {len(texts)}")
+    logger.info(f"  langdetect: {len(texts) / baseline_elapsed:10.0f} texts/s  accuracy {accuracy(baseline):.0%}")
+    logger.info(f"  batch:      {len(texts) / batch_elapsed:10.0f} texts/s  accuracy {accuracy(batch):.0%}")
+    logger.info(f"  Speedup:    {speedup:.1f}x")
+    
+    passed = speedup >= 20 and accuracy(batch) >= accuracy(baseline)
+    logger.info("\n✅ Language benchmark: DONE" if passed else "\n⚠️  Language benchmark: below target")
+    return passed
+
+
+def run_benchmark(base_url: str = None, keywords: list = None, max_pages: int = None,
+                  num_channels: int = 2000, latency_scale: float = 1.0,
+                  error_rate_429: float = 0.0, error_rate_403: float = 0.0,
+                  use_async: bool = False, batch: bool = False,
+                  max_units_per_channel: float = None, min_rps: float = None,
+                  max_p95_ms: float = None) -> bool:
+    """Drive the full collection flow against the offline fake API and report throughput
+
+    Fails (returns False) on an error or when a given threshold is breached,
+    so CI can catch throughput, latency and quota-efficiency regressions.
+    """
+    
+    from fake_youtube_server import FakeYouTubeServer
+    from youtube_collector import (YouTubeClient, collect_keyword, collect_keyword_async,
+                                   collect_keywords_batch, collect_keywords_batch_async)
+    
+    keywords = keywords or ['PC cleanup', 'disk cleaner', 'windows optimizer']
+    
+    logger.info("\n⏱  Benchmarking collection flow...")
+    
+    server = None
+    try:
+        if base_url is None:
+            server = FakeYouTubeServer(
+                num_channels=num_channels,
+                latency_scale=latency_scale,
+                error_rate_429=error_rate_429,
+                error_rate_403=error_rate_403,
+                daily_quota=10_000_000,
+            ).start()
+            base_url = server.base_url
+            logger.info(f"  → Started fake YouTube API at {base_url}")
+        
+        client = YouTubeClient(['benchmark-key-1', 'benchmark-key-2'], base_url=base_url, backoff_base=1.2)
+        
+        discovered = set()
+        started = time.perf_counter()
+        if batch:
+            run_batch = collect_keywords_batch_async if use_async else collect_keywords_batch
+            channels, keyword_channels = run_batch(client, keywords, max_pages=max_pages)
+            discovered.update(channels)
+            matched = sum(len(ids) for ids in keyword_channels.values())
+            for keyword, ids in keyword_channels.items():
+                logger.info(f"  ✓ '{keyword}': {len(ids)} channels")
+            logger.info(f"  ✓ Batch: {matched} keyword matches → {len(channels)} unique channels collected once")
+            keywords = []
+        for keyword in keywords:
+            if use_async:
+                channels, first_result = collect_keyword_async(client, keyword, max_pages=max_pages)
+                logger.info(f"  ✓ '{keyword}': {len(channels)} channels (first after {first_result or 0:.2f}s)")
+            else:
+                keyword_started = time.perf_counter()
+                channels = collect_keyword(client, keyword, max_pages=max_pages)
+                logger.info(f"  ✓ '{keyword}': {len(channels)} channels "
+                            f"(all at once after {time.perf_counter() - keyword_started:.2f}s)")
+            discovered.update(channels)
+        elapsed = time.perf_counter() - started
+        
+        stats = client.stats
+        units_per_channel = stats.quota_units / len(discovered) if discovered else 0.0
+        rps = stats.total_calls / elapsed
+        p95_ms = stats.percentile(95) * 1000
+        
+        logger.info("\n✅ Benchmark: COMPLETED")
+        logger.info(f"   Channels discovered:  {len(discovered)}")
+        logger.info(f"   API calls:            {stats.total_calls} {dict(stats.calls)}")
+        logger.info(f"   Errors:               {dict(stats.errors) or 'none'}")
+        logger.info(f"   Elapsed:              {elapsed:.2f}s")
+        logger.info(f"   Throughput:           {rps:.1f} req/s")
+        logger.info(f"   Latency p50/p95/p99:  {stats.percentile(50) * 1000:.1f} / "
+                    f"{p95_ms:.1f} / {stats.percentile(99) * 1000:.1f} ms")
+        logger.info(f"   Quota units:          {stats.quota_units}")
+        logger.info(f"   Units per channel:    {units_per_channel:.2f}")
+
+        breaches = []
+        if max_units_per_channel is not None and units_per_channel > max_units_per_channel:
+            breaches.append(f"units per channel {units_per_channel:.2f} > {max_units_per_channel}")
+        if min_rps is not None and rps < min_rps:
+            breaches.append(f"throughput {rps:.1f} req/s < {min_rps}")
+        if max_p95_ms is not None and p95_ms > max_p95_ms:
+            breaches.append(f"p95 latency {p95_ms:.1f} ms > {max_p95_ms}")
+        if breaches:
+            logger.error("\n❌ Benchmark: THRESHOLD BREACHED")
+            for breach in breaches:
+                logger.error(f"   {breach}")
+            return False
+        return True
+        
+    except Exception as e:
+        logger.error(f"\n❌ Benchmark: ERROR")
+        logger.error(f"   {str(e)}")
+        return False
+        
+    finally:
+        if server:
+            server.stop()
+
+
 def main():
     parser = argparse.ArgumentParser(description='Test API connectivity')
     parser.add_argument('--youtube-key', help='YouTube Data API v3 key')
     parser.add_argument('--ai-provider', choices=['deepseek', 'zhipu'], help='AI provider to test')
     parser.add_argument('--ai-key', help='AI API key')
     parser.add_argument('--all', action='store_true', help='Test all APIs (requires all keys)')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Benchmark the collection flow against the offline fake YouTube API')
+    parser.add_argument('--benchmark-url', help='Use an already running fake API instead of starting one')
+    parser.add_argument('--benchmark-keyword', action='append', help='Keyword to benchmark (repeatable)')
+    parser.add_argument('--benchmark-max-pages', type=int, help='Max search pages per search type')
+    parser.add_argument('--benchmark-channels', type=int, default=2000, help='Synthetic channels in the fake API')
+    parser.add_argument('--benchmark-latency-scale', type=float, default=1.0,
+                        help='Fake API latency multiplier (0 disables simulated latency)')
+    parser.add_argument('--benchmark-error-rate-429', type=float, default=0.0, help='Injected 429 probability')
+    parser.add_argument('--benchmark-error-rate-403', type=float, default=0.0,
+                        help='Injected (non-retryable) 403 probability')
+    parser.add_argument('--benchmark-max-units-per-channel', type=float,
+                        help='Fail the benchmark above this many quota units per channel')
+    parser.add_argument('--benchmark-min-rps', type=float, help='Fail the benchmark below this throughput')
+    parser.add_argument('--benchmark-max-p95-ms', type=float, help='Fail the benchmark above this p95 latency')
+    parser.add_argument('--benchmark-async', action='store_true',
+                        help='Benchmark the concurrent async search/collection pipeline')
+    parser.add_argument('--benchmark-batch', action='store_true',
+                        help='Run all benchmark keywords as one batch with cross-keyword dedup')
+    parser.add_argument('--benchmark-langid', action='store_true',
+                        help='Compare langdetect with the batch language detector')
     
     args = parser.parse_args()
     
     results = {}
     
+    # Benchmark mode: offline, no keys or quota needed
+    if args.benchmark:
+        results['benchmark'] = run_benchmark(
+            base_url=args.benchmark_url,
+            keywords=args.benchmark_keyword,
+            max_pages=args.benchmark_max_pages,
+            num_channels=args.benchmark_channels,
+            latency_scale=args.benchmark_latency_scale,
+            error_rate_429=args.benchmark_error_rate_429,
+            error_rate_403=args.benchmark_error_rate_403,
+            use_async=args.benchmark_async,
+            batch=args.benchmark_batch,
+            max_units_per_channel=args.benchmark_max_units_per_channel,
+            min_rps=args.benchmark_min_rps,
+            max_p95_ms=args.benchmark_max_p95_ms,
+        )
+    
+    if args.benchmark_langid:
+        results['language_benchmark'] = benchmark_language_detection()
+    
     # Test YouTube API
     if args.youtube_key:
         results['youtube'] = test_youtube_api(args.youtube_key)
@@ -292,8 +484,9 @@ def main():
     elif args.all:
         logger.warning("⚠ Skipping AI API test (no provider/key provided)")
     
-    # Test language detection (always)
-    results['language_detection'] = test_language_detection()
+    # Test language detection (always, except in benchmark mode)
+    if not (args.benchmark or args.benchmark_langid):
+        results['language_detection'] = test_language_detection()
     
     # Summary
     logger.info("\n" + "="*60)
@@ -0,0 +1,720 @@
+#!/usr/bin/env python3
+"""
+Reference YouTube collection flow (search → channels → playlistItems → videos)
+
+Talks to the YouTube Data API v3 REST endpoints over plain HTTP(S) so it can be
+pointed at the real API or at fake_youtube_server.py. Used by
+`test_apis.py --benchmark` to measure collector throughput offline.
+
+Usage:
+    python youtube_collector.py --api-key KEY --keyword "PC cleanup" [--base-url URL] [--max-pages N] [--async]
+    python youtube_collector.py --api-key KEY --keyword "PC cleanup" --keyword "disk cleaner" ...
+    python youtube_collector.py --api-key KEY --keyword "PC cleanup" --redis-url redis://localhost:6379/0
+    python youtube_collector.py --api-key KEY --keyword "PC cleanup" --task-id TASK --password PASS
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlencode, urlparse
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = 'https://www.googleapis.com/youtube/v3'
+
+QUOTA_COSTS = {
+    'search': 100,
+    'channels': 1,
+    'playlistItems': 1,
+    'videos': 1,
+}
+
+MAX_IDS_PER_CALL = 50
+RECENT_VIDEOS = 10
+
+
+class YouTubeAPIError(Exception):
+    """Non-retryable error returned by the YouTube API"""
+
+    def __init__(self, status: int, reason: str, message: str):
+        super().__init__(f"HTTP {status} {reason}: {message}")
+        self.status = status
+        self.reason = reason
+        self.message = message
+
+
+class QuotaExhaustedException(Exception):
+    """Every configured API key has run out of quota"""
+
+
+class RequestStats:
+    """Thread-safe request latency, error and quota counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = []
+        self.calls = {}
+        self.errors = {}
+        self.quota_units = 0
+        self.units = {}
+
+    def record(self, endpoint: str, latency: float, status: int):
+        with self._lock:
+            self.latencies.append(latency)
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            if status == 200:
+                self.quota_units += QUOTA_COSTS.get(endpoint, 0)
+                self.units[endpoint] = self.units.get(endpoint, 0) + QUOTA_COSTS.get(endpoint, 0)
+            else:
+                self.errors[status] = self.errors.get(status, 0) + 1
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def percentile(self, pct: float) -> float:
+        """Latency percentile in seconds (nearest-rank)"""
+        with self._lock:
+            ordered = sorted(self.latencies)
+        if not ordered:
+            return 0.0
+        rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+        return ordered[rank]
+
+
+class YouTubeClient:
+    """Minimal keep-alive REST client with key rotation and 429 backoff"""
+
+    def __init__(self, api_keys, base_url: str = DEFAULT_BASE_URL,
+                 max_retries: int = 3, backoff_base: float = 2.0, timeout: float = 30.0,
+                 ledger=None):
+        """
+        api_keys: key or list of keys, ignored when a quota_ledger.QuotaLedger is
+                  given (the ledger then picks keys and reserves units per call)
+        """
+        self.ledger = ledger
+        if ledger is not None:
+            api_keys = [key['api_key'] for key in ledger.keys]
+        self.api_keys = [api_keys] if isinstance(api_keys, str) else list(api_keys)
+        if not self.api_keys:
+            raise ValueError("At least one API key is required")
+
+        parsed = urlparse(base_url)
+        self._scheme = parsed.scheme
+        self._host = parsed.hostname
+        self._port = parsed.port
+        self._path = parsed.path.rstrip('/')
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.timeout = timeout
+        self.stats = RequestStats()
+
+        self._lock = threading.Lock()
+        self._key_index = 0
+        self._exhausted = set()
+        self._local = threading.local()
+
+    # ------------------------------------------------------------------
+    # Connection & key handling
+    # ------------------------------------------------------------------
+
+    def _connection(self, fresh: bool = False):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or fresh:
+            if conn is not None:
+                conn.close()
+            conn_class = http.client.HTTPSConnection if self._scheme == 'https' else http.client.HTTPConnection
+            conn = conn_class(self._host, self._port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _current_key(self) -> str:
+        with self._lock:
+            for offset in range(len(self.api_keys)):
+                key = self.api_keys[(self._key_index + offset) % len(self.api_keys)]
+                if key not in self._exhausted:
+                    return key
+        raise QuotaExhaustedException("All API keys exhausted")
+
+    def _rotate_key(self, api_key: str, exhausted: bool = False):
+        with self._lock:
+            if exhausted:
+                self._exhausted.add(api_key)
+            if self.api_keys[self._key_index % len(self.api_keys)] == api_key:
+                self._key_index = (self._key_index + 1) % len(self.api_keys)
+
+    def _get(self, path: str):
+        for attempt in range(2):
+            conn = self._connection(fresh=attempt > 0)
+            try:
+                conn.request('GET', path, headers={'Accept': 'application/json'})
+                response = conn.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, ConnectionError):
+                if attempt:
+                    raise
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def call(self, endpoint: str, **params) -> dict:
+        """Execute one API call, rotating keys and backing off as needed
+
+        Rotating away from an exhausted key is not a retry: the call moves on
+        until a key answers or every key is exhausted (QuotaExhaustedException).
+        Only 429/5xx backoffs count against max_retries.
+        """
+
+        attempt = 0
+        while True:
+            if self.ledger is not None:
+                api_key = self.ledger.reserve(QUOTA_COSTS.get(endpoint, 1))
+            else:
+                api_key = self._current_key()
+            query = urlencode({**params, 'key': api_key})
+
+            started = time.perf_counter()
+            status, body = self._get(f"{self._path}/{endpoint}?{query}")
+            self.stats.record(endpoint, time.perf_counter() - started, status)
+
+            if status == 200:
+                return json.loads(body)
+
+            try:
+                error = json.loads(body).get('error', {})
+            except ValueError:
+                error = {}
+            reason = (error.get('errors') or [{}])[0].get('reason', '')
+            message = error.get('message', body[:200])
+
+            if status == 403 and reason in ('quotaExceeded', 'dailyLimitExceeded'):
+                logger.warning(f"⚠ Key ...{api_key[-4:]} exhausted, rotating")
+                self._rotate_key(api_key, exhausted=True)
+                if self.ledger is not None:
+                    self.ledger.mark_exhausted(api_key)
+                continue
+
+            if status in (429, 500, 503) and attempt < self.max_retries:
+                # HTTP 429 → switch key immediately, then back off (2s, 4s, 8s, ...)
+                attempt += 1
+                self._rotate_key(api_key)
+                time.sleep(self.backoff_base ** attempt * 0.5)
+                continue
+
+            raise YouTubeAPIError(status, reason, message)
+
+
+def search_pages(client: YouTubeClient, keyword: str, search_type: str, max_pages: int = None, **extra):
+    """Yield search.list pages for a keyword, following nextPageToken"""
+
+    page_token = None
+    pages = 0
+    while True:
+        params = {'part': 'snippet', 'q': keyword, 'type': search_type, 'maxResults': MAX_IDS_PER_CALL, **extra}
+        if page_token:
+            params['pageToken'] = page_token
+
+        response = client.call('search', **params)
+        pages += 1
+        yield response
+
+        page_token = response.get('nextPageToken')
+        if not page_token or (max_pages and pages >= max_pages):
+            return
+
+
+def extract_channel_ids(search_response: dict) -> list:
+    """Channel IDs from a search page, in order, without duplicates"""
+    seen = []
+    for item in search_response.get('items', []):
+        channel_id = item.get('snippet', {}).get('channelId') or item.get('id', {}).get('channelId')
+        if channel_id and channel_id not in seen:
+            seen.append(channel_id)
+    return seen
+
+
+def parse_video(item: dict) -> dict:
+    """videos.list item → recent_videos entry (see database_schema.md)"""
+    snippet = item.get('snippet', {})
+    stats = item.get('statistics', {})
+    views = int(stats.get('viewCount', 0))
+    likes = int(stats.get('likeCount', 0))
+    comments = int(stats.get('commentCount', 0))
+    return {
+        'video_id': item['id'],
+        'title': snippet.get('title', ''),
+        'description': snippet.get('description', ''),
+        'view_count': views,
+        'like_count': likes,
+        'comment_count': comments,
+        'engagement_rate': (likes + comments) / views if views else 0.0,
+        'published_at': snippet.get('publishedAt'),
+    }
+
+
+def parse_channel(item: dict) -> dict:
+    """channels.list item → channels row fields"""
+    snippet = item.get('snippet', {})
+    stats = item.get('statistics', {})
+    return {
+        'channel_id': item['id'],
+        'channel_title': snippet.get('title', ''),
+        'channel_url': f"https://www.youtube.com/channel/{item['id']}",
+        'subscriber_count': int(stats.get('subscriberCount', 0)),
+        'description': snippet.get('description', ''),
+        'custom_url': snippet.get('customUrl'),
+        'thumbnail_url': snippet.get('thumbnails', {}).get('default', {}).get('url'),
+        'uploads_playlist_id': item.get('contentDetails', {}).get('relatedPlaylists', {}).get('uploads'),
+        'recent_videos': [],
+    }
+
+
+def search_phase(client: YouTubeClient, keyword: str, max_pages: int = None) -> list:
+    """Phase 1: type=channel then type=video search, merged and deduplicated"""
+
+    channel_ids = []
+    seen = set()
+    for search_type in ('channel', 'video'):
+        for page in search_pages(client, keyword, search_type, max_pages=max_pages):
+            for channel_id in extract_channel_ids(page):
+                if channel_id not in seen:
+                    seen.add(channel_id)
+                    channel_ids.append(channel_id)
+    return channel_ids
+
+
+def fetch_channels(client: YouTubeClient, channel_ids: list) -> dict:
+    """Batch channels.list (1 unit / 50 channels)"""
+
+    channels = {}
+    for start in range(0, len(channel_ids), MAX_IDS_PER_CALL):
+        batch = channel_ids[start:start + MAX_IDS_PER_CALL]
+        response = client.call('channels', part='snippet,statistics,contentDetails', id=','.join(batch))
+        for item in response.get('items', []):
+            channels[item['id']] = parse_channel(item)
+    return channels
+
+
+def fetch_recent_video_ids(client: YouTubeClient, uploads_playlist_id: str,
+                           limit: int = RECENT_VIDEOS) -> list:
+    """Most recent upload IDs from a channel's uploads playlist (1 unit)"""
+    response = client.call('playlistItems', part='contentDetails',
+                           playlistId=uploads_playlist_id, maxResults=min(limit, MAX_IDS_PER_CALL))
+    return [item['contentDetails']['videoId'] for item in response.get('items', [])][:limit]
+
+
+class VideoBatcher:
+    """Packs video IDs from many channels into shared 50-ID videos.list calls
+
+    Channels contribute their recent upload IDs with add(); whenever 50 IDs are
+    pending a single videos.list call is issued. videos_for() returns each
+    channel's parsed videos in its original playlist order.
+    """
+
+    def __init__(self, client: YouTubeClient, part: str = 'snippet,statistics'):
+        self.client = client
+        self.part = part
+        self.calls = 0
+        self._pending = []
+        self._queued = set()
+        self._order = defaultdict(list)
+        self._videos = {}
+
+    def queue(self, channel_id: str, video_ids: list):
+        """Record a channel's video IDs without fetching anything yet"""
+        for video_id in video_ids:
+            self._order[channel_id].append(video_id)
+            if video_id not in self._videos and video_id not in self._queued:
+                self._queued.add(video_id)
+                self._pending.append(video_id)
+
+    def add(self, channel_id: str, video_ids: list):
+        """Queue a channel's video IDs; full batches are fetched immediately"""
+        self.queue(channel_id, video_ids)
+        while len(self._pending) >= MAX_IDS_PER_CALL:
+            self.fetch(self._pending[:MAX_IDS_PER_CALL])
+            del self._pending[:MAX_IDS_PER_CALL]
+
+    def drain_batches(self) -> list:
+        """Remove and return all pending IDs as lists of at most 50"""
+        pending, self._pending = self._pending, []
+        return [pending[i:i + MAX_IDS_PER_CALL] for i in range(0, len(pending), MAX_IDS_PER_CALL)]
+
+    def flush(self):
+        """Fetch any remaining partial batch"""
+        for batch in self.drain_batches():
+            self.fetch(batch)
+
+    def fetch(self, video_ids: list):
+        """Issue one videos.list call for up to 50 IDs"""
+        response = self.client.call('videos', part=self.part, id=','.join(video_ids))
+        self.calls += 1
+        for item in response.get('items', []):
+            self._videos[item['id']] = parse_video(item)
+        self._queued.difference_update(video_ids)
+
+    def videos_for(self, channel_id: str) -> list:
+        """Parsed videos for a channel (private/deleted videos are skipped)"""
+        return [self._videos[vid] for vid in self._order.get(channel_id, []) if vid in self._videos]
+
+
+def fetch_recent_videos(client: YouTubeClient, channels: list, videos_per_channel: int = RECENT_VIDEOS) -> dict:
+    """channel_id → parsed recent videos
+
+    playlistItems is still one call per channel, but the resulting video IDs
+    are batched across channels so videos.list costs 1 unit per 50 videos
+    instead of 1 unit per channel.
+    """
+
+    batcher = VideoBatcher(client)
+    for channel in channels:
+        if not channel['uploads_playlist_id']:
+            continue
+        video_ids = fetch_recent_video_ids(client, channel['uploads_playlist_id'], videos_per_channel)
+        batcher.add(channel['channel_id'], video_ids)
+    batcher.flush()
+    return {channel['channel_id']: batcher.videos_for(channel['channel_id']) for channel in channels}
+
+
+def collection_phase(client: YouTubeClient, channel_ids: list, videos_per_channel: int = RECENT_VIDEOS,
+                     cache=None) -> dict:
+    """Phase 2: channel info plus recent video statistics
+
+    With a channel_cache.ReadThroughCache, channel info (channel:{id}:info)
+    and recent videos (channel:{id}:stats) come from the cache where
+    possible, and only the misses cost API calls.
+    """
+
+    if cache is None:
+        channels = fetch_channels(client, channel_ids)
+        videos = fetch_recent_videos(client, list(channels.values()), videos_per_channel)
+    else:
+        channels = cache.get_many(channel_ids, 'info', lambda ids: fetch_channels(client, ids))
+        videos = cache.get_many(list(channels), 'stats', lambda ids: fetch_recent_videos(
+            client, [channels[cid] for cid in ids], videos_per_channel))
+
+    return {
+        channel_id: dict(channel, recent_videos=videos.get(channel_id, []))
+        for channel_id, channel in channels.items()
+    }
+
+
+def collect_keyword(client: YouTubeClient, keyword: str, max_pages: int = None,
+                    videos_per_channel: int = RECENT_VIDEOS, cache=None) -> dict:
+    """Search and collect every channel for one keyword"""
+    channel_ids = search_phase(client, keyword, max_pages=max_pages)
+    return collection_phase(client, channel_ids, videos_per_channel, cache=cache)
+
+
+def collect_keywords_batch(client: YouTubeClient, keywords: list, max_pages: int = None,
+                           videos_per_channel: int = RECENT_VIDEOS, cache=None) -> tuple:
+    """Search many keywords, then collect each unique channel once
+
+    Returns (channels, keyword_channels) where keyword_channels maps every
+    keyword to the channel IDs it matched, for task_keyword_channels rows.
+    """
+
+    keyword_channels = {}
+    unique_ids = []
+    seen = set()
+    for keyword in keywords:
+        keyword_channels[keyword] = search_phase(client, keyword, max_pages=max_pages)
+        for channel_id in keyword_channels[keyword]:
+            if channel_id not in seen:
+                seen.add(channel_id)
+                unique_ids.append(channel_id)
+
+    channels = collection_phase(client, unique_ids, videos_per_channel, cache=cache)
+    keyword_channels = {
+        keyword: [cid for cid in ids if cid in channels]
+        for keyword, ids in keyword_channels.items()
+    }
+    return channels, keyword_channels
+
+
+class AsyncSearchPipeline:
+    """Concurrent search pagination feeding collection as pages arrive
+
+    The type=channel and type=video searches paginate as two concurrent
+    streams. Every page's unseen channel IDs go straight onto a queue; a
+    consumer groups whatever is queued (up to 50 IDs, one channels.list call)
+    into a chunk and collects it while the searches keep paginating. The
+    blocking HTTP client runs in worker threads, bounded by max_in_flight.
+    With a language_stage (language_detector.LanguageDetectionStage) each
+    collected chunk is handed to its process pool and only awaited here.
+    """
+
+    def __init__(self, client: YouTubeClient, max_in_flight: int = 8,
+                 videos_per_channel: int = RECENT_VIDEOS, on_channels=None,
+                 language_stage=None):
+        self.client = client
+        self.videos_per_channel = videos_per_channel
+        self.on_channels = on_channels
+        self.language_stage = language_stage
+        self.first_result_at = None
+        self.keyword_channels = {}
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._started = None
+
+    async def _call(self, func, *args, **kwargs):
+        async with self._semaphore:
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+    async def _search_stream(self, keyword: str, search_type: str, queue: asyncio.Queue,
+                             seen: set, hits: list, max_pages: int = None, **extra):
+        page_token = None
+        pages = 0
+        while True:
+            params = {'part': 'snippet', 'q': keyword, 'type': search_type,
+                      'maxResults': MAX_IDS_PER_CALL, **extra}
+            if page_token:
+                params['pageToken'] = page_token
+
+            response = await self._call(self.client.call, 'search', **params)
+            pages += 1
+            for channel_id in extract_channel_ids(response):
+                hits.append(channel_id)
+                if channel_id not in seen:
+                    seen.add(channel_id)
+                    queue.put_nowait(channel_id)
+
+            page_token = response.get('nextPageToken')
+            if not page_token or (max_pages and pages >= max_pages):
+                return
+
+    async def _collect_chunk(self, channel_ids: list) -> dict:
+        channels = await self._call(fetch_channels, self.client, channel_ids)
+
+        async def recent_ids(channel):
+            if not channel['uploads_playlist_id']:
+                return channel['channel_id'], []
+            video_ids = await self._call(fetch_recent_video_ids, self.client,
+                                         channel['uploads_playlist_id'], self.videos_per_channel)
+            return channel['channel_id'], video_ids
+
+        batcher = VideoBatcher(self.client)
+        for channel_id, video_ids in await asyncio.gather(*(recent_ids(c) for c in channels.values())):
+            batcher.queue(channel_id, video_ids)
+        await asyncio.gather(*(self._call(batcher.fetch, batch) for batch in batcher.drain_batches()))
+
+        for channel_id, channel in channels.items():
+            channel['recent_videos'] = batcher.videos_for(channel_id)
+
+        if self.language_stage is not None and channels:
+            languages = await self.language_stage.detect_channels(channels.values())
+            for channel_id, result in languages.items():
+                channels[channel_id].update({
+                    'detected_language': result['language'],
+                    'language_confidence': result['confidence'],
+                    'video_languages': result['video_languages'],
+                })
+
+        if self.first_result_at is None and channels:
+            self.first_result_at = time.perf_counter() - self._started
+        if self.on_channels:
+            self.on_channels(channels)
+        return channels
+
+    async def run(self, keyword: str, max_pages: int = None, **search_extra) -> dict:
+        """Search and collect one keyword; returns channel_id → channel data"""
+        return await self.run_batch([keyword], max_pages=max_pages, **search_extra)
+
+    async def run_batch(self, keywords: list, max_pages: int = None, **search_extra) -> dict:
+        """Search many keywords concurrently and collect each unique channel once
+
+        Channel IDs are deduplicated across every keyword's streams before
+        collection. keyword_channels maps each keyword to all channels it
+        matched, including ones first found through another keyword.
+        """
+
+        self._started = time.perf_counter()
+        queue = asyncio.Queue()
+        seen = set()
+        done = object()
+        hits = {keyword: [] for keyword in keywords}
+
+        async def producers():
+            streams = [
+                asyncio.create_task(self._search_stream(keyword, search_type, queue, seen, hits[keyword],
+                                                        max_pages, **search_extra))
+                for keyword in keywords
+                for search_type in ('channel', 'video')
+            ]
+            try:
+                await asyncio.gather(*streams)
+            finally:
+                for stream in streams:
+                    stream.cancel()
+                await asyncio.gather(*streams, return_exceptions=True)
+                queue.put_nowait(done)
+
+        producer_task = asyncio.create_task(producers())
+        chunk_tasks = []
+
+        def stop_searching(chunk_task):
+            # a failed chunk fails the run, so stop paying for more search pages now
+            if not chunk_task.cancelled() and chunk_task.exception() is not None:
+                producer_task.cancel()
+
+        try:
+            finished = False
+            while not finished:
+                chunk = [await queue.get()]
+                while len(chunk) < MAX_IDS_PER_CALL and not queue.empty():
+                    chunk.append(queue.get_nowait())
+                if chunk[-1] is done:
+                    chunk.pop()
+                    finished = True
+                if chunk:
+                    chunk_task = asyncio.create_task(self._collect_chunk(chunk))
+                    chunk_task.add_done_callback(stop_searching)
+                    chunk_tasks.append(chunk_task)
+
+            # chunks first: after a chunk failure the producer is only cancelled
+            channels = {}
+            for result in await asyncio.gather(*chunk_tasks):
+                channels.update(result)
+            await producer_task
+        finally:
+            # a failed search or chunk (quota exhausted, 403) must not leave the rest running
+            tasks = [producer_task, *chunk_tasks]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.keyword_channels = {
+            keyword: [cid for cid in dict.fromkeys(ids) if cid in channels]
+            for keyword, ids in hits.items()
+        }
+        return channels
+
+
+async def _run_pipeline(client: YouTubeClient, keywords: list, max_pages: int, videos_per_channel: int,
+                        max_in_flight: int, on_channels, language_workers: int) -> tuple:
+    """(pipeline, channels); the language stage lives only for this run"""
+    stage = None
+    if language_workers:
+        from language_detector import LanguageDetectionStage
+        stage = LanguageDetectionStage(workers=language_workers)
+        await asyncio.to_thread(stage.start)
+    try:
+        pipeline = AsyncSearchPipeline(client, max_in_flight=max_in_flight,
+                                       videos_per_channel=videos_per_channel, on_channels=on_channels,
+                                       language_stage=stage)
+        return pipeline, await pipeline.run_batch(keywords, max_pages=max_pages)
+    finally:
+        if stage is not None:
+            await asyncio.to_thread(stage.close)
+
+
+def collect_keyword_async(client: YouTubeClient, keyword: str, max_pages: int = None,
+                          videos_per_channel: int = RECENT_VIDEOS, max_in_flight: int = 8,
+                          on_channels=None, language_workers: int = 0) -> tuple:
+    """Run AsyncSearchPipeline for one keyword; returns (channels, seconds to first result)
+
+    language_workers > 0 also detects languages on that many worker processes.
+    """
+    pipeline, channels = asyncio.run(_run_pipeline(client, [keyword], max_pages, videos_per_channel,
+                                                   max_in_flight, on_channels, language_workers))
+    return channels, pipeline.first_result_at
+
+
+def collect_keywords_batch_async(client: YouTubeClient, keywords: list, max_pages: int = None,
+                                 videos_per_channel: int = RECENT_VIDEOS, max_in_flight: int = 8,
+                                 on_channels=None, language_workers: int = 0) -> tuple:
+    """Run AsyncSearchPipeline.run_batch; returns (channels, keyword_channels)"""
+    pipeline, channels = asyncio.run(_run_pipeline(client, keywords, max_pages, videos_per_channel,
+                                                   max_in_flight, on_channels, language_workers))
+    return channels, pipeline.keyword_channels
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Collect YouTube channels for one or more keywords')
+    parser.add_argument('--api-key', action='append', required=True, help='YouTube API key (repeatable)')
+    parser.add_argument('--keyword', action='append', required=True,
+                        help='Search keyword (repeat for a multi-keyword batch with shared collection)')
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL, help='API base URL')
+    parser.add_argument('--max-pages', type=int, help='Max search pages per search type')
+    parser.add_argument('--output', help='Write collected channels to this JSON file')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='Run both searches concurrently and collect pages as they arrive')
+    parser.add_argument('--max-in-flight', type=int, default=8, help='Concurrent requests in --async mode')
+    parser.add_argument('--language-workers', type=int, default=0,
+                        help='Detect languages on N worker processes (--async mode)')
+    parser.add_argument('--redis-url',
+                        help='Read channel info / recent videos through the Redis channel cache (not with --async)')
+    parser.add_argument('--task-id', help='Store the collection on this search_tasks row (needs MySQL)')
+    parser.add_argument('--host', default='localhost', help='MySQL host')
+    parser.add_argument('--port', type=int, default=3306, help='MySQL port')
+    parser.add_argument('--user', default='root', help='MySQL user')
+    parser.add_argument('--password', help='MySQL password (with --task-id)')
+    parser.add_argument('--database', default='youtube_kol_db', help='Database name')
+
+    args = parser.parse_args()
+
+    if args.task_id and args.password is None:
+        parser.error('--task-id needs --password')
+    if args.use_async and args.redis_url:
+        parser.error('--redis-url is not supported with --async (the async pipeline does not read the cache)')
+
+    cache = None
+    if args.redis_url:
+        import redis
+        from channel_cache import ReadThroughCache, RedisChannelCache
+
+        cache = ReadThroughCache(RedisChannelCache(redis.Redis.from_url(args.redis_url)))
+
+    client = YouTubeClient(args.api_key, base_url=args.base_url)
+    if len(args.keyword) > 1:
+        batch = collect_keywords_batch_async if args.use_async else collect_keywords_batch
+        if args.use_async:
+            options = {'max_in_flight': args.max_in_flight, 'language_workers': args.language_workers}
+        else:
+            options = {'cache': cache}
+        channels, keyword_channels = batch(client, args.keyword, max_pages=args.max_pages, **options)
+        for keyword, ids in keyword_channels.items():
+            logger.info(f"  '{keyword}': {len(ids)} channels")
+    elif args.use_async:
+        channels, first_result = collect_keyword_async(client, args.keyword[0], max_pages=args.max_pages,
+                                                       max_in_flight=args.max_in_flight,
+                                                       language_workers=args.language_workers)
+        logger.info(f"✓ First channels collected after {first_result or 0:.2f}s")
+    else:
+        channels = collect_keyword(client, args.keyword[0], max_pages=args.max_pages, cache=cache)
+    if len(args.keyword) == 1:
+        keyword_channels = {args.keyword[0]: list(channels)}
+
+    logger.info(f"✓ Collected {len(channels)} channels")
+    logger.info(f"  API calls: {client.stats.total_calls}, quota units: {client.stats.quota_units}")
+    if cache is not None:
+        logger.info(f"  Channel cache: {cache.stats.as_dict()}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(channels, f, ensure_ascii=False, indent=2)
+        logger.info(f"✓ Written to {args.output}")
+
+    if args.task_id:
+        import mysql.connector
+        from bulk_writer import store_task
+        from incremental_search import record_search_units
+
+        connection = mysql.connector.connect(host=args.host, port=args.port, user=args.user,
+                                             password=args.password, database=args.database)
+        try:
+            sets = store_task(connection, args.task_id, channels, keyword_channels)
+            record_search_units(connection, args.task_id, client.stats.units.get('search', 0))
+        finally:
+            connection.close()
+        logger.info(f"✓ Stored {len(channels)} channels and {len(sets)} keyword sets on task {args.task_id}")
+
+
+if __name__ == '__main__':
+    main()
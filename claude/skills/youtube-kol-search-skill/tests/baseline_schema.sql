@@ -0,0 +1,144 @@
+-- Schema of a database created by init_database.py before migrate.py existed:
+-- create_tables + create_schema_version_table (versions 1-4 recorded, no checksums)
+CREATE TABLE search_tasks (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    task_id VARCHAR(64) UNIQUE NOT NULL,
+    keyword VARCHAR(255) NOT NULL,
+    product_info TEXT,
+    status ENUM('pending', 'running', 'completed', 'failed', 'paused') DEFAULT 'pending',
+    total_channels INT DEFAULT 0,
+    processed_channels INT DEFAULT 0,
+    is_incremental BOOLEAN DEFAULT 0,
+    parent_task_id VARCHAR(64),
+    new_channels_count INT DEFAULT 0,
+    accelerated_mode BOOLEAN DEFAULT 0,
+    error_message TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP NULL,
+    completed_at TIMESTAMP NULL,
+    INDEX idx_keyword (keyword),
+    INDEX idx_status (status),
+    INDEX idx_created (created_at DESC),
+    INDEX idx_parent (parent_task_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE channels (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    channel_id VARCHAR(64) UNIQUE NOT NULL,
+    channel_title VARCHAR(255) NOT NULL,
+    channel_url VARCHAR(512) NOT NULL,
+    subscriber_count BIGINT DEFAULT 0,
+    description TEXT,
+    detected_language VARCHAR(10),
+    language_confidence FLOAT,
+    custom_url VARCHAR(255),
+    thumbnail_url VARCHAR(512),
+    first_discovered_at TIMESTAMP NOT NULL,
+    last_seen_at TIMESTAMP NOT NULL,
+    status ENUM('active', 'disappeared', 'deleted', 'private') DEFAULT 'active',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_channel_id (channel_id),
+    INDEX idx_language (detected_language),
+    INDEX idx_subscribers (subscriber_count DESC),
+    INDEX idx_status (status),
+    INDEX idx_last_seen (last_seen_at DESC),
+    FULLTEXT INDEX ft_title_desc (channel_title, description)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE channel_video_stats (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    channel_id VARCHAR(64) NOT NULL,
+    task_id VARCHAR(64) NOT NULL,
+    avg_view_count BIGINT DEFAULT 0,
+    avg_like_count INT DEFAULT 0,
+    avg_comment_count INT DEFAULT 0,
+    avg_engagement_rate FLOAT DEFAULT 0,
+    has_outliers BOOLEAN DEFAULT 0,
+    outlier_videos JSON,
+    recent_videos JSON NOT NULL,
+    video_languages JSON,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_channel_task (channel_id, task_id),
+    INDEX idx_engagement (avg_engagement_rate DESC),
+    INDEX idx_views (avg_view_count DESC),
+    CONSTRAINT fk_stats_channel FOREIGN KEY (channel_id) REFERENCES channels(channel_id) ON DELETE CASCADE,
+    CONSTRAINT fk_stats_task FOREIGN KEY (task_id) REFERENCES search_tasks(task_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE ai_analysis (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    channel_id VARCHAR(64) NOT NULL,
+    task_id VARCHAR(64) NOT NULL,
+    relevance_score INT,
+    audience_match TEXT,
+    content_alignment TEXT,
+    recommendation TEXT,
+    key_strengths JSON,
+    concerns JSON,
+    analysis_detail JSON NOT NULL,
+    ai_provider VARCHAR(20),
+    analysis_status ENUM('pending', 'processing', 'completed', 'failed') DEFAULT 'pending',
+    error_message TEXT,
+    analyzed_at TIMESTAMP NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_channel_task (channel_id, task_id),
+    INDEX idx_score (relevance_score DESC),
+    INDEX idx_status (analysis_status),
+    INDEX idx_provider (ai_provider),
+    UNIQUE KEY uk_channel_task (channel_id, task_id),
+    CONSTRAINT fk_analysis_channel FOREIGN KEY (channel_id) REFERENCES channels(channel_id) ON DELETE CASCADE,
+    CONSTRAINT fk_analysis_task FOREIGN KEY (task_id) REFERENCES search_tasks(task_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE api_keys (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    api_key VARCHAR(512) NOT NULL,
+    api_type ENUM('youtube', 'deepseek', 'zhipu') NOT NULL,
+    display_name VARCHAR(100),
+    daily_quota INT DEFAULT 10000,
+    used_quota INT DEFAULT 0,
+    last_reset_date DATE,
+    is_active BOOLEAN DEFAULT 1,
+    priority INT DEFAULT 0,
+    notes TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    UNIQUE KEY uk_api_key (api_key(255))
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE product_config (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    product_name VARCHAR(255) NOT NULL,
+    product_url VARCHAR(512),
+    product_description TEXT,
+    core_features JSON,
+    target_audience TEXT,
+    keywords JSON,
+    auto_scraped_content TEXT,
+    last_scraped_at TIMESTAMP NULL,
+    is_active BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE schema_migrations (
+    version INT PRIMARY KEY,
+    description VARCHAR(255),
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB;
+
+INSERT INTO schema_migrations (version, description) VALUES
+(1, 'Initial schema'),
+(2, 'Add incremental update support'),
+(3, 'Add AI provider field'),
+(4, 'Add language detection confidence');
+
+-- one collected channel with its legacy recent_videos blob
+INSERT INTO search_tasks (task_id, keyword, status) VALUES ('baseline-task', 'pc cleaner', 'completed');
+INSERT INTO channels (channel_id, channel_title, channel_url, subscriber_count, first_discovered_at, last_seen_at)
+VALUES ('UCbaseline', 'Baseline Channel', 'https://www.youtube.com/channel/UCbaseline', 12000, NOW(), NOW());
+INSERT INTO channel_video_stats (channel_id, task_id, avg_view_count, recent_videos) VALUES
+('UCbaseline', 'baseline-task', 1500,
+ '[{"video_id": "vid00000001", "title": "First", "published_at": "2025-01-02T03:04:05Z", "view_count": 1000, "like_count": 50, "comment_count": 5},
+   {"video_id": "vid00000002", "title": "Second", "published_at": "2025-01-09T03:04:05Z", "view_count": 2000, "like_count": 80, "comment_count": 9}]');
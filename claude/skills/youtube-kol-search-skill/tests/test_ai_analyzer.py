@@ -0,0 +1,31 @@
+"""
+AIAnalysisPool batching limits, with a recording transport instead of HTTP
+"""
+
+import asyncio
+import json
+
+from ai_analyzer import MAX_RESPONSE_TOKENS, PROVIDERS, AIAnalysisPool
+
+
+class RecordingTransport:
+    def __init__(self):
+        self.payloads = []
+
+    def __call__(self, url, headers, payload, timeout):
+        self.payloads.append(payload)
+        body = {'choices': [{'message': {'content': '[]'}}], 'usage': {'total_tokens': 10}}
+        return 200, {}, json.dumps(body)
+
+
+def test_batch_fits_the_provider_output_limit():
+    for provider, config in PROVIDERS.items():
+        transport = RecordingTransport()
+        pool = AIAnalysisPool(provider, 'key', batch_size=50, transport=transport)
+        channels = [{'channel_id': f"UC{i}"} for i in range(pool.batch_size)]
+
+        asyncio.run(pool._analyze_batch(channels, {'product_name': 'WMaster Cleanup'}))
+
+        assert 1 < pool.batch_size < 50
+        assert pool.batch_size * MAX_RESPONSE_TOKENS <= config['max_output_tokens']
+        assert transport.payloads[0]['max_tokens'] <= config['max_output_tokens']
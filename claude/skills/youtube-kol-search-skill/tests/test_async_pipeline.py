@@ -0,0 +1,47 @@
+"""
+AsyncSearchPipeline failure handling against an in-process fake client
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import youtube_collector
+from youtube_collector import AsyncSearchPipeline, YouTubeAPIError
+
+
+class PagingClient:
+    """Endless search results (50 new channels a page); counts search calls"""
+
+    def __init__(self):
+        self.search_calls = 0
+        self._lock = threading.Lock()
+
+    def call(self, endpoint, **params):
+        assert endpoint == 'search', endpoint
+        with self._lock:
+            self.search_calls += 1
+            page = self.search_calls
+        time.sleep(0.01)
+        return {
+            'items': [{'snippet': {'channelId': f"UC{page:04d}{i:02d}"}} for i in range(50)],
+            'nextPageToken': f"page{page + 1}",
+            'pageInfo': {'totalResults': 1000000},
+        }
+
+
+def test_chunk_failure_stops_search_pagination(monkeypatch):
+    def fail(client, channel_ids):
+        raise YouTubeAPIError(403, 'forbidden', 'key suspended')
+
+    monkeypatch.setattr(youtube_collector, 'fetch_channels', fail)
+    client = PagingClient()
+    pipeline = AsyncSearchPipeline(client, max_in_flight=4)
+
+    with pytest.raises(YouTubeAPIError):
+        asyncio.run(pipeline.run('PC cleanup', max_pages=20))
+
+    # both streams would page 20 times each if the failure waited for the searches
+    assert client.search_calls < 10
@@ -0,0 +1,20 @@
+"""
+test_apis.run_benchmark against the in-process fake YouTube API (no latency)
+"""
+
+from test_apis import run_benchmark
+
+SMALL = {'keywords': ['PC cleanup'], 'max_pages': 1, 'num_channels': 200, 'latency_scale': 0}
+
+
+def test_benchmark_passes_within_thresholds():
+    assert run_benchmark(**SMALL, max_units_per_channel=20, min_rps=1, max_p95_ms=5000)
+
+
+def test_benchmark_fails_on_a_breached_threshold():
+    assert not run_benchmark(**SMALL, max_units_per_channel=0.5)
+    assert not run_benchmark(**SMALL, min_rps=1e9)
+
+
+def test_benchmark_fails_on_injected_403s():
+    assert not run_benchmark(**SMALL, error_rate_403=1.0)
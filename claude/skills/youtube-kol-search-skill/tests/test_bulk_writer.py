@@ -0,0 +1,14 @@
+"""
+bulk_writer upsert statements
+"""
+
+from bulk_writer import upsert_sql
+
+
+def test_upsert_keeps_detected_language_without_a_new_one():
+    sql = upsert_sql('channels', 2)
+
+    assert 'detected_language = COALESCE(VALUES(detected_language), detected_language)' in sql
+    assert 'language_confidence = COALESCE(VALUES(language_confidence), language_confidence)' in sql
+    assert 'channel_title = VALUES(channel_title)' in sql
+    assert 'language = COALESCE(VALUES(language), language)' in upsert_sql('videos', 1)
@@ -0,0 +1,34 @@
+"""
+cache_codec round-trips and default codec selection
+"""
+
+import json
+
+import cache_codec
+from cache_codec import BinaryCodec, JSONCodec, decode
+
+CHANNEL = {
+    'channel_id': 'UC0000000001',
+    'channel_title': 'PC Cleanup Tips',
+    'subscriber_count': 120000,
+    'recent_videos': [{'video_id': f"vid{i:08d}", 'title': 'Windows cleanup ' * 4, 'view_count': i * 1000}
+                      for i in range(10)],
+}
+
+
+def test_compressed_json_round_trips_and_shrinks():
+    codec = JSONCodec(compression='zlib')
+    data = codec.encode(CHANNEL)
+
+    assert data[0] == cache_codec.FORMAT_JSON_ZLIB
+    assert len(data) < len(json.dumps(CHANNEL))
+    assert decode(data) == CHANNEL
+    assert decode(JSONCodec().encode(CHANNEL)) == CHANNEL
+
+
+def test_default_codec_needs_the_msgpack_package(monkeypatch):
+    monkeypatch.setattr(cache_codec, 'msgpack', None)
+    assert cache_codec.default_codec().name == 'json+zlib'
+
+    monkeypatch.setattr(cache_codec, 'msgpack', object())
+    assert isinstance(cache_codec.default_codec(), BinaryCodec)
@@ -0,0 +1,179 @@
+"""
+migrate.py against a database created before the runner existed
+
+Such a database has versions 1-4 recorded by the old
+create_schema_version_table, so 0001_initial_schema (create_tables) never
+runs there and every later table has to come from its own migration.
+
+test_baseline_database_migrates runs the real runner on MySQL and is skipped
+unless KOL_TEST_MYSQL_PASSWORD is set (KOL_TEST_MYSQL_HOST / _PORT / _USER
+default to localhost / 3306 / root); it creates and drops its own databases.
+"""
+
+import os
+import re
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('mysql.connector')
+
+import init_database  # noqa: E402
+from migrate import Migration, MigrationRunner, discover  # noqa: E402
+
+BASELINE_SQL = Path(__file__).resolve().parent / 'baseline_schema.sql'
+BASELINE_TABLES = {'search_tasks', 'channels', 'channel_video_stats', 'ai_analysis', 'api_keys',
+                   'product_config', 'schema_migrations'}
+BASELINE_VERSIONS = (1, 2, 3, 4)
+
+# tables read or written by the .py migrations (their SQL is not in the file)
+PY_MIGRATION_TABLES = {
+    'copy_recent_videos': {'channel_video_stats', 'videos', 'channel_videos', 'search_tasks'},
+    'backfill_task_date': {'channel_video_stats', 'ai_analysis', 'channel_videos', 'search_tasks'},
+}
+
+_TABLE_REF = re.compile(r'\b(?:ALTER\s+TABLE|(?<!ON )UPDATE|INSERT\s+INTO|FROM|JOIN|REFERENCES)\s+(\w+)', re.I)
+_CREATE = re.compile(r'\bCREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)', re.I)
+
+
+class RecordingCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self._result = []
+
+    def execute(self, sql, params=None):
+        self.connection.executed.append(sql)
+        if sql.startswith('SHOW TABLES'):
+            self._result = [('schema_migrations',)]
+        elif sql.startswith('SELECT version, checksum'):
+            self._result = [(version, None) for version in BASELINE_VERSIONS]
+        else:
+            self._result = []
+
+    def fetchone(self):
+        return self._result[0] if self._result else None
+
+    def fetchall(self):
+        return self._result
+
+    def close(self):
+        pass
+
+
+class RecordingConnection:
+    """Answers the runner's bookkeeping queries like a baseline database"""
+
+    def __init__(self):
+        self.executed = []
+
+    def cursor(self, *args, **kwargs):
+        return RecordingCursor(self)
+
+
+def created_tables() -> set:
+    connection = RecordingConnection()
+    init_database.create_tables(connection)
+    return {_CREATE.search(sql).group(1) for sql in connection.executed}
+
+
+def test_pending_on_baseline_skips_recorded_versions():
+    pending = MigrationRunner(RecordingConnection()).pending()
+
+    assert [m.version for m in pending] == [m.version for m in discover() if m.version not in BASELINE_VERSIONS]
+
+
+def test_tables_exist_before_any_migration_uses_them():
+    tables = set(BASELINE_TABLES)
+    for migration in MigrationRunner(RecordingConnection()).pending():
+        if migration.path.suffix == '.py':
+            name = migration.path.stem.split('_', 1)[1]
+            assert name in PY_MIGRATION_TABLES, f"declare the tables {migration.path.name} touches"
+            used = PY_MIGRATION_TABLES[name]
+        else:
+            used = set()
+            for statement in migration.statements():
+                created = _CREATE.search(statement)
+                if created:
+                    tables.add(created.group(1))
+                used |= set(_TABLE_REF.findall(statement))
+        missing = used - tables
+        assert not missing, f"{migration.path.name} uses {sorted(missing)} before any migration creates them"
+
+    assert created_tables() <= tables
+
+
+# ── against MySQL ─────────────────────────────────────────────────────
+
+def _connect(database=None):
+    import mysql.connector
+
+    return mysql.connector.connect(
+        host=os.environ.get('KOL_TEST_MYSQL_HOST', 'localhost'),
+        port=int(os.environ.get('KOL_TEST_MYSQL_PORT', 3306)),
+        user=os.environ.get('KOL_TEST_MYSQL_USER', 'root'),
+        password=os.environ['KOL_TEST_MYSQL_PASSWORD'],
+        database=database,
+    )
+
+
+def _columns(connection) -> dict:
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE()
+    """)
+    columns = {}
+    for table, column in cursor.fetchall():
+        columns.setdefault(table, set()).add(column)
+    cursor.close()
+    return columns
+
+
+@pytest.fixture
+def scratch_databases():
+    if 'KOL_TEST_MYSQL_PASSWORD' not in os.environ:
+        pytest.skip('KOL_TEST_MYSQL_PASSWORD not set')
+    names = ('kol_test_baseline', 'kol_test_fresh')
+    server = _connect()
+    cursor = server.cursor()
+    for name in names:
+        cursor.execute(f"DROP DATABASE IF EXISTS {name}")
+        cursor.execute(f"CREATE DATABASE {name} CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+    connections = [_connect(name) for name in names]
+    yield connections
+    for connection in connections:
+        connection.close()
+    for name in names:
+        cursor.execute(f"DROP DATABASE IF EXISTS {name}")
+    cursor.close()
+    server.close()
+
+
+def test_baseline_database_migrates(scratch_databases):
+    baseline, fresh = scratch_databases
+
+    cursor = baseline.cursor()
+    for statement in Migration(0, 'baseline', BASELINE_SQL).statements():
+        cursor.execute(statement)
+    baseline.commit()
+
+    MigrationRunner(baseline).run()
+
+    init_database.create_tables(fresh)
+    init_database.add_foreign_keys(fresh)
+    MigrationRunner(fresh).run()
+
+    migrated, expected = _columns(baseline), _columns(fresh)
+    assert set(migrated) == set(expected)
+    for table, columns in expected.items():
+        assert migrated[table] == columns, table
+
+    cursor.execute("""
+        SELECT cv.position, cv.video_id, cv.view_count, cv.task_date = DATE(t.created_at)
+        FROM channel_videos cv JOIN search_tasks t ON t.task_id = cv.task_id
+        WHERE cv.task_id = 'baseline-task' ORDER BY cv.position
+    """)
+    assert cursor.fetchall() == [(0, 'vid00000001', 1000, 1), (1, 'vid00000002', 2000, 1)]
+
+    cursor.execute("SELECT COUNT(*) FROM schema_migrations")
+    assert cursor.fetchone()[0] == len(discover())
+    cursor.close()
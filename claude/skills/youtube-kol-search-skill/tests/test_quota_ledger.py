@@ -0,0 +1,33 @@
+"""
+quota_ledger reservations and journal ownership (in-memory counters)
+"""
+
+import pytest
+
+from quota_ledger import JournalInUseError, QuotaExhaustedException, QuotaJournal, QuotaLedger
+
+
+def test_second_journal_owner_is_rejected(tmp_path):
+    path = str(tmp_path / 'quota.journal')
+    journal = QuotaJournal(path)
+
+    with pytest.raises(JournalInUseError):
+        QuotaJournal(path)
+
+    journal.close()
+    QuotaJournal(path).close()
+
+
+def test_key_too_low_for_a_search_still_serves_small_calls():
+    ledger = QuotaLedger([
+        {'id': 1, 'api_key': 'key1', 'daily_quota': 150, 'priority': 2},
+        {'id': 2, 'api_key': 'key2', 'daily_quota': 100, 'priority': 1},
+    ])
+
+    assert ledger.reserve(100) == 'key1'
+    assert ledger.reserve(100) == 'key2'       # 50 left on key1: too low for a search
+    assert ledger.reserve(1) == 'key1'         # key2 is empty, key1 still has 50
+
+    assert ledger.usage() == {1: 101, 2: 100}
+    with pytest.raises(QuotaExhaustedException):
+        ledger.reserve(100)
@@ -0,0 +1,53 @@
+"""
+YouTubeClient key rotation and retries, with the HTTP layer replaced
+"""
+
+import json
+
+import pytest
+
+from youtube_collector import QuotaExhaustedException, YouTubeAPIError, YouTubeClient
+
+QUOTA_EXCEEDED = (403, json.dumps({'error': {'errors': [{'reason': 'quotaExceeded'}],
+                                             'message': 'quota'}}).encode())
+RATE_LIMITED = (429, json.dumps({'error': {'errors': [{'reason': 'rateLimitExceeded'}],
+                                           'message': 'slow down'}}).encode())
+OK = (200, json.dumps({'items': []}).encode())
+
+
+def client_with(responses_by_key: dict, max_retries: int = 3) -> YouTubeClient:
+    """responses_by_key: key → callable(path) returning (status, body)"""
+    client = YouTubeClient(list(responses_by_key), max_retries=max_retries, backoff_base=0)
+    client.requests = []
+
+    def get(path):
+        key = path.rsplit('key=', 1)[1]
+        client.requests.append(key)
+        return responses_by_key[key]()
+    client._get = get
+    return client
+
+
+def test_key_rotation_does_not_use_the_retry_budget():
+    responses = {f"key{i}": (lambda: QUOTA_EXCEEDED) for i in range(1, 6)}
+    responses['key6'] = lambda: OK
+    client = client_with(responses, max_retries=3)
+
+    assert client.call('search', q='PC cleanup') == {'items': []}
+    assert client.requests == [f"key{i}" for i in range(1, 7)]
+
+
+def test_every_key_exhausted_raises_quota_exhausted():
+    client = client_with({f"key{i}": (lambda: QUOTA_EXCEEDED) for i in range(1, 4)})
+
+    with pytest.raises(QuotaExhaustedException):
+        client.call('search', q='PC cleanup')
+
+
+def test_backoffs_count_against_max_retries():
+    client = client_with({'key1': lambda: RATE_LIMITED, 'key2': lambda: RATE_LIMITED}, max_retries=2)
+
+    with pytest.raises(YouTubeAPIError) as error:
+        client.call('search', q='PC cleanup')
+    assert error.value.status == 429
+    assert len(client.requests) == 3